@@ -1,9 +1,19 @@
-from OpenGL.GL import *
-from OpenGL.GLUT import *
-from OpenGL.GLU import *
+import time
+script_started = time.perf_counter()     # --startup-report counts the imports from here
+
+import argparse
+import atexit
 import math
+import os
 import random
-import time
+import sys
+
+import camera
+import event_log
+import meshes
+import render_backends
+from telemetry import (CONTACT_GATE, CONTACT_GATE_BUMP, CONTACT_SPIKE, CONTACT_SPIKE_HIT, MARK_JUMP, MARK_NONE,
+                       MARK_RESET)
 
 WINDOW_WIDTH = 1203
 WINDOW_HEIGHT = 803
@@ -16,10 +26,19 @@ PLAYER_RADIUS = 15
 STAMINA_MAX = 100.0
 STAMINA_DRAIN_RATE = 20.0    
 STAMINA_REGEN_RATE = 10.0    
+START_TIME = 156.0           
+
+# Feature 18: Difficulty scaling knobs (per level above 1)
+DELIVERIES_PER_LEVEL = 3
+SPIKE_DIFFICULTY_SPEEDUP = 0.3
+GATE_DIFFICULTY_SPEEDUP = 0.2
+
+# Feature 8: Medal thresholds (seconds left)
+MEDAL_THRESHOLDS = [("GOLD", 120), ("SILVER", 60), ("BRONZE", 1)]
 
 
 game_state = 'playing'  
-time_left = 155.0       
+time_left = START_TIME  
 total_score = 0
 completed_deliveries = 0
 difficulty_level = 1    # Feature 18: Difficulty Scaling
@@ -33,6 +52,9 @@ PLAYER_BOUND_MARGIN_Z = 16.0
 
 key_states = {} 
 
+# Player position at the start of the current update, for swept collisions
+player_prev_pos = [-300.0, 15.0, -300.0]
+
 camera_mode_is_follow = False 
 camera_pos_fixed = [0, 500, 600] 
 
@@ -47,7 +69,11 @@ look_ahead   = 42.0
 
 follow_eye = [0.0, 0.0, 0.0]
 follow_ctr = [0.0, 0.0, 0.0]
-follow_smooth = 0.20    
+follow_smooth = 0.20    # fraction of the way to the target per 1/60 s (camera.smoothing)
+
+# Feature 2: projection/view matrices, rebuilt only when the camera actually moves
+main_camera = camera.Camera(75, WINDOW_WIDTH / WINDOW_HEIGHT, 0.1, 2000.0)
+last_camera_time = None
 
 packages = []
 route_beacons = []
@@ -62,11 +88,33 @@ gates = []
 bonus_rings = []
 game_time = 0.0 
 
+# Layout randomness comes from one generator so a run can be reseeded/replayed
+rng = random.Random()
+
 # Feature 9: Conveyor Tiles
 conveyor_tiles = []
+CONVEYOR_ARROW_SIZE = 10
+# Arrow triangle per push direction, in units of CONVEYOR_ARROW_SIZE around the tile centre
+CONVEYOR_ARROWS = {
+    'north': [(0, -1), (-0.5, 0.5), (0.5, 0.5)],
+    'south': [(0, 1), (-0.5, -0.5), (0.5, -0.5)],
+    'east': [(1, 0), (-0.5, -0.5), (-0.5, 0.5)],
+    'west': [(-1, 0), (0.5, -0.5), (0.5, 0.5)],
+}
+
+# Sticky/conveyor floor overlay is baked once per delivery; bumped when the tiles change
+floor_overlay_version = 0
 
 # Feature 11: Pop-Up Spikes  
 spike_cycle_time = 3.0  
+SPIKE_RADIUS = 12
+
+# Feature 12: Gate box footprint (long side x thin side)
+GATE_LENGTH = 50
+GATE_THICKNESS = 5
+
+# Bumped whenever spikes/gates are rebuilt, so GPU copies know to re-upload
+hazard_layout_version = 0
 
 # Feature 12: Dynamic Route Gates
 gate_cycle_time = 4.0   
@@ -74,6 +122,7 @@ gate_cycle_time = 4.0
 # Feature 14: Bonus Rings
 bonus_ring_spawn_timer = 0.0
 bonus_ring_spawn_interval = 15.0  
+MAX_BONUS_RINGS = 10  # oldest uncollected ring is dropped past this
 
 # Feature 16: Clean-Turn Combo
 clean_turn_combo = 0
@@ -87,6 +136,90 @@ arrow_size = 20
 
 last_frame_time = 0.0
 
+# Active render backend; main() swaps in the one picked with --renderer
+renderer = render_backends.NullRenderer()
+# Optional GPU path for spikes/gates (--hazard-shader)
+hazard_pipeline = None
+# GL call counters: shown in the HUD with --gl-stats, one CSV row per frame with --gl-stats-log
+show_gl_stats = False
+gl_stats_log = None
+
+
+class LiveState:
+    """
+    The game's current globals by attribute; what draw_* sees when no snapshot
+    is given. Setting an attribute sets the global (savegame.restore()).
+    """
+    def __getattr__(self, name):
+        return globals()[name]
+
+    def __setattr__(self, name, value):
+        globals()[name] = value
+
+live_state = LiveState()
+# State the draw_* functions read: live_state, or the sim thread's latest snapshot (--sim-thread)
+view = live_state
+# sim_thread.SimThread running update_game() when started with --sim-thread
+sim = None
+# scheduler.Scheduler stepping each subsystem at its own rate (--multi-rate); None = all at frame rate
+schedule = None
+# How far into the current hazard step the clock is; draw_hazards() interpolates spike heights by it
+hazard_alpha = 1.0
+# HUD strings cached by the 10 Hz 'hud' subsystem, or None to format them every frame
+hud_text = None
+# Game events (spike_hit, pickup, ...); main() replaces this with a writer-thread EventLog
+events = event_log.NullEventLog()
+# telemetry.TelemetryWriter recording one row per update_game() (--telemetry PATH)
+telemetry = None
+# Hazard contacts during the current update_game(), CONTACT_* bits
+tick_contacts = 0
+# MARK_* for the next telemetry row: a reset, or game_time moved by a rewind or load
+telemetry_mark = MARK_RESET
+# heatmap.Heatmap accumulating where the courier goes and gets hit (--heatmap PATH)
+heatmap = None
+# Layer drawn on the floor ('time' / 'hits'), None = hidden; H cycles it
+heatmap_layer = None
+# leaderboard.Leaderboard that finished runs are submitted to (--leaderboard PATH)
+leaderboard = None
+# Whether this run is already on the leaderboard; init_game() clears it. Rewinding out of a game
+# over continues the same run, so it doesn't submit again
+result_submitted = False
+# Layout seed from --seed; R replays the same layout when set
+session_seed = None
+# F5 / F9 save and load here (--save-file); savegame.SaveWriter does the disk write off-thread
+save_path = 'courier.sav'
+save_writer = None
+# Autosave every this many seconds of game time (--autosave), 0 = off
+autosave_interval = 0.0
+next_autosave = 0.0
+# (fn, args) that shutdown() runs newest first: the sim thread stops, then files are flushed and closed.
+# freeglut's default window-close action is C exit(), which skips atexit, so main() makes glutMainLoop()
+# return instead and runs them from the close callback.
+shutdown_hooks = []
+# Set by the close callback; async_loop.pump() stops on it
+window_closed = False
+# OpenGL.GLUT, imported by main() when it opens the window; the simulation never needs it, so
+# courier_env and the tools that load this script don't pay for PyOpenGL
+GLUT = None
+# startup.StartupReport while --startup-report is timing the way to the first frame
+startup_report = None
+# rewind.RewindBuffer of the last few seconds; holding B scrubs back through it (--rewind-seconds)
+rewind = None
+# ghost.GhostStore: best track per delivery leg of a seeded layout, drawn as a translucent courier (--ghosts PATH)
+ghosts = None
+# Where ghosts is kept; queued on save_writer whenever a leg sets a new best, and written again at shutdown
+ghosts_path = None
+# What the draw_* functions show of the heatmap, ghost and rewind, derived by update_view_state() on
+# the thread that owns that state and published with the rest of the view (sim_thread snapshots):
+# the heatmap's (layer, levels, steps) or None and its version, the ghost's (x, z, angle) or None,
+# and the seconds left to rewind while B is held, else None
+heatmap_shown = None
+heatmap_version = 0
+ghost_pose = None
+rewind_shown = None
+# minimap.Minimap in the top-right HUD corner, repainted into a texture at --minimap-rate; M toggles it
+minimap = None
+
 COLOR_RED = (1, 0, 0)
 COLOR_GREEN = (0, 1, 0)
 COLOR_BLUE = (0, 0, 1)
@@ -102,150 +235,135 @@ ROUTE_COLORS = [COLOR_BLUE, COLOR_YELLOW, COLOR_MAGENTA, COLOR_CYAN]
 
 
 
-def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18, color=COLOR_WHITE):
+def draw_text(x, y, text, font='helvetica_18', color=COLOR_WHITE):
     """
     This function draws 2D text on the screen. It's used for the HUD.
-    It works by temporarily switching to a 2D orthographic view.
+    The renderer places it in window coordinates (origin bottom-left).
     """
-    glColor3f(*color) 
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix() 
-    glLoadIdentity()
-    gluOrtho2D(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT) 
-
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix() 
-    glLoadIdentity()
-
-    glRasterPos2f(x, y) 
-    for char in text:
-        glutBitmapCharacter(font, ord(char)) 
-
-    glPopMatrix() 
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix() 
-    glMatrixMode(GL_MODELVIEW)
+    renderer.color(*color) 
+    renderer.text(x, y, text, font)
 
 def draw_cylinder(pos, radius, height, color):
     """A helper function to draw a simple cylinder."""
-    glPushMatrix()
-    glColor3f(*color)
-    glTranslatef(pos[0], pos[1], pos[2])
-    glRotatef(-90, 1, 0, 0) 
-    quad = gluNewQuadric()
-    gluCylinder(quad, radius, radius, height, 20, 20)
-    glTranslatef(0,0,height)
-    gluDisk(quad, 0, radius, 20, 1)
-    glPopMatrix()
+    renderer.push()
+    renderer.color(*color)
+    renderer.translate(pos[0], pos[1], pos[2])
+    renderer.cylinder(radius, height, 20)
+    renderer.pop()
 
 
 def draw_arena():
     """Draws the checkerboard floor and the four colored boundary walls."""
     # Feature 1: 3D Arena & Floor
-    glPushMatrix()
+    renderer.push()
     num_tiles = ARENA_SIZE // TILE_SIZE
     for i in range(-num_tiles, num_tiles):
         for j in range(-num_tiles, num_tiles):
             if (i + j) % 2 == 0:
-                glColor3f(0.8, 0.8, 0.8)
+                renderer.color(0.8, 0.8, 0.8)
             else:
-                glColor3f(0.6, 0.6, 0.6)
+                renderer.color(0.6, 0.6, 0.6)
 
-            glBegin(GL_QUADS)
-            glVertex3f(i * TILE_SIZE, 0, j * TILE_SIZE)
-            glVertex3f((i + 1) * TILE_SIZE, 0, j * TILE_SIZE)
-            glVertex3f((i + 1) * TILE_SIZE, 0, (j + 1) * TILE_SIZE)
-            glVertex3f(i * TILE_SIZE, 0, (j + 1) * TILE_SIZE)
-            glEnd()
-    glPopMatrix()
+            renderer.quads([(i * TILE_SIZE, 0, j * TILE_SIZE),
+                            ((i + 1) * TILE_SIZE, 0, j * TILE_SIZE),
+                            ((i + 1) * TILE_SIZE, 0, (j + 1) * TILE_SIZE),
+                            (i * TILE_SIZE, 0, (j + 1) * TILE_SIZE)])
+    renderer.pop()
 
     wall_height = 100
-    glPushMatrix()
-    glColor3f(*COLOR_RED)
-    glBegin(GL_QUADS); glVertex3f(-ARENA_SIZE, 0, ARENA_SIZE); glVertex3f(ARENA_SIZE, 0, ARENA_SIZE); glVertex3f(ARENA_SIZE, wall_height, ARENA_SIZE); glVertex3f(-ARENA_SIZE, wall_height, ARENA_SIZE); glEnd()
-    glColor3f(*COLOR_GREEN)
-    glBegin(GL_QUADS); glVertex3f(-ARENA_SIZE, 0, -ARENA_SIZE); glVertex3f(ARENA_SIZE, 0, -ARENA_SIZE); glVertex3f(ARENA_SIZE, wall_height, -ARENA_SIZE); glVertex3f(-ARENA_SIZE, wall_height, -ARENA_SIZE); glEnd()
-    glColor3f(*COLOR_BLUE)
-    glBegin(GL_QUADS); glVertex3f(ARENA_SIZE, 0, -ARENA_SIZE); glVertex3f(ARENA_SIZE, 0, ARENA_SIZE); glVertex3f(ARENA_SIZE, wall_height, ARENA_SIZE); glVertex3f(ARENA_SIZE, wall_height, -ARENA_SIZE); glEnd()
-    glColor3f(*COLOR_YELLOW)
-    glBegin(GL_QUADS); glVertex3f(-ARENA_SIZE, 0, -ARENA_SIZE); glVertex3f(-ARENA_SIZE, 0, ARENA_SIZE); glVertex3f(-ARENA_SIZE, wall_height, ARENA_SIZE); glVertex3f(-ARENA_SIZE, wall_height, -ARENA_SIZE); glEnd()
-    glPopMatrix()
-
-    # Feature 10: Low Sticky Tiles - Draw Special Tiles
-    for tile in special_tiles:
-        x, z, tile_type = tile['pos'][0], tile['pos'][2], tile['type']
-        if tile_type == 'sticky':
-            color = COLOR_DARK_GRAY
-            glColor4f(color[0], color[1], color[2], 0.8) 
-            glPushMatrix()
-            glTranslatef(0, 1, 0) 
-            glBegin(GL_QUADS)
-            glVertex3f(x, 0, z); glVertex3f(x+TILE_SIZE, 0, z); glVertex3f(x+TILE_SIZE, 0, z+TILE_SIZE); glVertex3f(x, 0, z+TILE_SIZE);
-            glEnd()
-            glPopMatrix()
-
-    # Feature 9: Conveyor Tiles (Directional Push)
-    for conveyor in conveyor_tiles:
+    renderer.push()
+    renderer.color(*COLOR_RED)
+    renderer.quads([(-ARENA_SIZE, 0, ARENA_SIZE), (ARENA_SIZE, 0, ARENA_SIZE), (ARENA_SIZE, wall_height, ARENA_SIZE), (-ARENA_SIZE, wall_height, ARENA_SIZE)])
+    renderer.color(*COLOR_GREEN)
+    renderer.quads([(-ARENA_SIZE, 0, -ARENA_SIZE), (ARENA_SIZE, 0, -ARENA_SIZE), (ARENA_SIZE, wall_height, -ARENA_SIZE), (-ARENA_SIZE, wall_height, -ARENA_SIZE)])
+    renderer.color(*COLOR_BLUE)
+    renderer.quads([(ARENA_SIZE, 0, -ARENA_SIZE), (ARENA_SIZE, 0, ARENA_SIZE), (ARENA_SIZE, wall_height, ARENA_SIZE), (ARENA_SIZE, wall_height, -ARENA_SIZE)])
+    renderer.color(*COLOR_YELLOW)
+    renderer.quads([(-ARENA_SIZE, 0, -ARENA_SIZE), (-ARENA_SIZE, 0, ARENA_SIZE), (-ARENA_SIZE, wall_height, ARENA_SIZE), (-ARENA_SIZE, wall_height, -ARENA_SIZE)])
+    renderer.pop()
+
+    # Heatmap (--heatmap, H); re-baked only when its quantised levels change
+    shown = view.heatmap_shown
+    if shown is not None:
+        renderer.baked('heatmap', view.heatmap_version, lambda: heatmap.overlay(shown))
+
+    # Feature 9 & 10: sticky and conveyor tiles, one baked draw
+    renderer.baked('floor_overlay', view.floor_overlay_version, build_floor_overlay)
+
+def build_floor_overlay():
+    """
+    Triangles (positions, rgba colours) for the sticky and conveyor tiles of
+    the current delivery, in world space, for renderer.baked().
+    """
+    positions, colors = [], []
+
+    def add_tile(x, y, z, rgba):
+        for vx, vz in ((x, z), (x+TILE_SIZE, z), (x+TILE_SIZE, z+TILE_SIZE),
+                       (x, z), (x+TILE_SIZE, z+TILE_SIZE), (x, z+TILE_SIZE)):
+            positions.extend((vx, y, vz))
+            colors.extend(rgba)
+
+    # Feature 10: Low Sticky Tiles (translucent, 1 unit above the floor)
+    for tile in view.special_tiles:
+        if tile['type'] == 'sticky':
+            add_tile(tile['pos'][0], 1, tile['pos'][2], COLOR_DARK_GRAY + (0.8,))
+
+    # Feature 9: Conveyor Tiles (Directional Push) with an arrow on top
+    for conveyor in view.conveyor_tiles:
         x, z = conveyor['pos'][0], conveyor['pos'][2]
-        direction = conveyor['direction']
-        
-        glColor3f(*COLOR_ORANGE)
-        glPushMatrix()
-        glTranslatef(0, 2, 0) 
-        glBegin(GL_QUADS)
-        glVertex3f(x, 0, z); glVertex3f(x+TILE_SIZE, 0, z); glVertex3f(x+TILE_SIZE, 0, z+TILE_SIZE); glVertex3f(x, 0, z+TILE_SIZE);
-        glEnd()
-        glPopMatrix()
-        
-        glColor3f(*COLOR_YELLOW)
+        add_tile(x, 2, z, COLOR_ORANGE + (1.0,))
         arrow_x = x + TILE_SIZE/2
         arrow_z = z + TILE_SIZE/2
-        glPushMatrix()
-        glTranslatef(arrow_x, 3, arrow_z)
-        
-        glBegin(GL_TRIANGLES)
-        arrow_size = 10
-        if direction == 'north':
-            glVertex3f(0, 0, -arrow_size)
-            glVertex3f(-arrow_size/2, 0, arrow_size/2)
-            glVertex3f(arrow_size/2, 0, arrow_size/2)
-        elif direction == 'south':
-            glVertex3f(0, 0, arrow_size)
-            glVertex3f(-arrow_size/2, 0, -arrow_size/2)
-            glVertex3f(arrow_size/2, 0, -arrow_size/2)
-        elif direction == 'east':
-            glVertex3f(arrow_size, 0, 0)
-            glVertex3f(-arrow_size/2, 0, -arrow_size/2)
-            glVertex3f(-arrow_size/2, 0, arrow_size/2)
-        elif direction == 'west':
-            glVertex3f(-arrow_size, 0, 0)
-            glVertex3f(arrow_size/2, 0, -arrow_size/2)
-            glVertex3f(arrow_size/2, 0, arrow_size/2)
-        glEnd()
-        glPopMatrix()
+        for ax, az in CONVEYOR_ARROWS[conveyor['direction']]:
+            positions.extend((arrow_x + ax*CONVEYOR_ARROW_SIZE, 3, arrow_z + az*CONVEYOR_ARROW_SIZE))
+            colors.extend(COLOR_YELLOW + (1.0,))
+    return positions, colors
 
 
 def draw_player():
     """Feature 3: Player Avatar & Movement - Draws the player character as a composite object."""
-    glPushMatrix()
-    glTranslatef(player_pos[0], player_pos[1], player_pos[2])
-    glRotatef(player_angle, 0, 1, 0)
-
-    glColor3f(0.2, 0.4, 0.8)
-    glPushMatrix(); glScalef(1, 1.5, 0.8); glutSolidCube(20); glPopMatrix()
-
-    glColor3f(0.8, 0.6, 0.4)
-    glPushMatrix(); glTranslatef(0, 25, 0); glutSolidSphere(10, 20, 20); glPopMatrix()
-
-    glColor3f(1, 1, 1)
-    glPushMatrix(); glTranslatef(0, 15, -10); glutSolidCube(5); glPopMatrix()
-
-    # Feature 15: Package Interaction - If carrying a package, draw it
-    if is_carrying_package:
-        glColor3f(*carried_package_info['color'])
-        glPushMatrix(); glTranslatef(20, 10, 0); glutSolidCube(10); glPopMatrix()
-
-    glPopMatrix()
+    renderer.push()
+    renderer.translate(view.player_pos[0], view.player_pos[1], view.player_pos[2])
+    renderer.rotate(view.player_angle, 0, 1, 0)
+
+    # Body, head, visor (+ carried package) are one cached mesh; only picking up,
+    # dropping or swapping the package rebuilds it
+    carried_color = view.carried_package_info['color'] if view.is_carrying_package else None
+    renderer.baked('courier', (view.is_carrying_package, carried_color), build_courier)
+
+    renderer.pop()
+
+def build_courier():
+    """The courier in player space (and Feature 15: the carried package), for renderer.baked()."""
+    parts = [
+        (meshes.cube_mesh(20), (0, 0, 0), (1, 1.5, 0.8), (0.2, 0.4, 0.8, 1)),       # body
+        (meshes.sphere_mesh(10, 20, 20), (0, 25, 0), (1, 1, 1), (0.8, 0.6, 0.4, 1)),  # head
+        (meshes.cube_mesh(5), (0, 15, -10), (1, 1, 1), (1, 1, 1, 1)),                # visor
+    ]
+    if view.is_carrying_package:
+        parts.append((meshes.cube_mesh(10), (20, 10, 0), (1, 1, 1), tuple(view.carried_package_info['color']) + (1,)))
+    return meshes.composite_mesh(parts)
+
+def draw_ghost():
+    """The best run of the current delivery leg (ghost.py), as a translucent courier."""
+    pose = view.ghost_pose
+    if pose is None:
+        return
+    x, z, angle = pose
+    renderer.push()
+    renderer.translate(x, view.player_pos[1], z)
+    renderer.rotate(angle, 0, 1, 0)
+    renderer.baked('ghost', 0, build_ghost)
+    renderer.pop()
+
+def build_ghost():
+    """The courier's body, head and visor in translucent white, for renderer.baked()."""
+    rgba = (0.85, 0.9, 1.0, 0.35)
+    return meshes.composite_mesh([
+        (meshes.cube_mesh(20), (0, 0, 0), (1, 1.5, 0.8), rgba),
+        (meshes.sphere_mesh(10, 20, 20), (0, 25, 0), (1, 1, 1), rgba),
+        (meshes.cube_mesh(5), (0, 15, -10), (1, 1, 1), rgba),
+    ])
 
 def clamp_player_inside_arena(old_x, old_z):
     """
@@ -265,36 +383,48 @@ def clamp_player_inside_arena(old_x, old_z):
 
 def draw_packages():
     """Feature 5: Package System - Draws all packages at the package station."""
-    for pkg in packages:
+    # One instanced draw: each package is a coloured 15-unit cube with a white 5-unit cube on top
+    cubes = []
+    for pkg in view.packages:
         if not pkg['is_carried']:
-            glPushMatrix()
-            glTranslatef(pkg['pos'][0], pkg['pos'][1], pkg['pos'][2])
-            glColor3f(*pkg['color'])
-            glutSolidCube(15)
-            glColor3f(1,1,1); glTranslatef(0,8,0); glutSolidCube(5)
-            glPopMatrix()
+            x, y, z = pkg['pos']
+            r, g, b = pkg['color']
+            cubes.append((x, y, z, 15, 15, 15, r, g, b))
+            cubes.append((x, y + 8, z, 5, 5, 5, 1, 1, 1))
+    renderer.instances('cube', cubes)
 
 def draw_beacons():
     """Feature 6: Ordered Checkpoints & Drop Zone - Draws the route beacons, highlighting the current one."""
-    for i, beacon in enumerate(route_beacons):
-        is_current = (i == current_beacon_index)
+    rows = []
+    for i, beacon in enumerate(view.route_beacons):
+        is_current = (i == view.current_beacon_index)
         base_color = beacon['color']
 
-        if i == len(route_beacons) - 1: 
+        if i == len(view.route_beacons) - 1: 
             color = COLOR_WHITE
         elif is_current:
-            brightness = 0.6 + 0.4 * (math.sin(game_time * 5) + 1) / 2
+            brightness = 0.6 + 0.4 * (math.sin(view.game_time * 5) + 1) / 2
             color = (base_color[0]*brightness, base_color[1]*brightness, base_color[2]*brightness)
         else: 
              color = (base_color[0]*0.2, base_color[1]*0.2, base_color[2]*0.2)
 
-        draw_cylinder(beacon['pos'], 10, 100, color)
+        pos = beacon['pos']
+        rows.append((pos[0], pos[1], pos[2], 10, 100, 10) + tuple(color))
+    renderer.instances('cylinder', rows)
 
 
 def draw_hazards():
     """Feature 11: Pop-Up Spikes & Feature 12: Dynamic Route Gates - Draws dynamic hazards like spikes and gates."""
+    if hazard_pipeline is not None:
+        # Heights and gate states are recomputed in the vertex shader from game_time
+        spike_cycle, gate_cycle = hazard_cycle_times(view.difficulty_level)
+        hazard_pipeline.draw(view.spikes, view.gates, view.hazard_layout_version, view.game_time, spike_cycle, gate_cycle)
+        renderer.reset_state()
+        return
+
     # Feature 11: Draw Spikes
-    for spike in spikes:
+    rows = []
+    for spike in view.spikes:
         # Color changes based on danger state
         if spike.get('is_dangerous', False) and spike['current_height'] > 40:
             # Dangerous spike - bright red
@@ -306,188 +436,245 @@ def draw_hazards():
             # Safe spike - dark gray
             color = (0.3, 0.3, 0.3)
         
-        draw_cylinder(spike['pos'], 12, spike['current_height'], color)
+        height = spike['current_height']
+        if view.hazard_alpha < 1.0:
+            # --multi-rate: hazards step at 30 Hz, blend the last two steps
+            prev = spike.get('prev_height', height)
+            height = prev + (height - prev) * view.hazard_alpha
+        pos = spike['pos']
+        rows.append((pos[0], pos[1], pos[2], SPIKE_RADIUS, height, SPIKE_RADIUS) + color)
+    renderer.instances('cylinder', rows)
 
     # Feature 12: Draw Gates
-    for gate in gates:
-        glPushMatrix()
-        glTranslatef(gate['pos'][0], gate['current_height']/2, gate['pos'][2])
-        
-        if gate['is_open']:
-            glColor3f(*COLOR_GREEN)
-        else:
-            glColor3f(*COLOR_RED)
-            
+    rows = []
+    for gate in view.gates:
+        color = COLOR_GREEN if gate['is_open'] else COLOR_RED
         if gate['orientation'] == 'vertical':
-            glScalef(5, gate['current_height'], 50)
+            size_x, size_z = GATE_THICKNESS, GATE_LENGTH
         else:
-            glScalef(50, gate['current_height'], 5)
-            
-        glutSolidCube(1)
-        glPopMatrix()
+            size_x, size_z = GATE_LENGTH, GATE_THICKNESS
+        rows.append((gate['pos'][0], gate['current_height']/2, gate['pos'][2],
+                     size_x, gate['current_height'], size_z) + color)
+    renderer.instances('cube', rows)
 
 def draw_bonus_rings():
     """Feature 14: Bonus Rings - Draws floating bonus rings."""
-    for ring in bonus_rings:
+    rows = []
+    for ring in view.bonus_rings:
         if ring['active']:
-            glPushMatrix()
-            glTranslatef(ring['pos'][0], ring['pos'][1], ring['pos'][2])
-            glColor3f(*COLOR_YELLOW)
             for i in range(20):
                 angle = math.radians(i * 18)
-                x = ring['radius'] * math.cos(angle)
-                z = ring['radius'] * math.sin(angle)
-                glPushMatrix()
-                glTranslatef(x, 0, z)
-                glutSolidSphere(3, 10, 10)
-                glPopMatrix()
-            glPopMatrix()
+                x = ring['pos'][0] + ring['radius'] * math.cos(angle)
+                z = ring['pos'][2] + ring['radius'] * math.sin(angle)
+                rows.append((x, ring['pos'][1], z, 3, 3, 3) + COLOR_YELLOW)
+    renderer.instances('sphere', rows, 10)
 
 
 def draw_hud_arrow():
     """Feature 13: HUD Arrow to Next Beacon - Draws arrow pointing to next beacon"""
-    if len(route_beacons) > 0 and current_beacon_index < len(route_beacons):
-        target_pos = route_beacons[current_beacon_index]['pos']
-        dx = target_pos[0] - player_pos[0]
-        dz = target_pos[2] - player_pos[2]
+    if len(view.route_beacons) > 0 and view.current_beacon_index < len(view.route_beacons):
+        target_pos = view.route_beacons[view.current_beacon_index]['pos']
+        dx = target_pos[0] - view.player_pos[0]
+        dz = target_pos[2] - view.player_pos[2]
         target_angle_world = math.degrees(math.atan2(dx, dz))
-        arrow_angle = target_angle_world - player_angle
+        arrow_angle = target_angle_world - view.player_angle
 
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        gluOrtho2D(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT)
+        renderer.hud_begin()
         
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
+        renderer.translate(WINDOW_WIDTH / 2, WINDOW_HEIGHT - 100, 0)
+        renderer.rotate(-arrow_angle, 0, 0, 1) 
+        renderer.color(*COLOR_YELLOW)
         
-        glTranslatef(WINDOW_WIDTH / 2, WINDOW_HEIGHT - 100, 0)
-        glRotatef(-arrow_angle, 0, 0, 1) 
-        glColor3f(*COLOR_YELLOW)
+        renderer.triangles([(0, arrow_size, 0), (-arrow_size/2, -arrow_size/2, 0), (arrow_size/2, -arrow_size/2, 0)])
         
-        glBegin(GL_TRIANGLES)
-        glVertex2f(0, arrow_size)
-        glVertex2f(-arrow_size/2, -arrow_size/2)
-        glVertex2f(arrow_size/2, -arrow_size/2)
-        glEnd()
-        
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+        renderer.hud_end()
+
+def hud_text_lines(state):
+    """The HUD's formatted strings for state, as (x, y, text, color) tuples."""
+    lines = []
 
-def draw_hud():
-    """Feature 8: Global Timer + Medals - Draws the Heads-Up Display with all game information."""
     # Feature 8: Time and Medal Status
-    minutes = int(time_left // 60)
-    seconds = int(time_left % 60)
-    draw_text(10, WINDOW_HEIGHT - 30, f"Time Left: {minutes:02d}:{seconds:02d}")
+    minutes = int(state.time_left // 60)
+    seconds = int(state.time_left % 60)
+    lines.append((10, WINDOW_HEIGHT - 30, f"Time Left: {minutes:02d}:{seconds:02d}", COLOR_WHITE))
     
-    medal_type = "NO MEDAL"
-    if time_left >= 120:
-        medal_type = "GOLD"
-    elif time_left >= 60:
-        medal_type = "SILVER"
-    elif time_left >= 1:
-        medal_type = "BRONZE"
-    draw_text(10, WINDOW_HEIGHT - 60, f"Medal Status: {medal_type}")
+    lines.append((10, WINDOW_HEIGHT - 60, f"Medal Status: {get_medal(state.time_left)}", COLOR_WHITE))
 
-    draw_text(10, WINDOW_HEIGHT - 90, f"Score: {total_score}")
+    lines.append((10, WINDOW_HEIGHT - 90, f"Score: {state.total_score}", COLOR_WHITE))
 
     # Feature 15: Package Status
     status = "Empty"
     color = COLOR_WHITE
-    if is_carrying_package:
-        if carried_package_info['is_correct']:
+    if state.is_carrying_package:
+        if state.carried_package_info['is_correct']:
             status = "Correct Package"
             color = COLOR_GREEN
         else:
             status = "WRONG PACKAGE!"
             color = COLOR_RED
-    draw_text(200, WINDOW_HEIGHT - 30, f"Package: {status}", color=color)
+    lines.append((200, WINDOW_HEIGHT - 30, f"Package: {status}", color))
 
     # Feature 6: Checkpoint
-    draw_text(200, WINDOW_HEIGHT - 60, f"Next Beacon: {current_beacon_index + 1} / {len(route_beacons)}")
+    lines.append((200, WINDOW_HEIGHT - 60, f"Next Beacon: {state.current_beacon_index + 1} / {len(state.route_beacons)}", COLOR_WHITE))
+
+    lines.append((10, 80, "Stamina", COLOR_WHITE))
+
+    # Feature 16: Clean-Turn Combo
+    if state.clean_turn_combo > 0:
+        lines.append((WINDOW_WIDTH - 150, 80, f"Combo: {state.clean_turn_combo}x", COLOR_YELLOW))
+
+    # Feature 18: Difficulty Level
+    lines.append((WINDOW_WIDTH - 150, 50, f"Difficulty: {state.difficulty_level}", COLOR_WHITE))
+    return lines
+
+def update_hud_text(delta_time):
+    """The 'hud' subsystem under --multi-rate: re-formats the HUD strings at its own rate."""
+    global hud_text
+    hud_text = tuple(hud_text_lines(live_state))
+
+def draw_hud():
+    """Feature 8: Global Timer + Medals - Draws the Heads-Up Display with all game information."""
+    # One screen-space setup for the whole HUD; the widgets' own hud_begin/hud_end nest inside it
+    renderer.hud_begin()
+
+    lines = view.hud_text
+    if lines is None or view.game_state != 'playing':
+        lines = hud_text_lines(view)
+    for x, y, text, color in lines:
+        draw_text(x, y, text, color=color)
+
+    if minimap is not None:
+        minimap.draw(renderer, view, WINDOW_WIDTH - minimap.size - 10, WINDOW_HEIGHT - minimap.size - 10)
 
     # Feature 4: Stamina Bar
-    draw_text(10, 80, "Stamina")
     
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-    gluOrtho2D(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT)
+    renderer.hud_begin()
     
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
+    renderer.color(0.2, 0.2, 0.2)
+    renderer.quads([(10, 50, 0), (210, 50, 0), (210, 70, 0), (10, 70, 0)])
     
-    glColor3f(0.2, 0.2, 0.2)
-    glBegin(GL_QUADS)
-    glVertex2f(10, 50)
-    glVertex2f(210, 50)
-    glVertex2f(210, 70)
-    glVertex2f(10, 70)
-    glEnd()
+    stamina_width = 200 * (view.stamina / STAMINA_MAX)
+    renderer.color(0, 0.8, 0)
+    renderer.quads([(10, 50, 0), (10 + stamina_width, 50, 0), (10 + stamina_width, 70, 0), (10, 70, 0)])
     
-    stamina_width = 200 * (stamina / STAMINA_MAX)
-    glColor3f(0, 0.8, 0)
-    glBegin(GL_QUADS)
-    glVertex2f(10, 50)
-    glVertex2f(10 + stamina_width, 50)
-    glVertex2f(10 + stamina_width, 70)
-    glVertex2f(10, 70)
-    glEnd()
-    
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
-
-    # Feature 16: Clean-Turn Combo
-    if clean_turn_combo > 0:
-        draw_text(WINDOW_WIDTH - 150, 80, f"Combo: {clean_turn_combo}x", color=COLOR_YELLOW)
-
-    # Feature 18: Difficulty Level
-    draw_text(WINDOW_WIDTH - 150, 50, f"Difficulty: {difficulty_level}")
+    renderer.hud_end()
 
     # Feature 17: Pause message
-    if game_state == 'paused':
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        gluOrtho2D(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT)
-        
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
+    if view.game_state == 'paused':
+        renderer.hud_begin()
         
-        glColor4f(0, 0, 0, 0.5)
-        glBegin(GL_QUADS)
-        glVertex2f(0, 0)
-        glVertex2f(WINDOW_WIDTH, 0)
-        glVertex2f(WINDOW_WIDTH, WINDOW_HEIGHT)
-        glVertex2f(0, WINDOW_HEIGHT)
-        glEnd()
+        renderer.color(0, 0, 0, 0.5)
+        renderer.quads([(0, 0, 0), (WINDOW_WIDTH, 0, 0), (WINDOW_WIDTH, WINDOW_HEIGHT, 0), (0, WINDOW_HEIGHT, 0)])
         
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+        renderer.hud_end()
         
-        draw_text(WINDOW_WIDTH/2 - 50, WINDOW_HEIGHT/2, "PAUSED", font=GLUT_BITMAP_TIMES_ROMAN_24)
+        draw_text(WINDOW_WIDTH/2 - 50, WINDOW_HEIGHT/2, "PAUSED", font='times_roman_24')
 
     # Feature 13: Draw HUD arrow
     draw_hud_arrow()
 
+    if view.rewind_shown is not None:
+        draw_text(WINDOW_WIDTH/2 - 70, WINDOW_HEIGHT - 40, f"<< REWIND  {view.rewind_shown:.1f}s",
+                  font='times_roman_24', color=COLOR_CYAN)
+
+    # Leaderboard panel after game over, from the leaderboard's cached rows
+    if view.game_state == 'fail' and leaderboard is not None:
+        x, y = WINDOW_WIDTH/2 - 140, WINDOW_HEIGHT/2 + 80
+        draw_text(x, y, "LEADERBOARD", font='times_roman_24', color=COLOR_YELLOW)
+        for rank, (score, deliveries, medal, level, seed, played_at) in enumerate(leaderboard.panel, 1):
+            draw_text(x, y - 30 * rank, f"{rank}. {score:>5}  {deliveries} deliveries  {medal}  level {level}")
+
+    if show_gl_stats:
+        stats = renderer.gl_stats()
+        draw_text(10, 110, "GL " + "  ".join(f"{key} {value}" for key, value in stats.items()), color=COLOR_CYAN)
+        if schedule is not None:
+            draw_text(10, 140, "SCHED " + schedule.summary(), color=COLOR_CYAN)
+
+    renderer.hud_end()
+
+
+def get_medal(seconds_left):
+    """Feature 8: Medal earned for the given time left."""
+    for medal, threshold in MEDAL_THRESHOLDS:
+        if seconds_left >= threshold:
+            return medal
+    return "NO MEDAL"
 
 def get_distance(p1, p2):
     """Calculates the 2D distance between two points [x, y, z]."""
     return math.sqrt((p1[0] - p2[0])**2 + (p1[2] - p2[2])**2)
 
+def swept_circle_toi(start, end, center, radius):
+    """
+    Continuous collision: first fraction t in [0, 1] of the move start->end (x/z)
+    at which the player centre comes within radius of center, or None.
+    Returns 0.0 if the move already starts inside.
+    """
+    dx, dz = end[0] - start[0], end[2] - start[2]
+    fx, fz = start[0] - center[0], start[2] - center[2]
+    c = fx*fx + fz*fz - radius*radius
+    if c <= 0:
+        return 0.0
+    a = dx*dx + dz*dz
+    b = 2 * (fx*dx + fz*dz)
+    if a == 0 or b >= 0:           # not moving, or moving away
+        return None
+    disc = b*b - 4*a*c
+    if disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2*a)
+    return t if t <= 1 else None
+
+def swept_box_toi(start, end, center, half_x, half_z, radius):
+    """
+    Continuous collision of the player circle against an axis-aligned box
+    (box grown by radius). Returns (t, normal_x, normal_z) for the first
+    contact of the move start->end, or None. t is 0.0 if it starts inside;
+    the normal is then the axis of least penetration.
+    """
+    ex, ez = half_x + radius, half_z + radius
+    sx, sz = start[0] - center[0], start[2] - center[2]
+    dx, dz = end[0] - start[0], end[2] - start[2]
+
+    if abs(sx) <= ex and abs(sz) <= ez:
+        if ex - abs(sx) < ez - abs(sz):
+            return 0.0, (1.0 if sx >= 0 else -1.0), 0.0
+        return 0.0, 0.0, (1.0 if sz >= 0 else -1.0)
+
+    t_enter, t_exit = 0.0, 1.0
+    normal = (0.0, 0.0)
+    for s, d, e, axis in ((sx, dx, ex, (1.0, 0.0)), (sz, dz, ez, (0.0, 1.0))):
+        if d == 0:
+            if abs(s) >= e:
+                return None
+            continue
+        t0, t1 = (-e - s) / d, (e - s) / d
+        sign = -1.0
+        if t0 > t1:
+            t0, t1, sign = t1, t0, 1.0
+        if t0 > t_enter:
+            t_enter, normal = t0, (axis[0] * sign, axis[1] * sign)
+        t_exit = min(t_exit, t1)
+        if t_enter > t_exit:
+            return None
+    return t_enter, normal[0], normal[1]
+
+def resolve_swept_contact(start, t, nx, nz, skin=0.5):
+    """Moves the player to the contact point at fraction t of start->player_pos,
+    then slides the rest of the move along the surface (normal nx, nz)."""
+    dx, dz = player_pos[0] - start[0], player_pos[2] - start[2]
+    rest_x, rest_z = dx * (1 - t), dz * (1 - t)
+    into = rest_x*nx + rest_z*nz
+    if into < 0:
+        rest_x -= into * nx
+        rest_z -= into * nz
+    player_pos[0] = start[0] + dx*t + nx*skin + rest_x
+    player_pos[2] = start[2] + dz*t + nz*skin + rest_z
+
 def start_new_delivery():
     """Resets and randomizes the game for a new delivery run."""
     global route_color, current_beacon_index, packages, route_beacons, bonus_rings, special_tiles, conveyor_tiles
+    global floor_overlay_version
     
     current_beacon_index = 0
     route_beacons.clear()
@@ -498,39 +685,47 @@ def start_new_delivery():
 
     old_color = route_color
     while route_color == old_color:
-        route_color = random.choice(ROUTE_COLORS)
+        route_color = rng.choice(ROUTE_COLORS)
 
     for i in range(4): 
-        pos = [random.uniform(-ARENA_SIZE+50, ARENA_SIZE-50), 0, random.uniform(-ARENA_SIZE+50, ARENA_SIZE-50)]
+        pos = [rng.uniform(-ARENA_SIZE+50, ARENA_SIZE-50), 0, rng.uniform(-ARENA_SIZE+50, ARENA_SIZE-50)]
         route_beacons.append({'pos': pos, 'color': route_color})
-    pos = [random.uniform(-ARENA_SIZE+50, ARENA_SIZE-50), 0, random.uniform(-ARENA_SIZE+50, ARENA_SIZE-50)]
+    pos = [rng.uniform(-ARENA_SIZE+50, ARENA_SIZE-50), 0, rng.uniform(-ARENA_SIZE+50, ARENA_SIZE-50)]
     route_beacons.append({'pos': pos, 'color': COLOR_WHITE})
 
-    correct_pkg_pos = [random.uniform(-350, -250), 7.5, random.uniform(-350, -250)]
+    correct_pkg_pos = [rng.uniform(-350, -250), 7.5, rng.uniform(-350, -250)]
     packages.append({'pos': correct_pkg_pos, 'color': route_color, 'is_correct': True, 'is_carried': False})
     decoy_colors = [c for c in ROUTE_COLORS if c != route_color]
-    for i in range(random.randint(2,3)):
-        pos = [random.uniform(-350, -250), 7.5, random.uniform(-350, -250)]
-        packages.append({'pos': pos, 'color': random.choice(decoy_colors), 'is_correct': False, 'is_carried': False})
+    for i in range(rng.randint(2,3)):
+        pos = [rng.uniform(-350, -250), 7.5, rng.uniform(-350, -250)]
+        packages.append({'pos': pos, 'color': rng.choice(decoy_colors), 'is_correct': False, 'is_carried': False})
         
     # 5. Feature 14: Generate bonus rings
-    ring_count = random.randint(3, 5) + difficulty_level  
+    ring_count = rng.randint(3, 5) + difficulty_level  
     for i in range(ring_count):
-        pos = [random.uniform(-ARENA_SIZE, ARENA_SIZE), 60, random.uniform(-ARENA_SIZE, ARENA_SIZE)]
+        pos = [rng.uniform(-ARENA_SIZE, ARENA_SIZE), 60, rng.uniform(-ARENA_SIZE, ARENA_SIZE)]
         bonus_rings.append({'pos': pos, 'radius': 30, 'active': True, 'multiplier': 1})
         
     # 6. Feature 10: Generate sticky tiles
     for i in range(5):
-        x = random.randint(-8, 7) * TILE_SIZE
-        z = random.randint(-8, 7) * TILE_SIZE
+        x = rng.randint(-8, 7) * TILE_SIZE
+        z = rng.randint(-8, 7) * TILE_SIZE
         special_tiles.append({'pos': [x,0,z], 'type': 'sticky'})
         
     # 7. Feature 9: Generate conveyor tiles
     for i in range(8):
-        x = random.randint(-8, 7) * TILE_SIZE
-        z = random.randint(-8, 7) * TILE_SIZE
-        direction = random.choice(['north', 'south', 'east', 'west'])
+        x = rng.randint(-8, 7) * TILE_SIZE
+        z = rng.randint(-8, 7) * TILE_SIZE
+        direction = rng.choice(['north', 'south', 'east', 'west'])
         conveyor_tiles.append({'pos': [x, 0, z], 'direction': direction, 'strength': 30.0})
+    floor_overlay_version += 1
+
+    if ghosts is not None:
+        ghosts.start_leg(ghost_key(), game_time)
+
+def ghost_key():
+    """The current delivery leg's key in the ghost store; None when the layout isn't seeded."""
+    return f"{session_seed}:{completed_deliveries}" if session_seed is not None else None
 
 def Update_fixed_cam_from_orbit():
     """Recompute camera_pos_fixed.x/z from (radius, angle)."""
@@ -540,17 +735,17 @@ def Update_fixed_cam_from_orbit():
 
 def Compute_follow_targets():
     """Return (eye_xyz, ctr_xyz) for the OTS follow camera based on player pose."""
-    rad = math.radians(player_angle)
+    rad = math.radians(view.player_angle)
     fwdx, fwdz = math.sin(rad), math.cos(rad)         
     rtx, rtz   = fwdz, -fwdx                          
 
-    eye_x = player_pos[0] - fwdx*follow_back + rtx*follow_side
-    eye_y = player_pos[1] + follow_up
-    eye_z = player_pos[2] - fwdz*follow_back + rtz*follow_side
+    eye_x = view.player_pos[0] - fwdx*follow_back + rtx*follow_side
+    eye_y = view.player_pos[1] + follow_up
+    eye_z = view.player_pos[2] - fwdz*follow_back + rtz*follow_side
 
-    ctr_x = player_pos[0] + fwdx*look_ahead
-    ctr_y = player_pos[1] + follow_up*0.3
-    ctr_z = player_pos[2] + fwdz*look_ahead
+    ctr_x = view.player_pos[0] + fwdx*look_ahead
+    ctr_y = view.player_pos[1] + follow_up*0.3
+    ctr_z = view.player_pos[2] + fwdz*look_ahead
     return (eye_x, eye_y, eye_z), (ctr_x, ctr_y, ctr_z)
 
 def init_game():
@@ -558,20 +753,29 @@ def init_game():
     global game_state, time_left, total_score, player_pos, player_angle, stamina
     global last_frame_time, game_time, completed_deliveries, is_carrying_package, carried_package_info
     global difficulty_level, clean_turn_combo, bonus_ring_spawn_timer
+    global last_turn_time, current_turn_frames, route_color, hazard_layout_version, hud_text, next_autosave
+    global telemetry_mark, result_submitted
     
-    print("Initializing new game...")
+    events.emit('game_start', 0.0)
     game_state = 'playing'
-    time_left = 156.0
+    time_left = START_TIME
     total_score = 0
     completed_deliveries = 0
     difficulty_level = 1
     player_pos = [-300.0, 15.0, -300.0]
+    player_prev_pos[:] = player_pos
     player_angle = 0.0
     stamina = STAMINA_MAX
     is_carrying_package = False
     carried_package_info = None
+    route_color = COLOR_BLACK
     clean_turn_combo = 0
+    last_turn_time = 0.0
+    current_turn_frames = 0
     bonus_ring_spawn_timer = 0.0
+    hud_text = None
+    telemetry_mark = MARK_RESET
+    result_submitted = False
     
     # Feature 11 & 12: Initialize hazards (spikes and gates)
     spikes.clear()
@@ -579,30 +783,35 @@ def init_game():
     
     # Feature 11: Create spikes
     for i in range(5):
-        pos = [random.uniform(-ARENA_SIZE, ARENA_SIZE), 0, random.uniform(-ARENA_SIZE, ARENA_SIZE)]
+        pos = [rng.uniform(-ARENA_SIZE, ARENA_SIZE), 0, rng.uniform(-ARENA_SIZE, ARENA_SIZE)]
         spikes.append({
             'pos': pos, 
             'current_height': 0, 
             'max_height': 80,
-            'cycle_offset': random.uniform(0, 2*math.pi)
+            'cycle_offset': rng.uniform(0, 2*math.pi)
         })
     
     # Feature 12: Create gates
     for i in range(3):
-        gate_pos = [random.uniform(-ARENA_SIZE/2, ARENA_SIZE/2), 0, random.uniform(-ARENA_SIZE/2, ARENA_SIZE/2)]
-        orientation = random.choice(['vertical', 'horizontal'])
+        gate_pos = [rng.uniform(-ARENA_SIZE/2, ARENA_SIZE/2), 0, rng.uniform(-ARENA_SIZE/2, ARENA_SIZE/2)]
+        orientation = rng.choice(['vertical', 'horizontal'])
         gates.append({
             'pos': gate_pos, 
             'current_height': 0, 
             'max_height': 100,
             'is_open': True,
             'orientation': orientation,
-            'cycle_offset': random.uniform(0, 2*math.pi)
+            'cycle_offset': rng.uniform(0, 2*math.pi)
         })
+    hazard_layout_version += 1
+    if rewind is not None:
+        rewind.clear()
 
+    game_time = 0.0
     start_new_delivery() 
     last_frame_time = time.time()
-    game_time = 0.0
+    next_autosave = autosave_interval
+    update_view_state()
 
 def update_player(delta_time):
     """Updates player position, rotation, and stamina based on input."""
@@ -683,28 +892,36 @@ def update_player(delta_time):
     elif not is_turning or move_dir != 1 or current_speed <= speed_threshold:
         if current_turn_frames > 0:
             current_turn_frames = 0
-        if time.time() - last_turn_time > 2.0:
+        if game_time - last_turn_time > 2.0:
             clean_turn_combo = 0
     
     if is_turning:
-        last_turn_time = time.time()
+        last_turn_time = game_time
     
     last_player_speed = current_speed
 
     clamp_player_inside_arena(old_x, old_z)
 
-def update_hazards(delta_time):
-    """Feature 11 & 12: Animates spikes and gates with difficulty scaling."""
-    global difficulty_level
-    
-    # Feature 18: Difficulty scaling - faster cycles at higher difficulty
-    spike_speed_multiplier = 1.0 + (difficulty_level - 1) * 0.3
-    gate_speed_multiplier = 1.0 + (difficulty_level - 1) * 0.2
+def hazard_cycle_times(level):
+    """Feature 18: (spike, gate) cycle times at difficulty level - faster cycles at higher difficulty."""
+    spike_speed_multiplier = 1.0 + (level - 1) * SPIKE_DIFFICULTY_SPEEDUP
+    gate_speed_multiplier = 1.0 + (level - 1) * GATE_DIFFICULTY_SPEEDUP
+    return spike_cycle_time / spike_speed_multiplier, gate_cycle_time / gate_speed_multiplier
+
+def update_hazards(delta_time, at_time=None):
+    """
+    Feature 11 & 12: Animates spikes and gates with difficulty scaling.
+    The phases are taken at game time at_time (default: game_time).
+    """
+    spike_cycle, gate_cycle = hazard_cycle_times(difficulty_level)
+    now = game_time if at_time is None else at_time
     
     # Feature 11: Update spike heights using a sine wave for smooth animation
+    # (hazard_shader.py mirrors this logic on the GPU)
     for spike in spikes:
-        cycle_time = spike_cycle_time / spike_speed_multiplier
-        spike_phase = (game_time / cycle_time + spike['cycle_offset']) % (2 * math.pi)
+        spike['prev_height'] = spike['current_height']
+        cycle_time = spike_cycle
+        spike_phase = (now / cycle_time + spike['cycle_offset']) % (2 * math.pi)
         # Make spikes more obvious - fully up or fully down with quick transitions
         sin_value = math.sin(spike_phase)
         if sin_value > 0.3:
@@ -730,8 +947,8 @@ def update_hazards(delta_time):
 
     # Feature 12: Update gate positions
     for gate in gates:
-        cycle_time = gate_cycle_time / gate_speed_multiplier
-        gate_phase = (game_time / cycle_time + gate['cycle_offset']) % (2 * math.pi)
+        cycle_time = gate_cycle
+        gate_phase = (now / cycle_time + gate['cycle_offset']) % (2 * math.pi)
         gate['is_open'] = math.sin(gate_phase) > 0
         gate['current_height'] = 0 if gate['is_open'] else gate['max_height']
 
@@ -752,6 +969,8 @@ def update_bonus_rings(delta_time):
         ring_z = player_pos[2] + math.cos(angle_rad) * ahead_distance
         
         if abs(ring_x) < ARENA_SIZE and abs(ring_z) < ARENA_SIZE:
+            if len(bonus_rings) >= MAX_BONUS_RINGS:
+                bonus_rings.pop(0)
             bonus_rings.append({
                 'pos': [ring_x, 60, ring_z], 
                 'radius': 25, 
@@ -762,6 +981,7 @@ def update_bonus_rings(delta_time):
 def handle_collisions_and_interactions(delta_time):
     """Manages all game interactions: pickups, beacon checks, hazard collisions."""
     global time_left, total_score, is_carrying_package, carried_package_info, current_beacon_index, completed_deliveries
+    global tick_contacts
 
     # Feature 15: Package Pickup/Drop Logic
     if key_states.get(b'u', False): 
@@ -773,11 +993,15 @@ def handle_collisions_and_interactions(delta_time):
                     pkg['is_carried'] = True
                     if not pkg['is_correct']:
                         time_left -= 5 
+                        events.emit('wrong_pickup', game_time, color=pkg['color'], time_left=time_left)
+                    else:
+                        events.emit('pickup', game_time, color=pkg['color'])
                     break 
         key_states[b'u'] = False 
     
     if key_states.get(b'f', False): 
         if is_carrying_package:
+            events.emit('drop', game_time, color=carried_package_info['color'])
             carried_package_info['is_carried'] = False
             carried_package_info['pos'] = [player_pos[0], 7.5, player_pos[2]]
             is_carrying_package = False
@@ -800,65 +1024,100 @@ def handle_collisions_and_interactions(delta_time):
                     
                     # Feature 18: Increase difficulty every few deliveries
                     global difficulty_level
-                    if completed_deliveries % 3 == 0:
+                    if completed_deliveries % DELIVERIES_PER_LEVEL == 0:
                         difficulty_level += 1
+                    events.emit('delivery_complete', game_time, deliveries=completed_deliveries,
+                                score=total_score, difficulty=difficulty_level, time_left=time_left)
+                    if ghosts is not None:
+                        leg = ghosts.key
+                        record = ghosts.finish_leg(game_time)
+                        if record is not None:
+                            events.emit('ghost_record', game_time, leg=leg, time=record[0], previous=record[1])
+                            save_ghosts()
                     
                     start_new_delivery()
                 else: 
                     total_score += 20
                     current_beacon_index += 1
+                    events.emit('beacon_reached', game_time, beacon=current_beacon_index, score=total_score)
+
+    # Feature 11: Spike Collisions (swept from the start-of-frame position so a
+    # long sprint/conveyor step can't jump over a spike)
+    collision_distance = PLAYER_RADIUS + SPIKE_RADIUS
+    for index, spike in enumerate(spikes):
+        start = list(player_prev_pos)
+        t = swept_circle_toi(start, player_pos, spike['pos'], collision_distance)
+        if t is None:
+            # Player never touched the spike this frame - reset hit flag
+            spike['hit_player'] = False
+            continue
+        tick_contacts |= CONTACT_SPIKE
 
-    # Feature 11: Spike Collisions
-    for spike in spikes:
-        spike_distance = get_distance(player_pos, spike['pos'])
-        spike_radius = 12  # Spike collision radius
-        collision_distance = PLAYER_RADIUS + spike_radius
-        
-        if spike_distance < collision_distance:
-            if spike.get('is_dangerous', False) and spike['current_height'] > 40:
-                # Spike is up and dangerous - one-time penalty and knockback
-                if not spike.get('hit_player', False):  # Only hit once per spike cycle
-                    time_left -= 3.0  # One-time 3-second penalty
-                    spike['hit_player'] = True
-                    print(f"Spike hit! -3 seconds penalty. Time left: {time_left:.1f}")
-                
-                # Strong knockback every frame while touching dangerous spike
-                angle_to_spike = math.atan2(spike['pos'][0] - player_pos[0], spike['pos'][2] - player_pos[2])
-                knockback_distance = 80  # Strong immediate knockback
-                player_pos[0] -= math.sin(angle_to_spike) * knockback_distance * delta_time
-                player_pos[2] -= math.cos(angle_to_spike) * knockback_distance * delta_time
-            else:
-                # Spike is down or transitioning - solid collision (can't pass through)
-                # Reset hit flag when spike is safe
-                spike['hit_player'] = False
-                
-                # Calculate overlap and push player out
-                overlap = collision_distance - spike_distance
-                if overlap > 0:
-                    angle_to_spike = math.atan2(spike['pos'][0] - player_pos[0], spike['pos'][2] - player_pos[2])
-                    # Push player away from spike center
-                    player_pos[0] -= math.sin(angle_to_spike) * (overlap + 2)
-                    player_pos[2] -= math.cos(angle_to_spike) * (overlap + 2)
+        if t > 0:
+            # Stop at the spike surface instead of wherever the move ended
+            player_pos[0] = start[0] + (player_pos[0] - start[0]) * t
+            player_pos[2] = start[2] + (player_pos[2] - start[2]) * t
+
+        if spike.get('is_dangerous', False) and spike['current_height'] > 40:
+            # Spike is up and dangerous - one-time penalty and knockback
+            if not spike.get('hit_player', False):  # Only hit once per spike cycle
+                time_left -= 3.0  # One-time 3-second penalty
+                spike['hit_player'] = True
+                tick_contacts |= CONTACT_SPIKE_HIT
+                events.emit('spike_hit', game_time, spike=index, time_left=time_left)
+
+            # Strong knockback every frame while touching dangerous spike
+            angle_to_spike = math.atan2(spike['pos'][0] - player_pos[0], spike['pos'][2] - player_pos[2])
+            knockback_distance = 80  # Strong immediate knockback
+            player_pos[0] -= math.sin(angle_to_spike) * knockback_distance * delta_time
+            player_pos[2] -= math.cos(angle_to_spike) * knockback_distance * delta_time
         else:
-            # Player is far from spike - reset hit flag
+            # Spike is down or transitioning - solid collision (can't pass through)
+            # Reset hit flag when spike is safe
             spike['hit_player'] = False
 
-    # Feature 12: Gate Collisions
-    for gate in gates:
-        if not gate['is_open']:
-            gate_distance = get_distance(player_pos, gate['pos'])
-            gate_collision_radius = 30 if gate['orientation'] == 'vertical' else 40
-            collision_distance = PLAYER_RADIUS + gate_collision_radius
-            
-            if gate_distance < collision_distance:
-                # Calculate overlap and push player out completely
-                overlap = collision_distance - gate_distance
-                if overlap > 0:
-                    angle_to_gate = math.atan2(gate['pos'][0] - player_pos[0], gate['pos'][2] - player_pos[2])
-                    # Push player away from gate center
-                    player_pos[0] -= math.sin(angle_to_gate) * (overlap + 5)  # Extra 5 units for solid feeling
-                    player_pos[2] -= math.cos(angle_to_gate) * (overlap + 5)
-                    time_left -= 0.5 * delta_time  # Small penalty for hitting closed gate 
+            # Calculate overlap and push player out
+            spike_distance = get_distance(player_pos, spike['pos'])
+            overlap = collision_distance - spike_distance
+            if overlap > 0:
+                angle_to_spike = math.atan2(spike['pos'][0] - player_pos[0], spike['pos'][2] - player_pos[2])
+                # Push player away from spike center
+                player_pos[0] -= math.sin(angle_to_spike) * (overlap + 2)
+                player_pos[2] -= math.cos(angle_to_spike) * (overlap + 2)
+
+    # Feature 12: Gate Collisions (swept circle vs the gate box drawn in draw_hazards)
+    for index, gate in enumerate(gates):
+        if gate['is_open']:
+            gate['touching'] = False
+        else:
+            if gate['orientation'] == 'vertical':
+                half_x, half_z = GATE_THICKNESS / 2, GATE_LENGTH / 2
+            else:
+                half_x, half_z = GATE_LENGTH / 2, GATE_THICKNESS / 2
+            start = list(player_prev_pos)
+            hit = swept_box_toi(start, player_pos, gate['pos'], half_x, half_z, PLAYER_RADIUS)
+            if hit is None:
+                gate['touching'] = False
+                continue
+            tick_contacts |= CONTACT_GATE
+            if not gate.get('touching', False):
+                gate['touching'] = True     # log the first contact, not every frame of it
+                tick_contacts |= CONTACT_GATE_BUMP
+                events.emit('gate_bump', game_time, gate=index)
+
+            t, nx, nz = hit
+            if t == 0.0:
+                # Gate closed on top of the player - push out along the shortest axis
+                if nx:
+                    player_pos[0] = gate['pos'][0] + nx * (half_x + PLAYER_RADIUS + 5)  # Extra 5 units for solid feeling
+                else:
+                    player_pos[2] = gate['pos'][2] + nz * (half_z + PLAYER_RADIUS + 5)
+            else:
+                resolve_swept_contact(start, t, nx, nz)
+            time_left -= 0.5 * delta_time  # Small penalty for hitting closed gate 
+
+    # Knockback/push-out above must not shove the player through the walls
+    clamp_player_inside_arena(player_pos[0], player_pos[2])
 
     # Feature 14: Bonus Ring Collection
     for ring in bonus_rings[:]: 
@@ -869,42 +1128,209 @@ def handle_collisions_and_interactions(delta_time):
             total_score += score_bonus
             ring['active'] = False
             bonus_rings.remove(ring)
+            events.emit('ring_collected', game_time, multiplier=ring['multiplier'],
+                        score=total_score, time_left=time_left)
+
+def step_physics(delta_time):
+    """Player movement followed by the collision checks that sweep along it."""
+    player_prev_pos[:] = player_pos
+    update_player(delta_time)
+    handle_collisions_and_interactions(delta_time)
+
+def step_hazards(delta_time):
+    """
+    The --multi-rate hazard step. update_game() has already moved game_time to
+    the end of the frame, so the phases are taken at the step's own time.
+    """
+    update_hazards(delta_time, game_time - schedule.step_offset)
+
+def build_schedule():
+    """The --multi-rate subsystems; registration order breaks ties between steps due together."""
+    import scheduler
+    schedule = scheduler.Scheduler()
+    schedule.add('physics', 120, step_physics)
+    schedule.add('hazards', 30, step_hazards)
+    schedule.add('rings', 4, update_bonus_rings)
+    schedule.add('hud', 10, update_hud_text)
+    return schedule
+
+def submit_result():
+    """Sends the current run to the leaderboard (queued; written off-thread), once per run."""
+    global result_submitted
+    if leaderboard is not None and not result_submitted:
+        result_submitted = True
+        leaderboard.submit(total_score, completed_deliveries, get_medal(time_left), difficulty_level,
+                           session_seed, game_time)
+
+def save_game():
+    """Captures the whole run now; the file is written on the save writer's thread."""
+    import savegame
+    data = savegame.dumps(live_state)
+    if save_writer is not None:
+        save_writer.write(save_path, data, report_save)
+        return
+    try:
+        savegame.write_file(save_path, data)
+    except OSError as error:
+        report_save(save_path, error)
+    else:
+        report_save(save_path, None)
+
+def report_save(path, error):
+    """Reports a finished save; runs on the save writer's thread once the file is in place or failed."""
+    if error is None:
+        events.emit('game_saved', game_time, path=path)
+    else:
+        events.emit('save_failed', game_time, path=path, error=str(error))
+
+def save_ghosts():
+    """Queues the ghost store on the save writer, like save_game(); called when a leg sets a new best."""
+    data = ghosts.dumps()
+    if save_writer is not None:
+        save_writer.write(ghosts_path, data, report_ghosts_save)
+        return
+    import savegame
+    try:
+        savegame.write_file(ghosts_path, data)
+    except OSError as error:
+        report_ghosts_save(ghosts_path, error)
+
+def report_ghosts_save(path, error):
+    if error is not None:
+        events.emit('ghost_save_failed', game_time, path=path, error=str(error))
+
+def load_game_state():
+    """Replaces the run with the one in save_path."""
+    global last_frame_time, next_autosave, telemetry_mark
+    import savegame
+    try:
+        savegame.load(live_state, save_path)
+    except (OSError, savegame.SaveError) as error:
+        events.emit('load_failed', game_time, path=save_path, error=str(error))
+        return
+    last_frame_time = time.time()
+    next_autosave = game_time + autosave_interval
+    if telemetry_mark != MARK_RESET:
+        telemetry_mark = MARK_JUMP
+    if rewind is not None:
+        rewind.clear()
+    if ghosts is not None:
+        ghosts.cancel()
+    update_view_state()
+    events.emit('game_loaded', game_time, path=save_path)
 
 def update_game(delta_time):
     """The main update function, called every frame from idle()."""
-    global time_left, game_state, game_time
+    global time_left, game_state, game_time, hazard_alpha, tick_contacts, next_autosave, telemetry_mark
+
+    # Holding B scrubs back through the rewind buffer instead of playing forward
+    if rewind is not None and key_states.get(b'b', False):
+        if rewind.step_back(live_state, delta_time) and telemetry_mark != MARK_RESET:
+            telemetry_mark = MARK_JUMP
+        if schedule is not None:
+            update_hud_text(0.0)    # the scheduler isn't advanced while scrubbing; show the rewound timer/score
+        update_view_state()
+        return
     
     game_time += delta_time 
+    start_x, start_z = player_pos[0], player_pos[2]
+    tick_contacts = 0
 
-    update_player(delta_time)
-    update_hazards(delta_time)
-    update_bonus_rings(delta_time)
-    handle_collisions_and_interactions(delta_time)
+    if schedule is not None:
+        schedule.advance(delta_time)
+        hazard_alpha = schedule.alpha('hazards')
+    else:
+        player_prev_pos[:] = player_pos
+        update_player(delta_time)
+        update_hazards(delta_time)
+        update_bonus_rings(delta_time)
+        handle_collisions_and_interactions(delta_time)
 
     # Feature 8: Update main timer and check for failure
     time_left -= delta_time
     if time_left <= 0:
         time_left = 0
         game_state = 'fail'
-        print("Game Over! You ran out of time.")
+        events.emit('game_over', game_time, score=total_score, deliveries=completed_deliveries)
+        submit_result()
+
+    if telemetry is not None:
+        moved = math.hypot(player_pos[0] - start_x, player_pos[2] - start_z)
+        telemetry.record(game_time, player_pos[0], player_pos[2], moved / delta_time if delta_time > 0 else 0.0,
+                         stamina, current_beacon_index, completed_deliveries, difficulty_level, tick_contacts,
+                         telemetry_mark)
+        telemetry_mark = MARK_NONE
+    if ghosts is not None:
+        ghosts.update(game_time, player_pos[0], player_pos[2], player_angle)
+    if autosave_interval and game_time >= next_autosave:
+        next_autosave = game_time + autosave_interval
+        save_game()
+
+    if heatmap is not None:
+        heatmap.add_time(player_pos[0], player_pos[2], delta_time)
+        if tick_contacts & (CONTACT_SPIKE_HIT | CONTACT_GATE_BUMP):
+            heatmap.add_hit(player_pos[0], player_pos[2])
+
+    if rewind is not None and game_state == 'playing':
+        rewind.record(live_state)
+    update_view_state()
+
+def update_view_state():
+    """
+    Derives heatmap_shown/heatmap_version, ghost_pose and rewind_shown. Runs
+    where the heatmap, ghosts and rewind buffer are written (the simulation
+    thread), so drawing only reads published values.
+    """
+    global heatmap_shown, heatmap_version, ghost_pose, rewind_shown
+    if heatmap is not None and heatmap_layer is not None:
+        heatmap.refresh(heatmap_layer)      # throttled; re-quantises at most every refresh_interval
+        heatmap_shown, heatmap_version = heatmap.shown, heatmap.version
+    else:
+        heatmap_shown = None
+    ghost_pose = ghosts.pose(game_time) if ghosts is not None else None
+    rewind_shown = rewind.available() if rewind is not None and rewind.rewinding else None
 
 
-def keyboardListener(key, x, y):
-    """Handles key down events."""
-    global game_state
-    key_states[key.lower()] = True 
-    key_states[b'shift'] = glutGetModifiers() & GLUT_ACTIVE_SHIFT
+def apply_key(key, pressed, shift):
+    """Applies one key event to the game state (on the simulation thread when there is one)."""
+    global game_state, heatmap_layer
+    key_states[key.lower()] = pressed
+    key_states[b'shift'] = shift
+    if not pressed:
+        return
 
     # Feature 17: Handle single-press actions like pause and reset
     if key == b'p' or key == b'P':
         game_state = 'paused' if game_state == 'playing' else 'playing'
     if key == b'r' or key == b'R':
+        if game_state != 'fail' and completed_deliveries > 0:
+            submit_result()     # a run abandoned after delivering still counts
+        if session_seed is not None:
+            rng.seed(session_seed)
         init_game() 
+    if (key == b'b' or key == b'B') and game_state == 'fail' and rewind is not None and rewind.count:
+        game_state = 'playing'      # rewind out of a game over; update_game() does the scrubbing
+    if (key == b'h' or key == b'H') and heatmap is not None:
+        heatmap_layer = {None: 'time', 'time': 'hits', 'hits': None}[heatmap_layer]
+        update_view_state()
+    if (key == b'm' or key == b'M') and minimap is not None:
+        minimap.visible = not minimap.visible
+
+def keyboardListener(key, x, y):
+    """Handles key down events."""
+    shift = GLUT.glutGetModifiers() & GLUT.GLUT_ACTIVE_SHIFT
+    if sim is not None:
+        sim.post(apply_key, key, True, shift)
+    else:
+        apply_key(key, True, shift)
 
 def keyboardUpListener(key, x, y):
     """Handles key up events."""
-    key_states[key.lower()] = False 
-    key_states[b'shift'] = glutGetModifiers() & GLUT_ACTIVE_SHIFT
+    shift = GLUT.glutGetModifiers() & GLUT.GLUT_ACTIVE_SHIFT
+    if sim is not None:
+        sim.post(apply_key, key, False, shift)
+    else:
+        apply_key(key, False, shift)
 
 def specialKeyListener(key, x, y):
     """
@@ -915,61 +1341,72 @@ def specialKeyListener(key, x, y):
     global camera_pos_fixed, cam_orbit_angle_deg, cam_orbit_radius
     global follow_up, follow_side
 
+    # F5 / F9: save / load the run (on the simulation thread when there is one)
+    if key in (GLUT.GLUT_KEY_F5, GLUT.GLUT_KEY_F9):
+        action = save_game if key == GLUT.GLUT_KEY_F5 else load_game_state
+        if sim is not None:
+            sim.post(action)
+        else:
+            action()
+        return
+
     if camera_mode_is_follow:
         STEP_UP   = 2.5     
         STEP_SIDE = 2.5     
-        if key == GLUT_KEY_UP:    follow_up  += STEP_UP
-        if key == GLUT_KEY_DOWN:  follow_up  -= STEP_UP
-        if key == GLUT_KEY_LEFT:  follow_side -= STEP_SIDE
-        if key == GLUT_KEY_RIGHT: follow_side += STEP_SIDE
+        if key == GLUT.GLUT_KEY_UP:    follow_up  += STEP_UP
+        if key == GLUT.GLUT_KEY_DOWN:  follow_up  -= STEP_UP
+        if key == GLUT.GLUT_KEY_LEFT:  follow_side -= STEP_SIDE
+        if key == GLUT.GLUT_KEY_RIGHT: follow_side += STEP_SIDE
         follow_up  = max(10.0, min(120.0, follow_up))
         follow_side = max(-50.0, min(50.0, follow_side))
     else:
         STEP_Y   = 30.0     
         STEP_ANG = 3.0      
-        if key == GLUT_KEY_UP:    camera_pos_fixed[1] += STEP_Y
-        if key == GLUT_KEY_DOWN:  camera_pos_fixed[1] -= STEP_Y
+        if key == GLUT.GLUT_KEY_UP:    camera_pos_fixed[1] += STEP_Y
+        if key == GLUT.GLUT_KEY_DOWN:  camera_pos_fixed[1] -= STEP_Y
         camera_pos_fixed[1] = max(60.0, min(1500.0, camera_pos_fixed[1]))
-        if key == GLUT_KEY_LEFT:  cam_orbit_angle_deg += STEP_ANG
-        if key == GLUT_KEY_RIGHT: cam_orbit_angle_deg -= STEP_ANG
+        if key == GLUT.GLUT_KEY_LEFT:  cam_orbit_angle_deg += STEP_ANG
+        if key == GLUT.GLUT_KEY_RIGHT: cam_orbit_angle_deg -= STEP_ANG
         Update_fixed_cam_from_orbit()
 
-    glutPostRedisplay()
+    GLUT.glutPostRedisplay()
 
 def mouseListener(button, state, x, y):
     """Feature 2: Handles mouse clicks."""
     global camera_mode_is_follow, follow_eye, follow_ctr
-    if button == GLUT_RIGHT_BUTTON and state == GLUT_DOWN:
+    if button == GLUT.GLUT_RIGHT_BUTTON and state == GLUT.GLUT_DOWN:
         camera_mode_is_follow = not camera_mode_is_follow       
         if camera_mode_is_follow:
             tgt_eye, tgt_ctr = Compute_follow_targets()
             follow_eye[:] = list(tgt_eye)
             follow_ctr[:] = list(tgt_ctr)
-        glutPostRedisplay()
+        GLUT.glutPostRedisplay()
 
 def setupCamera():
     """Feature 2: Configures the camera's projection and view settings."""
-    glMatrixMode(GL_PROJECTION)
-    glLoadIdentity()
-    gluPerspective(75, (WINDOW_WIDTH / WINDOW_HEIGHT), 0.1, 2000.0)
-
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
+    global last_camera_time
+    now = time.perf_counter()
+    dt = 1.0 / camera.REFERENCE_FPS if last_camera_time is None else min(now - last_camera_time, 0.25)
+    last_camera_time = now
 
     if camera_mode_is_follow:
         tgt_eye, tgt_ctr = Compute_follow_targets()
-        s = follow_smooth
+        s = camera.smoothing(follow_smooth, dt)
         for i in range(3):
             follow_eye[i] = follow_eye[i]*(1.0 - s) + tgt_eye[i]*s
             follow_ctr[i] = follow_ctr[i]*(1.0 - s) + tgt_ctr[i]*s
+            # Settle exactly once within a hair, so a parked camera stops rebuilding its view matrix
+            if abs(follow_eye[i] - tgt_eye[i]) < 1e-3:
+                follow_eye[i] = tgt_eye[i]
+            if abs(follow_ctr[i] - tgt_ctr[i]) < 1e-3:
+                follow_ctr[i] = tgt_ctr[i]
 
-        gluLookAt(follow_eye[0], follow_eye[1], follow_eye[2],
-                  follow_ctr[0], follow_ctr[1], follow_ctr[2],
-                  0, 1, 0)
+        eye, center = follow_eye, follow_ctr
     else:
-        gluLookAt(camera_pos_fixed[0], camera_pos_fixed[1], camera_pos_fixed[2],
-                  0, 0, 0,
-                  0, 1, 0)
+        eye, center = camera_pos_fixed, (0, 0, 0)
+
+    main_camera.look_at(eye, center)
+    renderer.load_camera(main_camera.projection, main_camera.view, main_camera.eye)
 
 def idle():
     """
@@ -982,18 +1419,22 @@ def idle():
     delta_time = current_time - last_frame_time
     last_frame_time = current_time
 
-    if game_state == 'playing':
+    # With --sim-thread the game updates itself at a fixed rate; only redraw here
+    if sim is None and game_state == 'playing':
         update_game(delta_time)
 
-    glutPostRedisplay()
+    GLUT.glutPostRedisplay()
 
-def showScreen():
-    """The main display function, responsible for all rendering."""
-    # Feature 7: Clear the screen and enable depth testing
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    glEnable(GL_DEPTH_TEST) # Feature 7: Depth Test On - Ensure 3D objects occlude each other correctly
-    glEnable(GL_BLEND) 
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+def render_frame(state=None):
+    """
+    Draws one complete frame through the active renderer (no buffer swap),
+    from state (a sim_thread snapshot) or, by default, the live globals.
+    """
+    global view
+    view = state if state is not None else live_state
+
+    # Feature 7: Clear the screen and enable depth testing (+ alpha blending)
+    renderer.begin_frame()
 
     # Feature 2: Set up the camera
     setupCamera()
@@ -1004,32 +1445,192 @@ def showScreen():
     draw_beacons()      # Feature 6: Ordered Checkpoints & Drop Zone
     draw_hazards()      # Feature 11: Pop-Up Spikes & Feature 12: Dynamic Route Gates
     draw_bonus_rings()  # Feature 14: Bonus Rings
+    draw_ghost()        # Best run of this leg; translucent, so after the opaque geometry
 
-    glDisable(GL_DEPTH_TEST)
+    renderer.depth_test(False)
     draw_hud()          # Feature 8: Global Timer + Medals, Feature 4: Sprint + Stamina Bar, etc.
-    glEnable(GL_DEPTH_TEST)
+    renderer.depth_test(True)
 
-    glutSwapBuffers()
+    renderer.end_frame()
+
+def showScreen():
+    """The main display function, responsible for all rendering."""
+    render_frame(sim.latest() if sim is not None else None)
+    if gl_stats_log is not None:
+        gl_stats_log.write(renderer.gl_stats())
+    GLUT.glutSwapBuffers()
+    if startup_report is not None:
+        report_startup()
+
+def mark_startup(phase):
+    """Ends a --startup-report phase (no-op without the flag)."""
+    if startup_report is not None:
+        startup_report.mark(phase)
+
+def report_startup():
+    """Ends --startup-report at the first frame on screen and prints it."""
+    global startup_report
+    startup_report.mark('first frame')
+    print(startup_report.format())
+    startup_report = None
+
+def on_shutdown(fn, *args):
+    """Registers fn(*args) to run at shutdown (before the ones registered earlier)."""
+    shutdown_hooks.append((fn, args))
+
+def shutdown():
+    """Runs the shutdown hooks once; from the window-close callback, or atexit for other exits."""
+    global shutdown_hooks
+    hooks, shutdown_hooks = shutdown_hooks, []
+    for fn, args in reversed(hooks):
+        try:
+            fn(*args)
+        except Exception as error:      # one failing writer must not keep the others from flushing
+            print(f"shutdown: {getattr(fn, '__qualname__', fn)} failed: {error}", file=sys.stderr)
+
+def on_window_close():
+    """glutCloseFunc: the window's close button, the only way to quit."""
+    global window_closed
+    window_closed = True
+    shutdown()
 
 def main():
     """Initializes GLUT and starts the main application loop."""
-    glutInit()
-    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
-    glutInitWindowSize(WINDOW_WIDTH, WINDOW_HEIGHT)
-    glutInitWindowPosition(100, 100)
-    glutCreateWindow(b"Courier Run 3D - Complete Features 1-18")
-
-    # Feature 7: Enable depth testing
-    glEnable(GL_DEPTH_TEST)
-
-    glutDisplayFunc(showScreen)
-    glutIdleFunc(idle)
-    glutKeyboardFunc(keyboardListener)
-    glutKeyboardUpFunc(keyboardUpListener) 
-    glutSpecialFunc(specialKeyListener)
-    glutMouseFunc(mouseListener)
-
+    global renderer, hazard_pipeline, show_gl_stats, gl_stats_log, sim, schedule, events, telemetry, heatmap
+    global leaderboard, session_seed, save_path, save_writer, autosave_interval, next_autosave, rewind, ghosts, ghosts_path
+    global GLUT, startup_report, minimap
+    main_started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Courier Run 3D")
+    parser.add_argument('--renderer', default='immediate', choices=sorted(render_backends.RENDERERS),
+                        help="render backend (null = draw nothing, for benchmarks)")
+    parser.add_argument('--hazard-shader', action='store_true',
+                        help="animate spikes and gates in a GLSL vertex shader")
+    parser.add_argument('--gl-stats', action='store_true', help="show per-frame GL call counts in the HUD")
+    parser.add_argument('--gl-stats-log', metavar='PATH', help="write per-frame GL call counts to a CSV file")
+    parser.add_argument('--sim-thread', action='store_true',
+                        help="run the simulation on its own thread at a fixed rate")
+    parser.add_argument('--sim-rate', type=float, default=60.0, help="simulation ticks per second with --sim-thread")
+    parser.add_argument('--event-log', metavar='PATH',
+                        help="also write game events as JSON lines to PATH (rotated at 4 MB)")
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help="record per-tick telemetry to PATH (see telemetry_query.py)")
+    parser.add_argument('--heatmap', metavar='PATH',
+                        help="add this session to the heatmap in PATH (H toggles the floor overlay)")
+    parser.add_argument('--leaderboard', metavar='PATH', default='leaderboard.sqlite3',
+                        help="SQLite file finished runs are recorded in (default %(default)s)")
+    parser.add_argument('--no-leaderboard', action='store_true', help="don't record runs")
+    parser.add_argument('--seed', type=int, help="layout seed; R replays the same layout")
+    parser.add_argument('--ghosts', metavar='PATH', default='ghosts.bin',
+                        help="best track per delivery leg of each seed (default %(default)s)")
+    parser.add_argument('--no-ghost', action='store_true', help="don't record or show ghosts")
+    parser.add_argument('--save-file', metavar='PATH', default=save_path,
+                        help="file F5 saves to and F9 loads from (default %(default)s)")
+    parser.add_argument('--autosave', type=float, default=0.0, metavar='SECONDS',
+                        help="also save every SECONDS of game time (0 = off)")
+    parser.add_argument('--load', action='store_true', help="start from the save file")
+    parser.add_argument('--rewind-seconds', type=float, default=10.0, metavar='SECONDS',
+                        help="how far holding B can rewind (0 = off)")
+    parser.add_argument('--minimap-rate', type=float, default=5.0, metavar='HZ',
+                        help="minimap repaints per second of game time (default %(default)s)")
+    parser.add_argument('--no-minimap', action='store_true', help="don't show the minimap")
+    parser.add_argument('--multi-rate', action='store_true',
+                        help="step physics, hazards, rings and HUD text at their own rates (scheduler.py)")
+    parser.add_argument('--async-loop', action='store_true',
+                        help="pump GLUT from an asyncio event loop instead of glutMainLoop()")
+    parser.add_argument('--fps', type=float, default=60.0, help="frame rate for --async-loop")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print how long each startup step took, up to the first frame")
+    args = parser.parse_args()
+
+    if args.startup_report:
+        import startup
+        startup_report = startup.StartupReport(script_started)
+        startup_report.mark('imports', main_started)
+        startup_report.mark('arguments')
+
+    from OpenGL import GLUT
+    mark_startup('import OpenGL.GLUT')
+    GLUT.glutInit()
+    mark_startup('glutInit')
+    GLUT.glutInitDisplayMode(GLUT.GLUT_DOUBLE | GLUT.GLUT_RGB | GLUT.GLUT_DEPTH)
+    GLUT.glutInitWindowSize(WINDOW_WIDTH, WINDOW_HEIGHT)
+    GLUT.glutInitWindowPosition(100, 100)
+    GLUT.glutCreateWindow(b"Courier Run 3D - Complete Features 1-18")
+    if GLUT.glutSetOption:
+        # freeglut: return from glutMainLoop() on close (its default is exit()) and flush files first
+        GLUT.glutSetOption(GLUT.GLUT_ACTION_ON_WINDOW_CLOSE, GLUT.GLUT_ACTION_GLUTMAINLOOP_RETURNS)
+        GLUT.glutCloseFunc(on_window_close)
+    atexit.register(shutdown)
+    mark_startup('window')
+
+    renderer = render_backends.create_renderer(args.renderer, WINDOW_WIDTH, WINDOW_HEIGHT)
+    if args.hazard_shader and renderer.name != 'null':
+        import hazard_shader
+        hazard_pipeline = hazard_shader.HazardShaderPipeline(SPIKE_RADIUS, GATE_LENGTH, GATE_THICKNESS)
+    mark_startup('renderer')
+    show_gl_stats = args.gl_stats
+    if args.gl_stats_log:
+        import gl_state
+        gl_stats_log = gl_state.StatsLog(args.gl_stats_log)
+
+    GLUT.glutDisplayFunc(showScreen)
+    if not args.async_loop:
+        GLUT.glutIdleFunc(idle)      # the asyncio pump calls idle() itself, once per frame
+    GLUT.glutKeyboardFunc(keyboardListener)
+    GLUT.glutKeyboardUpFunc(keyboardUpListener) 
+    GLUT.glutSpecialFunc(specialKeyListener)
+    GLUT.glutMouseFunc(mouseListener)
+
+    events = event_log.EventLog(args.event_log)
+    on_shutdown(events.close)
+    if args.telemetry:
+        import telemetry as telemetry_module
+        telemetry = telemetry_module.TelemetryWriter(args.telemetry, meta={'started': time.time()})
+        on_shutdown(telemetry.close)
+    if args.heatmap:
+        import heatmap as heatmap_module
+        if os.path.exists(args.heatmap):
+            heatmap = heatmap_module.Heatmap.load(args.heatmap)
+        else:
+            heatmap = heatmap_module.Heatmap(TILE_SIZE, ARENA_SIZE // TILE_SIZE + 1)
+        heatmap.sessions += 1
+        on_shutdown(heatmap.save, args.heatmap)
+    if not args.no_leaderboard:
+        import leaderboard as leaderboard_module
+        leaderboard = leaderboard_module.Leaderboard(args.leaderboard)
+        on_shutdown(leaderboard.close)     # drains the queue, so a run submitted just before closing is kept
+    if args.seed is not None:
+        session_seed = args.seed
+        rng.seed(session_seed)
+    if not args.no_ghost:
+        import ghost
+        ghosts_path = args.ghosts
+        ghosts = ghost.GhostStore.load(ghosts_path) if os.path.exists(ghosts_path) else ghost.GhostStore()
+        on_shutdown(ghosts.save, ghosts_path)
+    if args.multi_rate:
+        schedule = build_schedule()
+    if not args.no_minimap and args.minimap_rate > 0:
+        import minimap as minimap_module
+        minimap = minimap_module.Minimap(ARENA_SIZE, rate=args.minimap_rate, spike_radius=SPIKE_RADIUS,
+                                         gate_size=(GATE_LENGTH, GATE_THICKNESS))
+    if args.rewind_seconds > 0:
+        import rewind as rewind_module
+        rewind = rewind_module.RewindBuffer(args.rewind_seconds, args.sim_rate if args.sim_thread else 60.0)
+    mark_startup('logs, leaderboard, ghosts')
     init_game() 
+    mark_startup('init_game')
+    import savegame
+    save_path = args.save_file
+    save_writer = savegame.SaveWriter()
+    on_shutdown(save_writer.close)      # writes a save still queued when the window closes
+    autosave_interval = next_autosave = args.autosave
+    if args.load:
+        load_game_state()
+    if args.sim_thread:
+        import sim_thread
+        sim = sim_thread.SimThread(sys.modules[__name__], rate=args.sim_rate)
+        sim.start()
+        on_shutdown(sim.stop)       # registered last, so it stops before anything is flushed
 
     print("--- Courier Run 3D - Features 1-18 ---")
     print("Controls:")
@@ -1042,6 +1643,15 @@ def main():
     print("Arrow Keys: Adjust Camera")
     print("P: Pause Game")
     print("R: Reset Game")
+    print("F5 / F9: Save / Load")
+    if rewind is not None:
+        print(f"B (hold): Rewind up to {rewind.seconds:g} s")
+    if ghosts is not None and session_seed is None:
+        print("Ghost: start with --seed N to race your best time on each delivery leg")
+    if heatmap is not None:
+        print("H: Heatmap Overlay (time / hits / off)")
+    if minimap is not None:
+        print("M: Minimap")
     print("")
     print("Features Implemented:")
     print("1-6: Arena, Camera, Player, Sprint, Packages, Beacons")
@@ -1049,8 +1659,14 @@ def main():
     print("10: Sticky Tiles, 11: Spikes, 12: Gates")
     print("13: HUD Arrow, 14: Bonus Rings, 15: Package Interaction")
     print("16: Clean-Turn Combo, 17: Pause/Reset, 18: Difficulty Scaling")
-    
-    glutMainLoop()
+    mark_startup('save writer, sim thread')
+
+    if args.async_loop:
+        import async_loop
+        # Frame budget summaries only go to an --event-log file; nothing is printed per frame
+        async_loop.run(sys.modules[__name__], fps=args.fps, report_every=5.0 if args.event_log else None)
+    else:
+        GLUT.glutMainLoop()
 
 if __name__ == "__main__":
     main()
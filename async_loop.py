@@ -0,0 +1,92 @@
+"""
+asyncio main loop (--async-loop).
+
+Instead of handing control to glutMainLoop(), which never returns, pump()
+runs one GLUT iteration per frame from an asyncio event loop. Each
+iteration is the game's idle() plus glutMainLoopEvent(), which delivers
+input and redraws. pump() then awaits until the next frame is due. The
+rest of the frame belongs to the event loop. run() takes coroutines to run
+there between frames without threads; the game itself passes none yet, so
+for now this is only a different way to pace frames:
+
+    async_loop.run(game, fps=60, coroutines=[my_coroutine()])
+
+FrameBudget records how each frame was spent: GLUT work (simulation +
+drawing), time the event loop held control, and the part of that beyond
+the planned sleep (coroutines running long or slow wake-ups). With
+report_every set, a summary goes to the game's event log as a
+'frame_budget' event every report_every seconds (off by default; it is
+written to --event-log files, not printed).
+"""
+import asyncio
+import time
+
+
+class FrameBudget:
+    """Rolling per-frame split between GLUT work and the asyncio loop, in seconds."""
+
+    def __init__(self, fps, window=120):
+        self.period = 1.0 / fps
+        self.window = window
+        self.frames = []        # (glut, loop, planned sleep)
+
+    def record(self, glut, loop, sleep):
+        self.frames.append((glut, loop, sleep))
+        if len(self.frames) > self.window:
+            del self.frames[0]
+
+    def summary(self):
+        """Averages in milliseconds plus the fraction of frames that overran the budget."""
+        n = len(self.frames)
+        if not n:
+            return {}
+        glut = sum(f[0] for f in self.frames) / n
+        loop = sum(f[1] for f in self.frames) / n
+        busy = sum(max(0.0, f[1] - f[2]) for f in self.frames) / n
+        over = sum(1 for f in self.frames if f[0] + f[1] > self.period * 1.05) / n
+        return {'budget_ms': self.period * 1000, 'frame_ms': (glut + loop) * 1000,
+                'glut_ms': glut * 1000, 'loop_ms': loop * 1000, 'loop_busy_ms': busy * 1000,
+                'loop_share': loop / (glut + loop), 'overrun': over}
+
+
+async def pump(game, fps=60.0, budget=None, report_every=None, events=None, stop=None):
+    """
+    Frame-paced GLUT pump. events defaults to glutMainLoopEvent; stop is an
+    optional asyncio.Event that ends the loop, as does closing the window.
+    """
+    if events is None:
+        from OpenGL.GLUT import glutMainLoopEvent as events
+    budget = budget or FrameBudget(fps)
+    period = 1.0 / fps
+    next_frame = time.perf_counter()
+    next_report = next_frame + report_every if report_every else None
+    while not game.window_closed and (stop is None or not stop.is_set()):
+        start = time.perf_counter()
+        game.idle()
+        events()
+        glut_done = time.perf_counter()
+
+        next_frame += period
+        if next_frame < glut_done:
+            next_frame = glut_done      # behind schedule: yield once, don't build a backlog
+        sleep = next_frame - glut_done
+        await asyncio.sleep(sleep)
+        resumed = time.perf_counter()
+        budget.record(glut_done - start, resumed - glut_done, sleep)
+
+        if next_report is not None and resumed >= next_report:
+            game.events.emit('frame_budget', game.game_time, **budget.summary())
+            next_report = resumed + report_every
+    return budget
+
+
+def run(game, fps=60.0, coroutines=(), report_every=None):
+    """Runs pump() and the given coroutines on a fresh event loop until the window closes."""
+    async def main():
+        tasks = [asyncio.create_task(coro) for coro in coroutines]
+        try:
+            await pump(game, fps, report_every=report_every)
+        finally:
+            for task in tasks:
+                task.cancel()
+    asyncio.run(main())
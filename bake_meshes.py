@@ -0,0 +1,180 @@
+"""
+Mesh asset bake: the renderer's unit primitives as memory-mapped .npy files.
+
+The retained backend draws every cube, sphere and cylinder (courier, packages,
+beacons, spikes, gates, ring beads) by scaling a unit mesh from UNIT_MESHES.
+This bakes those meshes at each tessellation level in LEVELS. Each one is
+an indexed pair of .npy files:
+  - NAME.vertices.npy: float32, shape (n, 3)
+  - NAME.indices.npy: uint16 or uint32, the triangles
+manifest.json maps renderer keys to the files.
+
+The manifest also records a hash of the inputs: the mesh keys, the bake
+format and meshes.py itself. bake() does nothing while the hash matches.
+load() ignores a cache whose hash no longer matches, so a stale bake is
+never drawn; the renderer tessellates in Python as before.
+
+load() maps each file copy-on-write and returns ctypes arrays over the
+mapping. glBufferData() reads the file pages directly, so nothing is
+copied or parsed in Python. The files are standard NumPy .npy (format
+1.0). They are written and read here without NumPy, and np.load(...,
+mmap_mode='r') opens them too.
+
+    python bake_meshes.py             # bake into mesh_cache/ if out of date
+    python bake_meshes.py --force     # bake regardless
+"""
+import argparse
+import ast
+import ctypes
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+
+import meshes
+
+FORMAT_VERSION = 1
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mesh_cache')
+LEVELS = (6, 8, 10, 12, 16, 20, 24, 32)
+
+NPY_MAGIC = b'\x93NUMPY'
+# array typecode -> .npy descr -> ctypes element type
+DESCR = {'f': '<f4', 'H': '<u2', 'I': '<u4'}
+CTYPES = {'<f4': ctypes.c_float, '<u2': ctypes.c_uint16, '<u4': ctypes.c_uint32}
+
+
+def mesh_specs():
+    """[(renderer key, build)] for every baked mesh."""
+    import render_backends
+    specs = [render_backends.UNIT_MESHES['cube'](None)]
+    for slices in LEVELS:
+        specs.append(render_backends.UNIT_MESHES['sphere'](slices))
+        specs.append(render_backends.UNIT_MESHES['cylinder'](slices))
+    return specs
+
+
+def content_hash(specs):
+    digest = hashlib.sha256()
+    digest.update(repr((FORMAT_VERSION, [key for key, _ in specs])).encode())
+    with open(meshes.__file__, 'rb') as file:
+        digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def file_stem(key):
+    return '-'.join(str(part) for part in key)
+
+
+# --- .npy -----------------------------------------------------------------
+def write_npy(path, data, shape):
+    """Writes array data as a little-endian .npy of the given shape."""
+    if sys.byteorder != 'little':
+        data = array(data.typecode, data)
+        data.byteswap()
+    header = repr({'descr': DESCR[data.typecode], 'fortran_order': False, 'shape': tuple(shape)})
+    # Pad so the data starts on a 64-byte boundary, as NumPy does
+    header += ' ' * (-(len(NPY_MAGIC) + 4 + len(header) + 1) % 64) + '\n'
+    with open(path, 'wb') as file:
+        file.write(NPY_MAGIC + b'\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1'))
+        data.tofile(file)
+
+
+def map_npy(path):
+    """A ctypes array over the data of a format 1.0 .npy, memory-mapped copy-on-write."""
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    if mapping[:6] != NPY_MAGIC or mapping[6] != 1:
+        raise ValueError(f"{path}: not a version 1 .npy file")
+    length = int.from_bytes(mapping[8:10], 'little')
+    header = ast.literal_eval(mapping[10:10 + length].decode('latin1'))
+    if header['descr'] not in CTYPES or header['fortran_order'] or sys.byteorder != 'little':
+        raise ValueError(f"{path}: unsupported layout {header['descr']}")
+    count = 1
+    for size in header['shape']:
+        count *= size
+    # from_buffer keeps the mapping alive for as long as the array is
+    return (CTYPES[header['descr']] * count).from_buffer(mapping, 10 + length)
+
+
+# --- bake / load ----------------------------------------------------------
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, 'manifest.json')) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def bake(directory=DEFAULT_DIR, force=False):
+    """Writes the cache if its inputs changed; returns the number of meshes baked (0 = up to date)."""
+    specs = mesh_specs()
+    digest = content_hash(specs)
+    manifest = read_manifest(directory)
+    if not force and manifest is not None and manifest['hash'] == digest and all(
+            os.path.exists(os.path.join(directory, entry[name]))
+            for entry in manifest['meshes'] for name in ('vertices', 'indices')):
+        return 0
+
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    for key, build in specs:
+        vertices, indices = meshes.index_mesh(build())
+        stem = file_stem(key)
+        entry = {'key': list(key), 'vertices': stem + '.vertices.npy', 'indices': stem + '.indices.npy'}
+        write_npy(os.path.join(directory, entry['vertices']), vertices, (len(vertices) // 3, 3))
+        write_npy(os.path.join(directory, entry['indices']), indices, (len(indices),))
+        entries.append(entry)
+    # Files of meshes that are no longer baked
+    if manifest is not None:
+        current = {entry[name] for entry in entries for name in ('vertices', 'indices')}
+        for entry in manifest['meshes']:
+            for name in ('vertices', 'indices'):
+                if entry[name] not in current:
+                    try:
+                        os.remove(os.path.join(directory, entry[name]))
+                    except OSError:
+                        pass
+    # The manifest goes last: a bake interrupted before this point leaves the old hash, so it reruns
+    tmp = os.path.join(directory, 'manifest.json.tmp')
+    with open(tmp, 'w') as file:
+        json.dump({'hash': digest, 'meshes': entries}, file, indent=1)
+    os.replace(tmp, os.path.join(directory, 'manifest.json'))
+    return len(entries)
+
+
+def load(directory=DEFAULT_DIR):
+    """{renderer key: (vertices, indices)} from an up-to-date cache, else {}."""
+    manifest = read_manifest(directory)
+    if manifest is None or manifest['hash'] != content_hash(mesh_specs()):
+        return {}
+    try:
+        return {tuple(entry['key']): (map_npy(os.path.join(directory, entry['vertices'])),
+                                      map_npy(os.path.join(directory, entry['indices'])))
+                for entry in manifest['meshes']}
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bake the renderer's unit meshes into .npy files.")
+    parser.add_argument('--dir', default=DEFAULT_DIR, help="cache directory (default %(default)s)")
+    parser.add_argument('--force', action='store_true', help="bake even if the cache is up to date")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    baked = bake(args.dir, args.force)
+    if not baked:
+        print(f"{args.dir}: up to date")
+        return
+    print(f"{args.dir}: baked {baked} meshes in {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    cache = load(args.dir)
+    print(f"  mapped in {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{sum(ctypes.sizeof(v) + ctypes.sizeof(i) for v, i in cache.values()) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Balance sweep over the game's tuning constants.
+
+Every combination of the given parameter values is played by the scripted
+courier (courier_env.scripted_action) over a set of seeds in headless
+sessions spread across a process pool. A session ends when the courier has
+made --deliveries deliveries (completed), runs out of time, or hits
+--max-time seconds of game time. Results are one row per combination:
+
+    python balance_sweep.py -p PLAYER_SPEED_SPRINT=250,275 -p START_TIME=120,156 --seeds 32
+
+Any module-level constant of the game can be swept (PLAYER_SPEED_NORMAL,
+STAMINA_DRAIN_RATE, spike_cycle_time, gate_cycle_time,
+bonus_ring_spawn_interval, SPIKE_DIFFICULTY_SPEEDUP, ...).
+"""
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import courier_env
+
+MEDALS = ["GOLD", "SILVER", "BRONZE", "NO MEDAL"]
+
+_env = None
+
+
+def parse_param(text):
+    """'NAME=v1,v2,...' -> (NAME, [v1, v2, ...])"""
+    name, _, values = text.partition('=')
+    if not name or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,... got {text!r}")
+    return name.strip(), [float(v) for v in values.split(',')]
+
+
+def _init_worker():
+    global _env
+    _env = courier_env.CourierEnv()
+
+
+def run_session(task):
+    """Plays one headless session; returns (combo_index, completed, deliveries, game_time, medal)."""
+    combo_index, params, seed, dt, target, max_time = task
+    game = _env.game
+    for name, value in params.items():
+        if not hasattr(game, name):
+            raise AttributeError(f"game has no tuning constant {name!r}")
+        setattr(game, name, value)
+
+    _env.dt = dt
+    obs = _env.reset(seed)
+    while game.completed_deliveries < target and game.game_time < max_time:
+        obs, _, terminated, _, _ = _env.step(courier_env.scripted_action(obs))
+        if terminated:
+            break
+
+    completed = game.completed_deliveries >= target
+    medal = game.get_medal(game.time_left) if completed else "NO MEDAL"
+    return combo_index, completed, game.completed_deliveries, game.game_time, medal
+
+
+def sweep(grid, seeds, dt=courier_env.DEFAULT_DT, target=3, max_time=600.0, workers=None):
+    """Runs the full grid; returns (names, rows) where each row is (values, stats dict)."""
+    names = list(grid)
+    combos = list(itertools.product(*(grid[n] for n in names)))
+    tasks = [(i, dict(zip(names, combo)), seed, dt, target, max_time)
+             for i, combo in enumerate(combos) for seed in seeds]
+
+    stats = [{'sessions': 0, 'completed': 0, 'deliveries': 0, 'game_time': 0.0,
+              'medals': dict.fromkeys(MEDALS, 0)} for _ in combos]
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with mp.Pool(workers, initializer=_init_worker) as pool:
+        for combo_index, completed, deliveries, game_time, medal in \
+                pool.imap_unordered(run_session, tasks, chunksize):
+            s = stats[combo_index]
+            s['sessions'] += 1
+            s['completed'] += completed
+            s['deliveries'] += deliveries
+            s['game_time'] += game_time
+            s['medals'][medal] += 1
+    return names, list(zip(combos, stats))
+
+
+def format_table(names, rows, sep='\t'):
+    header = names + ['sessions', 'completion', 'deliv_per_min'] + [m.lower().replace(' ', '_') for m in MEDALS]
+    lines = [sep.join(header)]
+    for values, s in rows:
+        minutes = s['game_time'] / 60.0
+        cells = [f"{v:g}" for v in values]
+        cells += [str(s['sessions']),
+                  f"{s['completed'] / s['sessions']:.3f}",
+                  f"{s['deliveries'] / minutes if minutes else 0.0:.2f}"]
+        cells += [f"{s['medals'][m] / s['sessions']:.3f}" for m in MEDALS]
+        lines.append(sep.join(cells))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-p', '--param', type=parse_param, action='append', default=[],
+                        help="NAME=v1,v2,... (repeatable)")
+    parser.add_argument('--seeds', type=int, default=16, help="sessions per combination")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--deliveries', type=int, default=3, help="deliveries that count as completion")
+    parser.add_argument('--max-time', type=float, default=600.0, help="game-time cap per session (s)")
+    parser.add_argument('--tick-rate', type=float, default=1.0 / courier_env.DEFAULT_DT)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', help="also write the table to this TSV file")
+    args = parser.parse_args(argv)
+
+    grid = dict(args.param) or {'PLAYER_SPEED_SPRINT': [250.0]}
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    start = time.perf_counter()
+    names, rows = sweep(grid, seeds, 1.0 / args.tick_rate, args.deliveries, args.max_time, args.workers)
+    elapsed = time.perf_counter() - start
+
+    table = format_table(names, rows)
+    print(table)
+    print(f"# {sum(s['sessions'] for _, s in rows)} sessions in {elapsed:.1f}s", file=sys.stderr)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(table + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Feature 2 camera with cached matrices.
+
+Camera holds the projection and view matrices (column-major 16-tuples, as
+glLoadMatrixf takes them). set_projection() and look_at() recompute them only
+when their inputs actually change, and version goes up on every change.
+Callers that derive data from the camera (frustum planes here, culling or
+picking elsewhere) can key their caches on it.
+
+smoothing() turns the follow camera's per-frame lerp factor into a
+per-elapsed-time one. Smoothing then looks the same at 30 and at 144 FPS.
+"""
+import math
+
+import render_queue
+
+# follow_smooth and similar factors are tuned as "fraction per frame at this rate"
+REFERENCE_FPS = 60.0
+
+
+def smoothing(fraction, dt, reference_fps=REFERENCE_FPS):
+    """Lerp factor that applies fraction-per-reference-frame over dt seconds (exponential decay)."""
+    return 1.0 - (1.0 - fraction) ** (dt * reference_fps)
+
+
+def perspective(fovy, aspect, near, far):
+    """Same matrix as gluPerspective()."""
+    f = 1.0 / math.tan(math.radians(fovy) / 2.0)
+    depth = near - far
+    return (f / aspect, 0.0, 0.0, 0.0,
+            0.0, f, 0.0, 0.0,
+            0.0, 0.0, (far + near) / depth, -1.0,
+            0.0, 0.0, 2.0 * far * near / depth, 0.0)
+
+
+class Camera:
+    def __init__(self, fovy, aspect, near, far, up=(0.0, 1.0, 0.0)):
+        self.up = tuple(up)
+        self.eye = None
+        self.center = None
+        self.projection_params = None
+        self.projection = None
+        self.view = render_queue.IDENTITY
+        self.version = 0
+        self._planes = None
+        self._planes_version = -1
+        self.set_projection(fovy, aspect, near, far)
+
+    def set_projection(self, fovy, aspect, near, far):
+        params = (fovy, aspect, near, far)
+        if params == self.projection_params:
+            return False
+        self.projection_params = params
+        self.projection = perspective(*params)
+        self.version += 1
+        return True
+
+    def look_at(self, eye, center):
+        """Points the camera; returns True when the view matrix had to be rebuilt."""
+        eye, center = tuple(eye), tuple(center)
+        if eye == self.eye and center == self.center:
+            return False
+        self.eye, self.center = eye, center
+        self.view = render_queue.look_at(eye, center, self.up)
+        self.version += 1
+        return True
+
+    @property
+    def view_projection(self):
+        return render_queue.mat_mul(self.projection, self.view)
+
+    def frustum_planes(self):
+        """Six (a, b, c, d) world-space planes, inside where a*x + b*y + c*z + d >= 0."""
+        if self._planes_version != self.version:
+            m = self.view_projection
+            rows = [(m[i], m[4 + i], m[8 + i], m[12 + i]) for i in range(4)]
+            planes = []
+            for axis in range(3):
+                for sign in (1.0, -1.0):
+                    plane = tuple(rows[3][k] + sign * rows[axis][k] for k in range(4))
+                    length = math.sqrt(plane[0] ** 2 + plane[1] ** 2 + plane[2] ** 2)
+                    planes.append(tuple(v / length for v in plane))
+            self._planes = planes
+            self._planes_version = self.version
+        return self._planes
+
+    def sphere_visible(self, center, radius):
+        x, y, z = center
+        return all(a * x + b * y + c * z + d >= -radius for a, b, c, d in self.frustum_planes())
+
+    def screen_ray(self, x, y, width, height):
+        """World-space (origin, unit direction) through window pixel (x, y), origin bottom-left."""
+        fovy, aspect = self.projection_params[:2]
+        tan_half = math.tan(math.radians(fovy) / 2.0)
+        vx = (2.0 * x / width - 1.0) * tan_half * aspect
+        vy = (2.0 * y / height - 1.0) * tan_half
+        # The view matrix's rotation is orthonormal: its transpose takes view space back to world
+        v = self.view
+        direction = (v[0] * vx + v[1] * vy - v[2],
+                     v[4] * vx + v[5] * vy - v[6],
+                     v[8] * vx + v[9] * vy - v[10])
+        length = math.sqrt(sum(c * c for c in direction))
+        return self.eye, tuple(c / length for c in direction)
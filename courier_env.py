@@ -0,0 +1,330 @@
+"""
+Gym-style environment around the Courier Run simulation.
+
+CourierEnv drives init_game() / update_game() directly with a fixed time step,
+so the game can be played by scripts and agents without a window or keyboard.
+VectorCourierEnv runs K copies in worker processes; observations, rewards and
+done flags are written into one shared-memory block so a batched step only
+sends the actions over the pipes.
+
+    env = CourierEnv(seed=1)
+    obs = env.reset()
+    obs, reward, terminated, truncated, info = env.step(action_from_keys(b'w'))
+"""
+import importlib.util
+import itertools
+import math
+import os
+import struct
+from array import array
+
+GAME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "02_22141003-20301158-20301435_Summer2025.py")
+
+# Action = bitmask over these keys (same byte keys keyboardListener() stores)
+ACTION_KEYS = (b'w', b's', b'a', b'd', b'shift', b'u', b'f')
+NUM_ACTIONS = 1 << len(ACTION_KEYS)
+
+NEARBY_SPIKES = 3
+NEARBY_GATES = 2
+NEARBY_RINGS = 3
+
+# player x, z, sin/cos(angle), stamina, time_left, carrying, carrying_correct,
+# beacon index, beacon dx/dz, is_final_beacon, package dx/dz
+PLAYER_OBS_SIZE = 14
+SLOT_SIZE = 4  # present, dx, dz, value
+OBS_SIZE = PLAYER_OBS_SIZE + SLOT_SIZE * (NEARBY_SPIKES + NEARBY_GATES + NEARBY_RINGS)
+
+DEFAULT_DT = 1.0 / 30.0
+TIME_REWARD = 1.0  # reward per second gained/lost on top of the normal countdown
+
+_module_ids = itertools.count()
+
+
+def load_game(path=GAME_SCRIPT):
+    """Loads a fresh copy of the game script as a module with its own globals."""
+    spec = importlib.util.spec_from_file_location(f"courier_game_{next(_module_ids)}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def action_from_keys(*keys):
+    """Builds an action bitmask from key names, e.g. action_from_keys(b'w', b'shift')."""
+    action = 0
+    for key in keys:
+        action |= 1 << ACTION_KEYS.index(key)
+    return action
+
+
+def _nearest(items, px, pz, count):
+    return sorted(items, key=lambda e: (e['pos'][0] - px) ** 2 + (e['pos'][2] - pz) ** 2)[:count]
+
+
+def write_observation(game, out, offset=0):
+    """Writes the observation for the current game state into out[offset:offset+OBS_SIZE]."""
+    px, pz = game.player_pos[0], game.player_pos[2]
+    rad = math.radians(game.player_angle)
+    carried = game.carried_package_info
+
+    beacon_dx = beacon_dz = 0.0
+    is_final = 0.0
+    if game.current_beacon_index < len(game.route_beacons):
+        beacon = game.route_beacons[game.current_beacon_index]
+        beacon_dx, beacon_dz = beacon['pos'][0] - px, beacon['pos'][2] - pz
+        is_final = float(game.current_beacon_index == len(game.route_beacons) - 1)
+
+    package_dx = package_dz = 0.0
+    for pkg in game.packages:
+        if pkg['is_correct'] and not pkg['is_carried']:
+            package_dx, package_dz = pkg['pos'][0] - px, pkg['pos'][2] - pz
+            break
+
+    values = [px, pz, math.sin(rad), math.cos(rad),
+              game.stamina / game.STAMINA_MAX, game.time_left,
+              float(game.is_carrying_package),
+              float(bool(carried and carried['is_correct'])),
+              float(game.current_beacon_index), beacon_dx, beacon_dz, is_final,
+              package_dx, package_dz]
+
+    groups = (
+        (game.spikes, NEARBY_SPIKES,
+         lambda s: s['current_height'] / s['max_height'] if s.get('is_dangerous', False) else 0.0),
+        (game.gates, NEARBY_GATES, lambda g: 0.0 if g['is_open'] else 1.0),
+        ([r for r in game.bonus_rings if r['active']], NEARBY_RINGS, lambda r: float(r['multiplier'])),
+    )
+    for items, count, value_of in groups:
+        nearest = _nearest(items, px, pz, count)
+        for entity in nearest:
+            values += [1.0, entity['pos'][0] - px, entity['pos'][2] - pz, value_of(entity)]
+        values += [0.0] * (SLOT_SIZE * (count - len(nearest)))
+
+    out[offset:offset + OBS_SIZE] = array('d', values)
+    return out
+
+
+def scripted_action(obs):
+    """
+    Simple autopilot used for balance runs: fetch the correct package (drop a
+    wrong one), then steer beacon to beacon, sprinting on long straight legs.
+    """
+    heading = math.atan2(obs[2], obs[3])
+    stamina, carrying, correct = obs[4], obs[6], obs[7]
+    if carrying and not correct:
+        return action_from_keys(b'f')
+
+    tx, tz = (obs[9], obs[10]) if carrying else (obs[12], obs[13])
+    distance = math.hypot(tx, tz)
+    turn = (math.atan2(tx, tz) - heading + math.pi) % (2 * math.pi) - math.pi
+
+    keys = []
+    if not carrying and distance < 25:
+        keys.append(b'u')
+    if turn > 0.1:
+        keys.append(b'd')
+    elif turn < -0.1:
+        keys.append(b'a')
+    if abs(turn) < 0.6:
+        keys.append(b'w')
+        if distance > 150 and stamina > 0.3 and abs(turn) < 0.3:
+            keys.append(b'shift')
+    return action_from_keys(*keys)
+
+
+class CourierEnv:
+    """
+    Single headless game. step() applies the action's keys to key_states and
+    advances update_game() by a fixed dt.
+    Reward = score gained + TIME_REWARD * seconds gained/lost (rings, combos, penalties).
+    """
+
+    def __init__(self, seed=None, dt=DEFAULT_DT, max_steps=None, game=None):
+        self.game = game if game is not None else load_game()
+        self.dt = dt
+        self.max_steps = max_steps
+        self._seed = seed
+        self.steps = 0
+        self._obs = [0.0] * OBS_SIZE
+
+    def reset(self, seed=None):
+        """Starts a new game. The layout is reseeded only when a seed is given
+        (here or in the constructor), so auto-resets keep drawing new layouts."""
+        if seed is None:
+            seed, self._seed = self._seed, None
+        if seed is not None:
+            self.game.rng.seed(seed)
+        self.game.key_states.clear()
+        self.game.init_game()
+        self.steps = 0
+        return self.observation()
+
+    def observation(self, out=None, offset=0):
+        if out is None:
+            out = self._obs
+        return write_observation(self.game, out, offset)
+
+    def apply_action(self, action):
+        key_states = self.game.key_states
+        for bit, key in enumerate(ACTION_KEYS):
+            key_states[key] = bool(action >> bit & 1)
+
+    def step(self, action, out=None, offset=0):
+        game = self.game
+        score, time_left = game.total_score, game.time_left
+
+        self.apply_action(action)
+        if game.game_state == 'playing':
+            game.update_game(self.dt)
+        self.steps += 1
+
+        reward = (game.total_score - score) + TIME_REWARD * (game.time_left - time_left + self.dt)
+        terminated = game.game_state == 'fail'
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        return self.observation(out, offset), reward, terminated, truncated, self.info()
+
+    def info(self):
+        game = self.game
+        return {'score': game.total_score, 'deliveries': game.completed_deliveries,
+                'time_left': game.time_left, 'beacon': game.current_beacon_index,
+                'difficulty': game.difficulty_level, 'game_time': game.game_time}
+
+
+# ---------------------------------------------------------------------------
+# Vector env: one CourierEnv per worker process, results in shared memory.
+# Layout (doubles): K*OBS_SIZE observations | K rewards | K terminated | K truncated
+
+def _worker(conn, shm_name, num_envs, index, seed, dt, max_steps):
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = shm.buf.cast('d')
+    obs_offset = index * OBS_SIZE
+    reward_slot = num_envs * OBS_SIZE + index
+    env = CourierEnv(seed=seed, dt=dt, max_steps=max_steps)
+    try:
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == 'step':
+                _, reward, terminated, truncated, info = env.step(arg, data, obs_offset)
+                data[reward_slot] = reward
+                data[reward_slot + num_envs] = float(terminated)
+                data[reward_slot + 2 * num_envs] = float(truncated)
+                if terminated or truncated:
+                    info['final_score'] = info['score']
+                    env.reset()
+                    env.observation(data, obs_offset)
+                conn.send(info)
+            elif cmd == 'reset':
+                env.reset(arg)
+                env.observation(data, obs_offset)
+                conn.send(None)
+            elif cmd == 'close':
+                break
+    finally:
+        data.release()
+        shm.close()
+        conn.close()
+
+
+def _create_shared_memory(size):
+    """
+    A new SharedMemory segment whose __del__ tolerates arrays the caller still
+    holds over it: close() then raises BufferError, and the mapping is left to
+    those arrays (it is unmapped when the last one goes). Defined here because
+    multiprocessing is slow to import.
+    """
+    from multiprocessing import shared_memory
+
+    class SharedMemory(shared_memory.SharedMemory):
+        def __del__(self):
+            try:
+                self.close()
+            except BufferError:
+                pass
+
+    return SharedMemory(create=True, size=size)
+
+
+class VectorCourierEnv:
+    """
+    Runs num_envs CourierEnv copies in worker processes. step(actions) sends one
+    action per env and returns views into the shared buffers:
+    observations is a (num_envs, OBS_SIZE) memoryview (np.asarray() wraps it
+    without copying). A multi-dimensional memoryview can't be indexed by row,
+    so observation_rows[j] is env j's observation as a flat memoryview.
+    Finished envs reset themselves; info has 'final_score'.
+
+    The views are only valid until close(). close() always unlinks the
+    shared-memory segment; arrays the caller still holds keep the mapping
+    alive until they are dropped, but must not be read after close().
+    """
+
+    def __init__(self, num_envs, seed=0, dt=DEFAULT_DT, max_steps=None, context=None):
+        # multiprocessing is slow to import and single envs never need it
+        import multiprocessing as mp
+        ctx = mp.get_context(context)
+        self.num_envs = num_envs
+        size = struct.calcsize('d') * num_envs * (OBS_SIZE + 3)
+        self._shm = _create_shared_memory(size)
+        self._data = self._shm.buf.cast('d')
+        self.observations = self._data[:num_envs * OBS_SIZE].cast('B').cast('d', (num_envs, OBS_SIZE))
+        self.rewards = self._data[num_envs * OBS_SIZE:num_envs * (OBS_SIZE + 1)]
+        self.terminated = self._data[num_envs * (OBS_SIZE + 1):num_envs * (OBS_SIZE + 2)]
+        self.truncated = self._data[num_envs * (OBS_SIZE + 2):]
+        self.observation_rows = tuple(self._data[j * OBS_SIZE:(j + 1) * OBS_SIZE] for j in range(num_envs))
+
+        self._conns = []
+        self._procs = []
+        for i in range(num_envs):
+            parent, child = ctx.Pipe()
+            env_seed = None if seed is None else seed + i
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child, self._shm.name, num_envs, i, env_seed, dt, max_steps))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def reset(self, seed=None):
+        for i, conn in enumerate(self._conns):
+            conn.send(('reset', None if seed is None else seed + i))
+        for conn in self._conns:
+            conn.recv()
+        return self.observations
+
+    def step(self, actions):
+        for conn, action in zip(self._conns, actions):
+            conn.send(('step', int(action)))
+        infos = [conn.recv() for conn in self._conns]
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self):
+        if self._shm is None:
+            return
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+        # Unlink first, so the segment is removed from /dev/shm even if the mapping can't be closed yet
+        self._shm.unlink()
+        # Release the views first; one the caller still holds an array over can't be, and keeps the
+        # mapping alive until that array goes
+        views = self.observation_rows + (self.observations, self.rewards, self.terminated, self.truncated, self._data)
+        for view in views:
+            try:
+                view.release()
+            except BufferError:
+                pass
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,203 @@
+"""
+Ghost courier: race your best time on each delivery leg.
+
+A leg runs from one start_new_delivery() to the delivery that ends it. The
+layout of leg N is fixed by the layout seed, so tracks are keyed
+"seed:leg" and only kept when the game runs with --seed.
+
+While a leg is played, GhostStore.update() samples the courier RATE times
+a second of leg time into a Track:
+  - x and z as int16 fixed point, POSITION_SCALE steps per world unit
+    (ARENA_SIZE 402 * 64 fits in int16)
+  - the heading as uint8, 256 steps per turn
+That is 5 bytes a sample, 6 KB per minute at 20 Hz. When the leg is
+delivered faster than the stored best, the recording replaces it.
+
+pose() interpolates between the two samples around a leg time: an index,
+a lerp and a shortest-way turn. It costs the same for any track length.
+
+Rewinding (rewind.py) moves leg time back; the next sample truncates the
+recording there. Rewinding past the start of the leg, or loading a save,
+stops recording until the next leg starts.
+
+    python ghost.py ghosts.bin          # list the stored tracks
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'CRGH'
+VERSION = 1
+RATE = 20.0
+POSITION_SCALE = 64
+ANGLE_STEPS = 256
+
+
+class Track:
+    def __init__(self, rate=RATE):
+        self.rate = rate
+        self.x = array('h')
+        self.z = array('h')
+        self.angle = array('B')
+        self.duration = None        # leg time when delivered; None while recording
+        self.last = None            # (t, x, z, angle) of the previous sample() call
+
+    def __len__(self):
+        return len(self.x)
+
+    def nbytes(self):
+        return len(self.x) * (self.x.itemsize + self.z.itemsize + self.angle.itemsize)
+
+    def sample(self, t, x, z, angle):
+        """
+        Records the pose at leg time t. Samples fall every 1/rate s, so the ones
+        between the previous call and t are interpolated from the two poses.
+        """
+        n = len(self.x)
+        if n and (n - 1) / self.rate > t:
+            # Leg time went back (rewind): drop the samples after t
+            n = int(t * self.rate) + 1
+            del self.x[n:], self.z[n:], self.angle[n:]
+            self.last = None
+        last = self.last
+        while n / self.rate <= t:
+            px, pz, pa = x, z, angle
+            if last is not None and t > last[0]:
+                f = (n / self.rate - last[0]) / (t - last[0])
+                px = last[1] + (x - last[1]) * f
+                pz = last[2] + (z - last[2]) * f
+                pa = last[3] + ((angle - last[3] + 180.0) % 360.0 - 180.0) * f
+            self.x.append(max(-32768, min(32767, round(px * POSITION_SCALE))))
+            self.z.append(max(-32768, min(32767, round(pz * POSITION_SCALE))))
+            self.angle.append(round(pa % 360.0 * ANGLE_STEPS / 360.0) % ANGLE_STEPS)
+            n += 1
+        self.last = (t, x, z, angle)
+
+    def pose(self, t):
+        """(x, z, angle in degrees) at leg time t, or None past the end of the track."""
+        n = len(self.x)
+        f = t * self.rate
+        if n == 0 or f < 0 or f > n - 1:
+            return None
+        i = int(f)
+        j = min(i + 1, n - 1)
+        frac = f - i
+        x = (self.x[i] + (self.x[j] - self.x[i]) * frac) / POSITION_SCALE
+        z = (self.z[i] + (self.z[j] - self.z[i]) * frac) / POSITION_SCALE
+        turn = (self.angle[j] - self.angle[i] + ANGLE_STEPS // 2) % ANGLE_STEPS - ANGLE_STEPS // 2
+        angle = (self.angle[i] + turn * frac) * 360.0 / ANGLE_STEPS
+        return x, z, angle
+
+
+class GhostStore:
+    """Best Track per leg key, the leg being recorded and the ghost being shown."""
+
+    def __init__(self):
+        self.best = {}              # key -> finished Track
+        self.key = None
+        self.leg_start = 0.0        # game_time the current leg started at
+        self.recording = None       # Track of the current leg, None when not recording
+        self.ghost = None           # best Track for the current leg, if any
+
+    def start_leg(self, key, game_time):
+        """Begins a leg; key None (no layout seed) records and shows nothing."""
+        self.key = key
+        self.leg_start = game_time
+        self.recording = Track() if key is not None else None
+        self.ghost = self.best.get(key)
+
+    def cancel(self):
+        """Stops recording and showing until the next leg (after a load, or rewinding past the leg start)."""
+        self.recording = None
+        self.ghost = None
+
+    def update(self, game_time, x, z, angle):
+        if self.recording is None:
+            return
+        t = game_time - self.leg_start
+        if t < 0:
+            self.cancel()
+            return
+        self.recording.sample(t, x, z, angle)
+
+    def finish_leg(self, game_time):
+        """The leg was delivered; returns (leg time, previous best or None) if it set a new best."""
+        track = self.recording
+        self.recording = None
+        if track is None or not len(track):
+            return None
+        track.duration = game_time - self.leg_start
+        previous = self.best.get(self.key)
+        if previous is not None and previous.duration <= track.duration:
+            return None
+        self.best[self.key] = track
+        return track.duration, previous.duration if previous is not None else None
+
+    def pose(self, game_time):
+        """The ghost's interpolated (x, z, angle) now, or None when there is nothing to show."""
+        ghost = self.ghost
+        if ghost is None:
+            return None
+        return ghost.pose(game_time - self.leg_start)
+
+    # --- files ----------------------------------------------------------
+    def dumps(self):
+        """The whole store as file bytes; the arrays are copied, so they can be written on another thread."""
+        index, blobs, offset = {}, [], 0
+        for key, track in self.best.items():
+            index[key] = {'rate': track.rate, 'duration': track.duration, 'samples': len(track), 'offset': offset}
+            for column in (track.x, track.z, track.angle):
+                blobs.append(column.tobytes())
+                offset += len(blobs[-1])
+        header = json.dumps({'version': VERSION, 'byteorder': sys.byteorder, 'tracks': index}).encode()
+        return b''.join([MAGIC, struct.pack('<I', len(header)), header] + blobs)
+
+    def save(self, path):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(self.dumps())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with open(path, 'rb') as file:
+            if file.read(4) != MAGIC:
+                raise ValueError(f"{path}: not a ghost file")
+            (length,) = struct.unpack('<I', file.read(4))
+            header = json.loads(file.read(length))
+            if header['version'] != VERSION:
+                raise ValueError(f"{path}: ghost file version {header['version']}, expected {VERSION}")
+            data = file.read()
+        swap = header['byteorder'] != sys.byteorder
+        for key, info in header['tracks'].items():
+            track = Track(info['rate'])
+            track.duration = info['duration']
+            offset = info['offset']
+            for column in (track.x, track.z, track.angle):
+                size = info['samples'] * column.itemsize
+                column.frombytes(data[offset:offset + size])
+                if swap:
+                    column.byteswap()
+                offset += size
+            store.best[key] = track
+        return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the ghost tracks in a Courier Run ghost file.")
+    parser.add_argument('ghosts')
+    args = parser.parse_args(argv)
+
+    store = GhostStore.load(args.ghosts)
+    print(f"{'seed:leg':>10} {'time':>8} {'samples':>8} {'bytes':>7}")
+    for key in sorted(store.best, key=lambda k: tuple(int(part) for part in k.split(':'))):
+        track = store.best[key]
+        print(f"{key:>10} {track.duration:>7.2f}s {len(track):>8} {track.nbytes():>7}")
+
+
+if __name__ == "__main__":
+    main()
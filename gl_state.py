@@ -0,0 +1,138 @@
+"""
+Shadow copy of the GL state the render backends touch.
+
+GLState remembers what it last set: enabled caps, matrix mode, current
+colour, client arrays, bound array and element buffers, vertex pointer
+source and shader program. Calls that would not change anything are dropped. Each frame it
+counts the calls that do reach GL:
+
+  begin    glBegin
+  vertex   glVertex calls, or vertices submitted through arrays
+  color    glColor
+  matrix   matrix stack and matrix mode operations
+  state    enables, client arrays, buffer/program binds
+  draw     draw calls (glDrawArrays*, display lists, GLUT solids, bitmap chars)
+  dropped  redundant calls filtered out
+
+Backends increment counts directly and call end_frame() once per frame;
+last_frame then holds the finished frame's numbers (Renderer.gl_stats()).
+Code that changes GL state behind the backend's back must be followed by
+reset(), so the shadow is not trusted afterwards.
+"""
+import csv
+
+COUNTERS = ('begin', 'vertex', 'color', 'matrix', 'state', 'draw', 'dropped')
+
+
+class GLState:
+    def __init__(self, gl, gl11=None, gl15=None, gl20=None):
+        self.gl = gl
+        self.gl11 = gl11 or gl
+        self.gl15 = gl15 or gl
+        self.gl20 = gl20 or gl
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.last_frame = dict(self.counts)
+        self.frames = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets everything; the next call of each kind goes to GL."""
+        self.caps = {}
+        self.mode = None
+        self.rgba = None
+        self.client = {}
+        self.buffer = None
+        self.element_buffer = None
+        self.vertex_source = None
+        self.program = None
+
+    def end_frame(self):
+        self.last_frame = dict(self.counts)
+        for key in self.counts:
+            self.counts[key] = 0
+        self.frames += 1
+
+    def set_enabled(self, cap, enabled):
+        if self.caps.get(cap) == enabled:
+            self.counts['dropped'] += 1
+            return
+        self.caps[cap] = enabled
+        self.counts['state'] += 1
+        (self.gl.glEnable if enabled else self.gl.glDisable)(cap)
+
+    def matrix_mode(self, mode):
+        if self.mode == mode:
+            self.counts['dropped'] += 1
+            return
+        self.mode = mode
+        self.counts['matrix'] += 1
+        self.gl.glMatrixMode(mode)
+
+    def color(self, r, g, b, a=1.0):
+        rgba = (r, g, b, a)
+        if self.rgba == rgba:
+            self.counts['dropped'] += 1
+            return
+        self.rgba = rgba
+        self.counts['color'] += 1
+        self.gl.glColor4f(r, g, b, a)
+
+    def client_state(self, array, enabled):
+        if self.client.get(array) == enabled:
+            self.counts['dropped'] += 1
+            return
+        self.client[array] = enabled
+        self.counts['state'] += 1
+        (self.gl11.glEnableClientState if enabled else self.gl11.glDisableClientState)(array)
+
+    def bind_buffer(self, buffer):
+        """Binds buffer to GL_ARRAY_BUFFER."""
+        if self.buffer == buffer:
+            self.counts['dropped'] += 1
+            return
+        self.buffer = buffer
+        self.counts['state'] += 1
+        self.gl15.glBindBuffer(self.gl15.GL_ARRAY_BUFFER, buffer)
+
+    def bind_element_buffer(self, buffer):
+        """Binds buffer to GL_ELEMENT_ARRAY_BUFFER."""
+        if self.element_buffer == buffer:
+            self.counts['dropped'] += 1
+            return
+        self.element_buffer = buffer
+        self.counts['state'] += 1
+        self.gl15.glBindBuffer(self.gl15.GL_ELEMENT_ARRAY_BUFFER, buffer)
+
+    def use_program(self, program):
+        if self.program == program:
+            self.counts['dropped'] += 1
+            return
+        self.program = program
+        self.counts['state'] += 1
+        self.gl20.glUseProgram(program)
+
+
+class StatsLog:
+    """
+    Appends one CSV row of counters per frame (--gl-stats-log PATH): COUNTERS,
+    then any further counters the backend reports (the queued backend's), as
+    found in the first frame.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', buffering=1)
+        self.writer = csv.writer(self.file)
+        self.columns = None
+        self.frame = 0
+
+    def write(self, stats):
+        if not stats:
+            return
+        if self.columns is None:
+            self.columns = COUNTERS + tuple(key for key in stats if key not in COUNTERS)
+            self.writer.writerow(('frame',) + self.columns)
+        self.writer.writerow((self.frame,) + tuple(stats.get(key, 0) for key in self.columns))
+        self.frame += 1
+
+    def close(self):
+        self.file.close()
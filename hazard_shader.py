@@ -0,0 +1,205 @@
+"""
+GPU path for Feature 11 (pop-up spikes) and Feature 12 (route gates).
+
+All spike and gate meshes live in one static vertex buffer, each vertex
+tagged with its hazard's position, cycle_offset and max_height. The vertex
+shader repeats update_hazards(): it works out spike height, danger colour and
+gate open/closed state from the game_time uniform. Per frame the CPU uploads
+one float and issues one draw call for every hazard. The buffer is rebuilt
+only when init_game() bumps hazard_layout_version. The cycle times change
+only with difficulty and are re-sent only then.
+
+GLSL 1.20 / compatibility profile so it runs on Mesa's llvmpipe. Check it
+against the CPU path without a GPU or display:
+
+    python hazard_shader.py --selftest
+"""
+import ctypes
+import sys
+from array import array
+
+import meshes
+
+VERTEX_SHADER = """
+#version 120
+uniform float u_time;
+uniform float u_spike_cycle;
+uniform float u_gate_cycle;
+attribute vec3 a_local;     // mesh vertex: spike cylinder (height 1) or unit gate cube
+attribute vec4 a_instance;  // hazard x, z, cycle_offset, max_height
+attribute vec3 a_shape;     // kind (0 spike, 1 gate), gate footprint x, z
+varying vec3 v_color;
+const float TWO_PI = 6.283185307179586;
+
+void main() {
+    vec3 pos;
+    if (a_shape.x < 0.5) {
+        float s = sin(mod(u_time / u_spike_cycle + a_instance.z, TWO_PI));
+        float h;
+        if (s > 0.3) h = a_instance.w;                                  // up (dangerous)
+        else if (s > 0.0) h = 0.0;                                      // rising transition
+        else h = a_instance.w * max(0.0, (s + 0.3) / 0.7);              // falling / down
+        if (s > 0.3 && h > 40.0) v_color = vec3(1.0, 0.1, 0.1);
+        else if (h > 5.0) v_color = vec3(1.0, 0.5, 0.0);
+        else v_color = vec3(0.3, 0.3, 0.3);
+        pos = vec3(a_instance.x + a_local.x, a_local.y * h, a_instance.y + a_local.z);
+    } else {
+        bool is_open = sin(mod(u_time / u_gate_cycle + a_instance.z, TWO_PI)) > 0.0;
+        float h = is_open ? 0.0 : a_instance.w;
+        v_color = is_open ? vec3(0.0, 1.0, 0.0) : vec3(1.0, 0.0, 0.0);
+        pos = vec3(a_instance.x + a_local.x * a_shape.y, (a_local.y + 0.5) * h,
+                   a_instance.y + a_local.z * a_shape.z);
+    }
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(pos, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+varying vec3 v_color;
+void main() {
+    gl_FragColor = vec4(v_color, 1.0);
+}
+"""
+
+ATTRIBUTES = (('a_local', 3), ('a_instance', 4), ('a_shape', 3))
+FLOATS_PER_VERTEX = sum(size for _, size in ATTRIBUTES)
+
+
+def build_vertices(spikes, gates, spike_radius, gate_length, gate_thickness, slices=20):
+    """Interleaved vertex data for every spike and gate (see ATTRIBUTES)."""
+    spike_mesh = meshes.cylinder_mesh(spike_radius, 1.0, slices)
+    gate_mesh = meshes.cube_mesh(1.0)
+    out = array('f')
+    for hazards, mesh, kind in ((spikes, spike_mesh, 0.0), (gates, gate_mesh, 1.0)):
+        for h in hazards:
+            if kind:
+                vertical = h['orientation'] == 'vertical'
+                shape = (kind, gate_thickness if vertical else gate_length,
+                         gate_length if vertical else gate_thickness)
+            else:
+                shape = (kind, 1.0, 1.0)
+            tail = (h['pos'][0], h['pos'][2], h['cycle_offset'], h['max_height']) + shape
+            for i in range(0, len(mesh), 3):
+                out.extend(mesh[i:i + 3])
+                out.extend(tail)
+    return out
+
+
+class HazardShaderPipeline:
+    """Compiles the hazard program; draw() renders all spikes and gates in one call."""
+
+    def __init__(self, spike_radius, gate_length, gate_thickness):
+        from OpenGL import GL
+        from OpenGL.GL import shaders
+        from OpenGL.raw.GL.VERSION import GL_1_1, GL_1_5, GL_2_0
+        self.gl11, self.gl15, self.gl20 = GL_1_1, GL_1_5, GL_2_0
+        self.spike_radius = spike_radius
+        self.gate_length = gate_length
+        self.gate_thickness = gate_thickness
+
+        vertex = shaders.compileShader(VERTEX_SHADER, GL.GL_VERTEX_SHADER)
+        fragment = shaders.compileShader(FRAGMENT_SHADER, GL.GL_FRAGMENT_SHADER)
+        self.program = GL.glCreateProgram()
+        GL.glAttachShader(self.program, vertex)
+        GL.glAttachShader(self.program, fragment)
+        for index, (name, _) in enumerate(ATTRIBUTES):
+            GL.glBindAttribLocation(self.program, index, name)
+        GL.glLinkProgram(self.program)
+        if GL.glGetProgramiv(self.program, GL.GL_LINK_STATUS) != GL.GL_TRUE:
+            raise RuntimeError(GL.glGetProgramInfoLog(self.program))
+        GL.glDeleteShader(vertex)
+        GL.glDeleteShader(fragment)
+
+        self.loc_time = GL.glGetUniformLocation(self.program, "u_time")
+        self.loc_spike_cycle = GL.glGetUniformLocation(self.program, "u_spike_cycle")
+        self.loc_gate_cycle = GL.glGetUniformLocation(self.program, "u_gate_cycle")
+        self.vbo = GL.glGenBuffers(1)
+        self.vertex_count = 0
+        self.layout_version = None
+        self.cycles = None
+
+    def upload(self, spikes, gates):
+        data = build_vertices(spikes, gates, self.spike_radius, self.gate_length, self.gate_thickness)
+        gl15 = self.gl15
+        gl15.glBindBuffer(gl15.GL_ARRAY_BUFFER, self.vbo)
+        gl15.glBufferData(gl15.GL_ARRAY_BUFFER, len(data) * data.itemsize,
+                          ctypes.c_void_p(data.buffer_info()[0]), gl15.GL_STATIC_DRAW)
+        self.vertex_count = len(data) // FLOATS_PER_VERTEX
+
+    def draw(self, spikes, gates, layout_version, game_time, spike_cycle, gate_cycle):
+        gl11, gl15, gl20 = self.gl11, self.gl15, self.gl20
+        if layout_version != self.layout_version:
+            self.upload(spikes, gates)
+            self.layout_version = layout_version
+        if not self.vertex_count:
+            return
+
+        gl20.glUseProgram(self.program)
+        gl20.glUniform1f(self.loc_time, game_time)
+        if (spike_cycle, gate_cycle) != self.cycles:
+            gl20.glUniform1f(self.loc_spike_cycle, spike_cycle)
+            gl20.glUniform1f(self.loc_gate_cycle, gate_cycle)
+            self.cycles = (spike_cycle, gate_cycle)
+
+        # Generic attribute 0 aliases gl_Vertex; keep the fixed-function array out of the way
+        gl11.glDisableClientState(gl11.GL_VERTEX_ARRAY)
+        gl15.glBindBuffer(gl15.GL_ARRAY_BUFFER, self.vbo)
+        stride = FLOATS_PER_VERTEX * 4
+        offset = 0
+        for index, (_, size) in enumerate(ATTRIBUTES):
+            gl20.glEnableVertexAttribArray(index)
+            gl20.glVertexAttribPointer(index, size, gl11.GL_FLOAT, gl11.GL_FALSE, stride, ctypes.c_void_p(offset))
+            offset += size * 4
+        gl11.glDrawArrays(gl11.GL_TRIANGLES, 0, self.vertex_count)
+        for index in range(len(ATTRIBUTES)):
+            gl20.glDisableVertexAttribArray(index)
+        gl15.glBindBuffer(gl15.GL_ARRAY_BUFFER, 0)
+        gl20.glUseProgram(0)
+
+
+def selftest(samples=24, tolerance=0.002):
+    """
+    Renders the hazards through the CPU path (retained renderer) and through
+    the shader at a range of game times in an offscreen Mesa context and
+    compares the images. Returns True when every frame matches.
+    """
+    import offscreen_gl
+    width, height = 640, 480
+    offscreen_gl.create_context(width, height)
+
+    import courier_env
+    import render_backends
+    env = courier_env.CourierEnv(seed=7)
+    env.reset()
+    game = env.game
+    game.renderer = render_backends.create_renderer('retained', width, height)
+    pipeline = HazardShaderPipeline(game.SPIKE_RADIUS, game.GATE_LENGTH, game.GATE_THICKNESS)
+    print(offscreen_gl.renderer_string())
+
+    def frame(use_shader):
+        game.hazard_pipeline = pipeline if use_shader else None
+        game.renderer.begin_frame()
+        game.setupCamera()
+        game.draw_hazards()
+        game.renderer.end_frame()
+        return offscreen_gl.read_pixels(width, height)
+
+    ok = True
+    for i in range(samples):
+        game.difficulty_level = 1 + i % 3
+        game.game_time = i * 0.37
+        game.update_hazards(0.0)
+        cpu, gpu = frame(False), frame(True)
+        differing = sum(1 for p in range(0, len(cpu), 3) if cpu[p:p + 3] != gpu[p:p + 3])
+        fraction = differing / (width * height)
+        ok &= fraction <= tolerance
+        print(f"t={game.game_time:5.2f} level={game.difficulty_level} differing pixels {fraction:.4%}")
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    if "--selftest" in sys.argv:
+        sys.exit(0 if selftest() else 1)
+    print(__doc__)
@@ -0,0 +1,199 @@
+"""
+Where couriers spend time and get hit.
+
+Heatmap bins the arena into the floor's TILE_SIZE cells. It has two layers:
+'time' (seconds spent in the cell) and 'hits' (spike penalties and gate
+bumps that happened there). Grids from any number of sessions add up with
+merge(). save() and load() keep them in a small binary file, so
+interactive sessions (--heatmap PATH) and headless runs (courier_env,
+telemetry files) accumulate into the same map:
+
+    python heatmap.py heat.bin --telemetry runs/*.ctl      # add recorded sessions
+    python heatmap.py heat.bin --merge other.bin            # add another map
+
+In the game, H cycles the floor overlay through time / hits / off.
+refresh() quantises the chosen layer into a few colour levels at most
+refresh_interval times a second and bumps version only when a level
+changes. The renderer's baked overlay is therefore rebuilt when the
+picture changes, not every frame.
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+
+MAGIC = b'CRHM'
+LAYERS = ('time', 'hits')
+
+
+def heat_color(level):
+    """0..1 -> blue (cold) .. yellow .. red (hot), translucent."""
+    r = min(1.0, 2.0 * level)
+    g = min(1.0, 2.0 * (1.0 - level)) if level > 0.5 else 2.0 * level
+    b = max(0.0, 1.0 - 2.0 * level)
+    return (r, g, b, 0.55)
+
+
+class Heatmap:
+    def __init__(self, tile_size=51, half_tiles=8, refresh_interval=0.5):
+        self.tile_size = tile_size
+        self.half_tiles = half_tiles        # cells run from -half_tiles to half_tiles - 1 on each axis
+        self.size = 2 * half_tiles
+        self.layers = {name: array('d', bytes(8 * self.size * self.size)) for name in LAYERS}
+        self.sessions = 0
+        self.refresh_interval = refresh_interval
+        self.refreshed_at = None
+        self.shown = None                   # (layer, quantised levels, steps) last handed out
+        self.version = 0
+
+    def cell(self, x, z):
+        """Flat index of the cell containing (x, z), or None outside the grid."""
+        i = math.floor(x / self.tile_size) + self.half_tiles
+        j = math.floor(z / self.tile_size) + self.half_tiles
+        if 0 <= i < self.size and 0 <= j < self.size:
+            return j * self.size + i
+        return None
+
+    def add_time(self, x, z, seconds):
+        index = self.cell(x, z)
+        if index is not None:
+            self.layers['time'][index] += seconds
+
+    def add_hit(self, x, z, count=1):
+        index = self.cell(x, z)
+        if index is not None:
+            self.layers['hits'][index] += count
+
+    def merge(self, other):
+        if (other.tile_size, other.half_tiles) != (self.tile_size, self.half_tiles):
+            raise ValueError("heatmaps use different grids")
+        for name in LAYERS:
+            mine, theirs = self.layers[name], other.layers[name]
+            for index, value in enumerate(theirs):
+                if value:
+                    mine[index] += value
+        self.sessions += other.sessions
+
+    # --- overlay --------------------------------------------------------
+    def refresh(self, layer, steps=8, now=None):
+        """Re-quantises layer (throttled); bumps version when the overlay would look different."""
+        now = time.perf_counter() if now is None else now
+        if (self.shown is not None and self.shown[0] == layer
+                and now - self.refreshed_at < self.refresh_interval):
+            return False
+        self.refreshed_at = now
+        values = self.layers[layer]
+        peak = max(values)
+        levels = tuple(math.ceil(v / peak * steps) if peak else 0 for v in values)
+        shown = (layer, levels, steps)
+        if shown == self.shown:
+            return False
+        self.shown = shown
+        self.version += 1
+        return True
+
+    def overlay(self, shown=None, y=1.5):
+        """
+        Triangles (positions, rgba colours) for renderer.baked(), of shown (a
+        value refresh() left in self.shown) or else of the last refresh().
+        """
+        positions, colors = [], []
+        shown = self.shown if shown is None else shown
+        if shown is None:
+            return positions, colors
+        _, levels, steps = shown
+        tile = self.tile_size
+        for index, level in enumerate(levels):
+            if not level:
+                continue
+            x = (index % self.size - self.half_tiles) * tile
+            z = (index // self.size - self.half_tiles) * tile
+            rgba = heat_color(level / steps)
+            for vx, vz in ((x, z), (x+tile, z), (x+tile, z+tile), (x, z), (x+tile, z+tile), (x, z+tile)):
+                positions.extend((vx, y, vz))
+                colors.extend(rgba)
+        return positions, colors
+
+    # --- files ----------------------------------------------------------
+    def save(self, path):
+        header = json.dumps({'tile_size': self.tile_size, 'half_tiles': self.half_tiles,
+                             'sessions': self.sessions, 'byteorder': sys.byteorder}).encode()
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(MAGIC + struct.pack('<I', len(header)) + header)
+            for name in LAYERS:
+                self.layers[name].tofile(file)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            if file.read(4) != MAGIC:
+                raise ValueError(f"{path}: not a heatmap file")
+            (length,) = struct.unpack('<I', file.read(4))
+            header = json.loads(file.read(length))
+            heatmap = cls(header['tile_size'], header['half_tiles'])
+            heatmap.sessions = header['sessions']
+            for name in LAYERS:
+                layer = array('d')
+                layer.fromfile(file, heatmap.size * heatmap.size)
+                if header['byteorder'] != sys.byteorder:
+                    layer.byteswap()
+                heatmap.layers[name] = layer
+        return heatmap
+
+    def add_telemetry(self, path):
+        """Accumulates one telemetry file (telemetry.py): time per tick and hit ticks."""
+        import telemetry
+        hit_bits = telemetry.CONTACT_SPIKE_HIT | telemetry.CONTACT_GATE_BUMP
+        prev_time = None
+        for chunk in telemetry.read_chunks(path, ('game_time', 'x', 'z', 'contacts', 'mark')):
+            for t, x, z, contacts, mark in zip(chunk['game_time'], chunk['x'], chunk['z'], chunk['contacts'],
+                                               chunk['mark']):
+                if prev_time is None or mark == telemetry.MARK_RESET:
+                    dt = t
+                elif mark == telemetry.MARK_JUMP or t < prev_time:
+                    dt = 0.0        # rewound or loaded, not played
+                else:
+                    dt = t - prev_time
+                prev_time = t
+                self.add_time(x, z, dt)
+                if contacts & hit_bits:
+                    self.add_hit(x, z)
+
+    def hottest(self, layer, count=5):
+        """[(value, cell x, cell z)] for the count largest cells, world coordinates of the cell corner."""
+        values = self.layers[layer]
+        top = sorted(range(len(values)), key=values.__getitem__, reverse=True)[:count]
+        return [(values[i], (i % self.size - self.half_tiles) * self.tile_size,
+                 (i // self.size - self.half_tiles) * self.tile_size) for i in top if values[i]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accumulate Courier Run heatmaps.")
+    parser.add_argument('heatmap', help="heatmap file to create or add to")
+    parser.add_argument('--telemetry', nargs='*', default=[], help="telemetry files to add")
+    parser.add_argument('--merge', nargs='*', default=[], help="heatmap files to add")
+    parser.add_argument('--tile-size', type=int, default=51)
+    args = parser.parse_args(argv)
+
+    heatmap = Heatmap.load(args.heatmap) if os.path.exists(args.heatmap) else Heatmap(args.tile_size)
+    for path in args.telemetry:
+        heatmap.add_telemetry(path)
+        heatmap.sessions += 1
+    for path in args.merge:
+        heatmap.merge(Heatmap.load(path))
+    heatmap.save(args.heatmap)
+
+    print(f"{args.heatmap}: {heatmap.sessions} sessions")
+    for layer in LAYERS:
+        cells = ", ".join(f"({x:+d}, {z:+d}) {value:.1f}" for value, x, z in heatmap.hottest(layer))
+        print(f"  hottest {layer}: {cells or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Local leaderboard (SQLite).
+
+submit() only puts the finished run on a queue. A writer thread owns the
+database connection. It inserts whatever has queued up in one transaction,
+then re-runs the panel query (top panel_size by score) and publishes the
+rows as Leaderboard.panel. The in-game panel reads that cached tuple and
+never touches the database, so neither game over nor drawing waits on disk.
+
+The results table is indexed for the queries below: top N by score, best per
+difficulty, best per seed. Other readers (the CLI here, tools) use
+their own connection. The database runs in WAL mode, so they don't block
+the writer.
+
+    python leaderboard.py leaderboard.sqlite3 --top 10
+    python leaderboard.py leaderboard.sqlite3 --by-difficulty --by-seed
+"""
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id          INTEGER PRIMARY KEY,
+    played_at   REAL NOT NULL,
+    score       INTEGER NOT NULL,
+    deliveries  INTEGER NOT NULL,
+    medal       TEXT NOT NULL,
+    difficulty  INTEGER NOT NULL,
+    seed        INTEGER,
+    game_time   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_score ON results (score DESC);
+CREATE INDEX IF NOT EXISTS results_difficulty_score ON results (difficulty, score DESC);
+CREATE INDEX IF NOT EXISTS results_seed_score ON results (seed, score DESC) WHERE seed IS NOT NULL;
+"""
+
+FIELDS = ('played_at', 'score', 'deliveries', 'medal', 'difficulty', 'seed', 'game_time')
+
+TOP_QUERY = "SELECT score, deliveries, medal, difficulty, seed, played_at FROM results ORDER BY score DESC LIMIT ?"
+# Bare columns next to MAX() come from the row holding the maximum (SQLite)
+BEST_PER_DIFFICULTY_QUERY = ("SELECT difficulty, MAX(score), deliveries, medal, played_at FROM results "
+                             "GROUP BY difficulty ORDER BY difficulty")
+BEST_PER_SEED_QUERY = ("SELECT seed, MAX(score), deliveries, medal, played_at FROM results "
+                       "WHERE seed IS NOT NULL GROUP BY seed ORDER BY seed")
+
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def top(connection, count=10):
+    return connection.execute(TOP_QUERY, (count,)).fetchall()
+
+
+def best_per_difficulty(connection):
+    return connection.execute(BEST_PER_DIFFICULTY_QUERY).fetchall()
+
+
+def best_per_seed(connection):
+    return connection.execute(BEST_PER_SEED_QUERY).fetchall()
+
+
+class Leaderboard:
+    """Queued, batched writes on a background thread; panel is the cached top list."""
+
+    def __init__(self, path, panel_size=5, batch=64):
+        self.path = path
+        self.panel_size = panel_size
+        self.batch = batch
+        self.pending = queue.SimpleQueue()
+        self.panel = ()             # rows of TOP_QUERY, replaced whole after each commit
+        self.written = 0
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="courier-leaderboard", daemon=True)
+        self.thread.start()
+
+    def submit(self, score, deliveries, medal, difficulty, seed=None, game_time=0.0):
+        """Queues one finished run; returns immediately."""
+        self.pending.put((time.time(), score, deliveries, medal, difficulty, seed, game_time))
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+
+    def _run(self):
+        connection = connect(self.path)
+        self.panel = tuple(top(connection, self.panel_size))
+        self.ready.set()
+        running = True
+        while running:
+            rows = [self.pending.get()]
+            while len(rows) < self.batch:
+                try:
+                    rows.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            if None in rows:
+                running = False
+                rows = [row for row in rows if row is not None]
+            if rows:
+                with connection:
+                    connection.executemany(
+                        f"INSERT INTO results ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})", rows)
+                self.written += len(rows)
+                self.panel = tuple(top(connection, self.panel_size))
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the Courier Run leaderboard.")
+    parser.add_argument('database')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--by-difficulty', action='store_true', help="best run per difficulty level")
+    parser.add_argument('--by-seed', action='store_true', help="best run per layout seed")
+    args = parser.parse_args(argv)
+
+    connection = connect(args.database)
+    print(f"{'score':>7} {'deliv':>6} {'medal':>9} {'level':>6} {'seed':>6}  played")
+    for score, deliveries, medal, difficulty, seed, played_at in top(connection, args.top):
+        seed = '-' if seed is None else seed
+        print(f"{score:>7} {deliveries:>6} {medal:>9} {difficulty:>6} {seed:>6}  "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(played_at))}")
+    if args.by_difficulty:
+        print(f"\n{'level':>6} {'best':>7} {'deliv':>6} {'medal':>9}")
+        for difficulty, score, deliveries, medal, _ in best_per_difficulty(connection):
+            print(f"{difficulty:>6} {score:>7} {deliveries:>6} {medal:>9}")
+    if args.by_seed:
+        print(f"\n{'seed':>6} {'best':>7} {'deliv':>6} {'medal':>9}")
+        for seed, score, deliveries, medal, _ in best_per_seed(connection):
+            print(f"{seed:>6} {score:>7} {deliveries:>6} {medal:>9}")
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+CPU-side triangle meshes for the shapes the game draws with GLUT/GLU
+(glutSolidCube, glutSolidSphere, gluCylinder + gluDisk).
+
+Each generator returns a flat array('f') of x, y, z positions, three vertices
+per triangle (GL_TRIANGLES), so it can be handed straight to a vertex buffer.
+index_mesh() turns one into shared vertices plus indices for glDrawElements.
+The game has no lighting, so no normals are generated.
+"""
+import math
+from array import array
+
+
+def quads_to_triangles(vertices):
+    """[(x,y,z)*4 per quad] -> flat triangle positions (two triangles per quad)."""
+    out = array('f')
+    for i in range(0, len(vertices), 4):
+        a, b, c, d = vertices[i:i + 4]
+        for v in (a, b, c, a, c, d):
+            out.extend(v)
+    return out
+
+
+def cube_mesh(size=1.0):
+    """Cube centred on the origin, like glutSolidCube(size)."""
+    h = size / 2.0
+    corners = [(-h, -h, -h), (h, -h, -h), (h, h, -h), (-h, h, -h),
+               (-h, -h, h), (h, -h, h), (h, h, h), (-h, h, h)]
+    faces = [(4, 5, 6, 7), (1, 0, 3, 2), (5, 1, 2, 6), (0, 4, 7, 3), (7, 6, 2, 3), (0, 1, 5, 4)]
+    return quads_to_triangles([corners[i] for face in faces for i in face])
+
+
+def sphere_mesh(radius=1.0, slices=20, stacks=20):
+    """UV sphere with poles on the z axis, like glutSolidSphere(radius, slices, stacks)."""
+    ring = []
+    for j in range(stacks + 1):
+        phi = math.pi * j / stacks
+        ring.append([(radius * math.sin(phi) * math.cos(2 * math.pi * i / slices),
+                      radius * math.sin(phi) * math.sin(2 * math.pi * i / slices),
+                      radius * math.cos(phi)) for i in range(slices + 1)])
+    out = array('f')
+    for j in range(stacks):
+        for i in range(slices):
+            a, b = ring[j][i], ring[j][i + 1]
+            c, d = ring[j + 1][i + 1], ring[j + 1][i]
+            if j != 0:
+                for v in (a, d, b):
+                    out.extend(v)
+            if j != stacks - 1:
+                for v in (b, d, c):
+                    out.extend(v)
+    return out
+
+
+def cylinder_mesh(radius=1.0, height=1.0, slices=20, capped=True):
+    """
+    Open cylinder standing on the origin along +y with a disk on top: what
+    draw_cylinder() builds from gluCylinder + gluDisk after its -90 deg x rotation.
+    """
+    rim = [(radius * math.sin(2 * math.pi * i / slices), radius * math.cos(2 * math.pi * i / slices))
+           for i in range(slices + 1)]
+    out = array('f')
+    for i in range(slices):
+        (x0, z0), (x1, z1) = rim[i], rim[i + 1]
+        out.extend((x0, 0, z0, x1, 0, z1, x1, height, z1,
+                    x0, 0, z0, x1, height, z1, x0, height, z0))
+        if capped:
+            out.extend((0, height, 0, x0, height, z0, x1, height, z1))
+    return out
+
+
+def index_mesh(positions):
+    """
+    Flat triangle positions -> (unique vertices array('f'), indices), the
+    same triangles in the same order. Indices are uint16 ('H') when they fit.
+    """
+    seen = {}
+    vertices = array('f')
+    indices = []
+    for i in range(0, len(positions), 3):
+        v = (positions[i], positions[i + 1], positions[i + 2])
+        index = seen.get(v)
+        if index is None:
+            index = seen[v] = len(seen)
+            vertices.extend(v)
+        indices.append(index)
+    return vertices, array('H' if len(seen) <= 0x10000 else 'I', indices)
+
+
+def transform_positions(positions, offset=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0)):
+    """Returns a scaled-then-translated copy of a flat position array."""
+    sx, sy, sz = scale
+    ox, oy, oz = offset
+    out = array('f', positions)
+    for i in range(0, len(out), 3):
+        out[i] = out[i] * sx + ox
+        out[i + 1] = out[i + 1] * sy + oy
+        out[i + 2] = out[i + 2] * sz + oz
+    return out
+
+
+def composite_mesh(parts):
+    """
+    Merges (positions, offset, scale, rgba) parts into one (positions, colours)
+    pair, the format Renderer.baked() takes.
+    """
+    positions, colors = array('f'), array('f')
+    for part, offset, scale, rgba in parts:
+        moved = transform_positions(part, offset, scale)
+        positions.extend(moved)
+        colors.extend(array('f', rgba) * (len(moved) // 3))
+    return positions, colors
@@ -0,0 +1,145 @@
+"""
+Top-down minimap in the HUD's top-right corner (M toggles, --minimap-rate HZ).
+
+The map shows:
+  - the route through route_beacons (legs already run are dimmed)
+  - the beacons: the current one in the route colour, the drop zone white
+  - the packages still at the station
+  - the spikes and gates, coloured by the state update_hazards() left them in
+  - the active bonus rings
+It is painted through renderer.panel(), into an offscreen texture, at most
+rate times a second of game time (5 Hz by default). Every other frame the
+texture is composited as one textured quad. The only live drawing is the
+courier's marker, a single triangle over the quad, so the courier moves
+smoothly at the full frame rate. The per-frame cost is the same however
+many entities the map holds; a repaint is O(entities) but happens every
+1/rate s. Pausing stops game time and with it the repaints.
+"""
+import math
+
+COLOR_BACKGROUND = (0.05, 0.05, 0.08, 0.75)
+COLOR_BORDER = (0.6, 0.6, 0.6, 1.0)
+COLOR_PACKAGE_TOP = (1.0, 1.0, 1.0)
+COLOR_RING = (1.0, 1.0, 0.0)
+COLOR_COURIER = (1.0, 1.0, 1.0)
+RING_SEGMENTS = 12
+
+
+class Minimap:
+    def __init__(self, arena_size, size=180, rate=5.0, spike_radius=12, gate_size=(50, 5)):
+        self.arena_size = arena_size
+        self.size = size
+        self.rate = rate
+        self.spike_radius = spike_radius
+        self.gate_size = gate_size          # (long side, thin side) in world units
+        self.scale = size / (2.0 * arena_size)
+        self.visible = True
+        self.repaints = 0
+
+    def to_map(self, x, z):
+        """Map pixel of world (x, z): +x to the right, -z (away from the fixed camera) up."""
+        return (x + self.arena_size) * self.scale, (self.arena_size - z) * self.scale
+
+    def version(self, view):
+        """Changes rate times a second of game time, and whenever the layout is rebuilt."""
+        return int(view.game_time * self.rate), view.floor_overlay_version, view.hazard_layout_version
+
+    def draw(self, renderer, view, x, y):
+        """Composites the map with its lower-left corner at window (x, y), then the courier."""
+        if not self.visible:
+            return
+        renderer.panel('minimap', self.version(view), x, y, self.size, self.size,
+                       lambda: self.paint(renderer, view))
+
+        # The courier, live: a triangle pointing along its heading (forward is +sin/+cos in x/z)
+        px, pz = self.to_map(view.player_pos[0], view.player_pos[2])
+        angle = math.radians(view.player_angle)
+        fx, fy = math.sin(angle), -math.cos(angle)
+        renderer.color(*COLOR_COURIER)
+        renderer.triangles([(x + px + fx * 7, y + pz + fy * 7, 0),
+                            (x + px - fx * 4 - fy * 4, y + pz - fy * 4 + fx * 4, 0),
+                            (x + px - fx * 4 + fy * 4, y + pz - fy * 4 - fx * 4, 0)])
+
+    # --- painting (into the panel texture) ---------------------------------
+    def _box(self, renderer, cx, cy, half_w, half_h):
+        renderer.quads([(cx - half_w, cy - half_h, 0), (cx + half_w, cy - half_h, 0),
+                        (cx + half_w, cy + half_h, 0), (cx - half_w, cy + half_h, 0)])
+
+    def _segment(self, renderer, a, b, width):
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        length = math.hypot(dx, dy) or 1.0
+        nx, ny = -dy / length * width / 2, dx / length * width / 2
+        renderer.quads([(a[0] + nx, a[1] + ny, 0), (a[0] - nx, a[1] - ny, 0),
+                        (b[0] - nx, b[1] - ny, 0), (b[0] + nx, b[1] + ny, 0)])
+
+    def paint(self, renderer, view):
+        """The whole map except the courier, in panel pixels."""
+        self.repaints += 1
+        size = self.size
+        renderer.color(*COLOR_BACKGROUND)
+        self._box(renderer, size / 2, size / 2, size / 2, size / 2)
+        renderer.color(*COLOR_BORDER)
+        for cx, cy, hw, hh in ((size / 2, 1, size / 2, 1), (size / 2, size - 1, size / 2, 1),
+                               (1, size / 2, 1, size / 2), (size - 1, size / 2, 1, size / 2)):
+            self._box(renderer, cx, cy, hw, hh)
+
+        # Feature 6: the route, then its beacons
+        beacons = view.route_beacons
+        current = view.current_beacon_index
+        points = [self.to_map(b['pos'][0], b['pos'][2]) for b in beacons]
+        for i in range(1, len(points)):
+            r, g, b = beacons[i]['color']
+            shade = 0.3 if i <= current else 0.8
+            renderer.color(r * shade, g * shade, b * shade)
+            self._segment(renderer, points[i - 1], points[i], 2)
+        for i, (beacon, point) in enumerate(zip(beacons, points)):
+            if i == len(beacons) - 1:
+                color, half = (1.0, 1.0, 1.0), 4
+            elif i == current:
+                color, half = beacon['color'], 4
+            else:
+                color, half = tuple(c * 0.3 for c in beacon['color']), 3
+            renderer.color(*color)
+            self._box(renderer, point[0], point[1], half, half)
+
+        # Feature 5: packages at the station
+        for pkg in view.packages:
+            if not pkg['is_carried']:
+                px, py = self.to_map(pkg['pos'][0], pkg['pos'][2])
+                renderer.color(*pkg['color'])
+                self._box(renderer, px, py, 2.5, 2.5)
+                renderer.color(*COLOR_PACKAGE_TOP)
+                self._box(renderer, px, py, 1, 1)
+
+        # Features 11 & 12: hazards, in the colours draw_hazards() uses
+        half = max(1.5, self.spike_radius * self.scale)
+        for spike in view.spikes:
+            if spike.get('is_dangerous', False) and spike['current_height'] > 40:
+                renderer.color(1.0, 0.1, 0.1)
+            elif spike['current_height'] > 5:
+                renderer.color(1.0, 0.5, 0.0)
+            else:
+                renderer.color(0.3, 0.3, 0.3)
+            sx, sy = self.to_map(spike['pos'][0], spike['pos'][2])
+            self._box(renderer, sx, sy, half, half)
+        long_half = self.gate_size[0] * self.scale / 2
+        thin_half = max(1.0, self.gate_size[1] * self.scale / 2)
+        for gate in view.gates:
+            renderer.color(*((0, 1, 0) if gate['is_open'] else (1, 0, 0)))
+            gx, gy = self.to_map(gate['pos'][0], gate['pos'][2])
+            if gate['orientation'] == 'vertical':
+                self._box(renderer, gx, gy, thin_half, long_half)
+            else:
+                self._box(renderer, gx, gy, long_half, thin_half)
+
+        # Feature 14: active bonus rings as outlines
+        renderer.color(*COLOR_RING)
+        for ring in view.bonus_rings:
+            if ring['active']:
+                cx, cy = self.to_map(ring['pos'][0], ring['pos'][2])
+                radius = max(3.0, ring['radius'] * self.scale)
+                corners = [(cx + radius * math.cos(2 * math.pi * i / RING_SEGMENTS),
+                            cy + radius * math.sin(2 * math.pi * i / RING_SEGMENTS))
+                           for i in range(RING_SEGMENTS + 1)]
+                for a, b in zip(corners, corners[1:]):
+                    self._segment(renderer, a, b, 1.5)
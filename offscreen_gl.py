@@ -0,0 +1,53 @@
+"""
+Offscreen OpenGL context for self-tests and benchmarks without a display.
+
+create_context() uses EGL on Mesa's surfaceless platform, which falls back to
+the llvmpipe software rasterizer when there is no GPU. PyOpenGL picks its
+platform at first import, so call this before anything imports OpenGL
+(including loading the game script). GLUT is not initialised: bitmap text
+and glutSolid* primitives are not available in these contexts.
+"""
+import ctypes
+import os
+import sys
+
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+def create_context(width, height):
+    """Creates and makes current a compatibility-profile context with a width x height pbuffer."""
+    if 'OpenGL' in sys.modules and os.environ.get('PYOPENGL_PLATFORM') != 'egl':
+        raise RuntimeError("create_context() must run before OpenGL is imported")
+    os.environ['PYOPENGL_PLATFORM'] = 'egl'
+    from OpenGL import EGL
+
+    display = EGL.eglGetPlatformDisplay(EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+    if not EGL.eglInitialize(display, None, None):
+        raise RuntimeError("eglInitialize failed")
+    attribs = (EGL.EGLint * 13)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+                                EGL.EGL_DEPTH_SIZE, 24,
+                                EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+    config, count = EGL.EGLConfig(), EGL.EGLint()
+    if not EGL.eglChooseConfig(display, attribs, ctypes.pointer(config), 1, ctypes.pointer(count)) \
+            or count.value == 0:
+        raise RuntimeError("no EGL config with an OpenGL pbuffer")
+    surface = EGL.eglCreatePbufferSurface(
+        display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    if not EGL.eglMakeCurrent(display, surface, surface, context):
+        raise RuntimeError("eglMakeCurrent failed")
+    return display, surface, context
+
+
+def read_pixels(width, height):
+    """RGB bytes of the current framebuffer (bottom row first)."""
+    from OpenGL import GL
+    GL.glFinish()
+    return GL.glReadPixels(0, 0, width, height, GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+
+
+def renderer_string():
+    from OpenGL import GL
+    return f"{GL.glGetString(GL.GL_RENDERER).decode()} / GL {GL.glGetString(GL.GL_VERSION).decode()}"
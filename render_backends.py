@@ -0,0 +1,825 @@
+"""
+Render backends behind the game's draw_* functions.
+
+The draw functions only talk to a Renderer: matrix stack, colour, a few
+primitives (cube, sphere, cylinder, quads, triangles), instanced props,
+baked static geometry, HUD text and the camera. Backends, picked at launch with --renderer NAME:
+
+  null       does nothing; for headless sims and for timing the Python side
+             of the draw_* functions on their own
+  immediate  the original PyOpenGL immediate-mode calls (default); baked
+             geometry goes into display lists
+  retained   raw, unchecked GL entry points; cubes, spheres and cylinders come
+             from vertex buffers built once, and quads/triangles are batched
+             into one vertex array per matrix change; instances() is one
+             instanced draw call per prop type and baked geometry lives in
+             its own vertex buffer
+  queued     retained behind render_queue.RenderQueue, which sorts each
+             frame's world pass by state before submitting it
+
+OpenGL is only imported when a GL backend is created, so the null backend
+works without PyOpenGL or a window. render_bench.py compares the backends.
+"""
+import ctypes
+from array import array
+
+import gl_state
+import meshes
+
+GL = GLU = GLUT = None
+
+# Unit primitives for instances(); sized per instance by (sx, sy, sz)
+UNIT_MESHES = {
+    'cube': lambda slices: (('cube', 1.0), lambda: meshes.cube_mesh(1.0)),
+    'sphere': lambda slices: (('sphere', 1.0, slices, slices), lambda: meshes.sphere_mesh(1.0, slices, slices)),
+    'cylinder': lambda slices: (('cylinder', slices), lambda: meshes.cylinder_mesh(1.0, 1.0, slices)),
+}
+
+INSTANCE_VERTEX_SHADER = """
+#version 120
+attribute vec3 a_pos;
+attribute vec3 a_offset;
+attribute vec3 a_scale;
+attribute vec3 a_color;
+varying vec3 v_color;
+void main() {
+    v_color = a_color;
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(a_offset + a_pos * a_scale, 1.0);
+}
+"""
+
+INSTANCE_FRAGMENT_SHADER = """
+#version 120
+varying vec3 v_color;
+void main() {
+    gl_FragColor = vec4(v_color, 1.0);
+}
+"""
+
+
+def _load_gl():
+    global GL, GLU, GLUT
+    if GL is None:
+        from OpenGL import GL as gl, GLU as glu, GLUT as glut
+        GL, GLU, GLUT = gl, glu, glut
+
+
+class Renderer:
+    """The interface draw_* functions use. Every call is a no-op here."""
+    name = 'null'
+
+    def __init__(self, width=1, height=1):
+        self.width = width
+        self.height = height
+
+    # Frame / camera
+    def begin_frame(self): pass
+    def end_frame(self): pass
+    def set_camera(self, fovy, aspect, near, far, eye, center, up=(0, 1, 0)): pass
+    def load_camera(self, projection, view, eye):
+        """set_camera() from precomputed matrices (camera.Camera), 16 floats each, column-major."""
+    def depth_test(self, enabled): pass
+
+    # Matrix stack and colour
+    def push(self): pass
+    def pop(self): pass
+    def translate(self, x, y, z): pass
+    def rotate(self, angle, x, y, z): pass
+    def scale(self, x, y, z): pass
+    def load_matrix(self, m):
+        """Replaces the modelview matrix with m (16 floats, column-major)."""
+    def color(self, r, g, b, a=1.0): pass
+
+    # Primitives (current colour, current matrix)
+    def cube(self, size): pass
+    def sphere(self, radius, slices, stacks): pass
+    def cylinder(self, radius, height, slices=20):
+        """Capped cylinder standing on the current origin along +y."""
+    def quads(self, vertices): pass
+    def triangles(self, vertices): pass
+
+    def instances(self, shape, rows, slices=20):
+        """
+        Many copies of one unit primitive ('cube', 'sphere' or 'cylinder') under
+        the current matrix. Each row is (x, y, z, sx, sy, sz, r, g, b): the copy
+        is scaled by (sx, sy, sz), placed at (x, y, z) and drawn opaque in (r, g, b).
+        Cylinders stand on their (x, y, z) like cylinder(); cubes and spheres are
+        centred on it.
+        """
+
+    def baked(self, key, version, build):
+        """
+        Static triangles under the current matrix, drawn with one call. build()
+        returns (positions, rgba colours) as flat float sequences and is only
+        called again when version differs from the one last baked under key.
+        """
+
+    # Screen space (pixels, origin bottom-left). hud_begin/hud_end nest: inner
+    # pairs only save and restore the modelview matrix.
+    def hud_begin(self): pass
+    def hud_end(self): pass
+    def text(self, x, y, text, font='helvetica_18'):
+        """Bitmap text at window position (x, y) in the current colour."""
+    def panel(self, key, version, x, y, width, height, draw):
+        """
+        A width x height pixel picture with its lower-left corner at window
+        position (x, y). draw() paints it through this renderer in a 0..width,
+        0..height pixel space. GL backends render that into an offscreen
+        texture and call draw() again only when version differs from the one
+        last painted under key; otherwise the texture is composited as it is.
+        """
+
+    # Diagnostics
+    def gl_stats(self):
+        """Counters of the last finished frame (see gl_state.COUNTERS); empty without GL."""
+        return {}
+
+    def reset_state(self):
+        """Call after GL code outside the renderer has changed state (e.g. a shader pipeline)."""
+
+
+class NullRenderer(Renderer):
+    name = 'null'
+
+
+class TexturePanels:
+    """
+    Renderer.panel() for the GL backends. Each key gets a colour texture
+    attached to its own framebuffer object (GL 3.0 / ARB_framebuffer_object).
+    Repainting binds it, paints with blending off (the texture keeps the exact
+    colours and alpha) and switches back to the window. Every frame the
+    texture is drawn as one textured quad, so a panel costs the same however
+    much went into it. The calls go to the raw entry points for both backends.
+    Without framebuffer objects, draw() paints straight to the screen each frame.
+    """
+    def __init__(self, renderer):
+        from OpenGL.raw.GL.VERSION import GL_1_0, GL_1_1, GL_3_0
+        self.renderer = renderer
+        self.gl, self.gl11, self.gl30 = GL_1_0, GL_1_1, GL_3_0
+        self.supported = bool(GL_3_0.glGenFramebuffers)
+        self.targets = {}               # key -> [version, framebuffer, texture, width, height]
+        self.clear = (ctypes.c_float * 4)(0.0, 0.0, 0.0, 0.0)
+        self.quad = (ctypes.c_float * 16)()
+
+    def draw(self, key, version, x, y, width, height, paint):
+        renderer = self.renderer
+        target = self.targets.get(key)
+        if self.supported and (target is None or target[3:] != [width, height]):
+            target = self._create(key, width, height)
+        if not self.supported:
+            renderer.push()
+            renderer.translate(x, y, 0)
+            paint()
+            renderer.pop()
+            return
+        if target[0] != version:
+            self._paint(target, paint)
+            target[0] = version
+        self._composite(target[2], x, y, width, height)
+
+    def _create(self, key, width, height):
+        gl, gl11, gl30 = self.gl, self.gl11, self.gl30
+        old = self.targets.pop(key, None)
+        if old is not None:
+            gl30.glDeleteFramebuffers(1, (ctypes.c_uint * 1)(old[1]))
+            gl11.glDeleteTextures(1, (ctypes.c_uint * 1)(old[2]))
+        texture, framebuffer = (ctypes.c_uint * 1)(), (ctypes.c_uint * 1)()
+        gl11.glGenTextures(1, texture)
+        gl30.glGenFramebuffers(1, framebuffer)
+        texture, framebuffer = texture[0], framebuffer[0]
+        gl11.glBindTexture(gl.GL_TEXTURE_2D, texture)
+        # No mipmaps: the default minifying filter would leave the texture incomplete
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl11.GL_RGBA8, width, height, 0,
+                        gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        gl11.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl30.glBindFramebuffer(gl30.GL_FRAMEBUFFER, framebuffer)
+        gl30.glFramebufferTexture2D(gl30.GL_FRAMEBUFFER, gl30.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, texture, 0)
+        complete = gl30.glCheckFramebufferStatus(gl30.GL_FRAMEBUFFER) == gl30.GL_FRAMEBUFFER_COMPLETE
+        gl30.glBindFramebuffer(gl30.GL_FRAMEBUFFER, 0)
+        if not complete:
+            gl30.glDeleteFramebuffers(1, (ctypes.c_uint * 1)(framebuffer))
+            gl11.glDeleteTextures(1, (ctypes.c_uint * 1)(texture))
+            self.supported = False
+            return None
+        target = self.targets[key] = [None, framebuffer, texture, width, height]
+        return target
+
+    def _paint(self, target, paint):
+        renderer, gl, gl30 = self.renderer, self.gl, self.gl30
+        state = renderer.state
+        _, framebuffer, _, width, height = target
+        gl30.glBindFramebuffer(gl30.GL_FRAMEBUFFER, framebuffer)
+        gl.glViewport(0, 0, width, height)
+        gl30.glClearBufferfv(gl.GL_COLOR, 0, self.clear)
+        state.set_enabled(gl.GL_BLEND, False)
+        state.matrix_mode(gl.GL_PROJECTION)
+        gl.glPushMatrix()
+        gl.glLoadIdentity()
+        gl.glOrtho(0, width, 0, height, -1, 1)
+        state.matrix_mode(gl.GL_MODELVIEW)
+        renderer.push()
+        gl.glLoadIdentity()
+        paint()
+        renderer.pop()                  # also flushes the retained backend's batch into the texture
+        state.matrix_mode(gl.GL_PROJECTION)
+        gl.glPopMatrix()
+        state.matrix_mode(gl.GL_MODELVIEW)
+        state.set_enabled(gl.GL_BLEND, True)
+        gl30.glBindFramebuffer(gl30.GL_FRAMEBUFFER, 0)
+        gl.glViewport(0, 0, renderer.width, renderer.height)
+        renderer.counts['matrix'] += 6
+        renderer.counts['state'] += 4
+
+    def _composite(self, texture, x, y, width, height):
+        gl, gl11, state = self.gl, self.gl11, self.renderer.state
+        # x, y, u, v per corner, from client memory (raw glBegin/glEnd would trip the error check)
+        quad = self.quad
+        quad[:] = (x, y, 0.0, 0.0, x + width, y, 1.0, 0.0,
+                   x + width, y + height, 1.0, 1.0, x, y + height, 0.0, 1.0)
+        state.set_enabled(gl.GL_TEXTURE_2D, True)
+        gl11.glBindTexture(gl.GL_TEXTURE_2D, texture)
+        state.color(1.0, 1.0, 1.0, 1.0)
+        state.bind_buffer(0)
+        state.client_state(gl11.GL_VERTEX_ARRAY, True)
+        state.client_state(gl11.GL_COLOR_ARRAY, False)
+        state.client_state(gl11.GL_TEXTURE_COORD_ARRAY, True)
+        gl11.glVertexPointer(2, gl.GL_FLOAT, 16, quad)
+        gl11.glTexCoordPointer(2, gl.GL_FLOAT, 16, ctypes.byref(quad, 8))
+        state.vertex_source = None      # client memory; the next mesh re-points
+        gl11.glDrawArrays(gl.GL_QUADS, 0, 4)
+        state.client_state(gl11.GL_TEXTURE_COORD_ARRAY, False)
+        gl11.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        state.set_enabled(gl.GL_TEXTURE_2D, False)
+        counts = self.renderer.counts
+        counts['draw'] += 1
+        counts['vertex'] += 4
+        counts['state'] += 2
+
+
+class ImmediateRenderer(Renderer):
+    """The game's original immediate-mode PyOpenGL path."""
+    name = 'immediate'
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        _load_gl()
+        self.fonts = {'helvetica_18': GLUT.GLUT_BITMAP_HELVETICA_18,
+                      'times_roman_24': GLUT.GLUT_BITMAP_TIMES_ROMAN_24}
+        self.quadric = GLU.gluNewQuadric()  # one quadric reused for every cylinder
+        self.display_lists = {}             # baked key -> (version, list id)
+        self.state = gl_state.GLState(GL)
+        self.counts = self.state.counts
+        self.hud_depth = 0
+        self.color = self.state.color
+        self.panels = TexturePanels(self)
+        # Blending never changes after this, so it is set once rather than every frame
+        self.state.set_enabled(GL.GL_BLEND, True)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+
+    def gl_stats(self):
+        return self.state.last_frame
+
+    def reset_state(self):
+        self.state.reset()
+
+    def begin_frame(self):
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        self.state.set_enabled(GL.GL_DEPTH_TEST, True)
+
+    def end_frame(self):
+        self.state.end_frame()
+
+    def set_camera(self, fovy, aspect, near, far, eye, center, up=(0, 1, 0)):
+        self.state.matrix_mode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
+        GLU.gluPerspective(fovy, aspect, near, far)
+        self.state.matrix_mode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
+        GLU.gluLookAt(*eye, *center, *up)
+        self.counts['matrix'] += 4
+
+    def load_camera(self, projection, view, eye):
+        self.state.matrix_mode(GL.GL_PROJECTION)
+        GL.glLoadMatrixf(projection)
+        self.state.matrix_mode(GL.GL_MODELVIEW)
+        GL.glLoadMatrixf(view)
+        self.counts['matrix'] += 2
+
+    def depth_test(self, enabled):
+        self.state.set_enabled(GL.GL_DEPTH_TEST, enabled)
+
+    def push(self):
+        self.counts['matrix'] += 1
+        GL.glPushMatrix()
+
+    def pop(self):
+        self.counts['matrix'] += 1
+        GL.glPopMatrix()
+
+    def translate(self, x, y, z):
+        self.counts['matrix'] += 1
+        GL.glTranslatef(x, y, z)
+
+    def rotate(self, angle, x, y, z):
+        self.counts['matrix'] += 1
+        GL.glRotatef(angle, x, y, z)
+
+    def scale(self, x, y, z):
+        self.counts['matrix'] += 1
+        GL.glScalef(x, y, z)
+
+    def load_matrix(self, m):
+        self.counts['matrix'] += 1
+        GL.glLoadMatrixf(m)
+
+    def cube(self, size):
+        self.counts['draw'] += 1
+        GLUT.glutSolidCube(size)
+
+    def sphere(self, radius, slices, stacks):
+        self.counts['draw'] += 1
+        GLUT.glutSolidSphere(radius, slices, stacks)
+
+    def cylinder(self, radius, height, slices=20):
+        GL.glPushMatrix()
+        GL.glRotatef(-90, 1, 0, 0)
+        GLU.gluCylinder(self.quadric, radius, radius, height, slices, 20)
+        GL.glTranslatef(0, 0, height)
+        GLU.gluDisk(self.quadric, 0, radius, slices, 1)
+        GL.glPopMatrix()
+        self.counts['matrix'] += 4
+        self.counts['draw'] += 2
+
+    def instances(self, shape, rows, slices=20):
+        for x, y, z, sx, sy, sz, r, g, b in rows:
+            self.push()
+            self.translate(x, y, z)
+            self.color(r, g, b, 1.0)
+            if shape == 'cylinder':
+                self.cylinder(sx, sy, slices)
+            else:
+                self.scale(sx, sy, sz)
+                if shape == 'cube':
+                    self.cube(1)
+                else:
+                    self.sphere(1, slices, slices)
+            self.pop()
+
+    def baked(self, key, version, build):
+        entry = self.display_lists.get(key)
+        if entry is None or entry[0] != version:
+            list_id = entry[1] if entry else GL.glGenLists(1)
+            positions, colors = build()
+            GL.glNewList(list_id, GL.GL_COMPILE)
+            GL.glBegin(GL.GL_TRIANGLES)
+            for i in range(len(positions) // 3):
+                GL.glColor4f(*colors[i * 4:i * 4 + 4])
+                GL.glVertex3f(*positions[i * 3:i * 3 + 3])
+            GL.glEnd()
+            GL.glEndList()
+            entry = self.display_lists[key] = (version, list_id)
+        GL.glCallList(entry[1])
+        self.counts['draw'] += 1
+        self.state.rgba = None  # the list leaves its last vertex colour current
+
+    def quads(self, vertices):
+        GL.glBegin(GL.GL_QUADS)
+        for v in vertices:
+            GL.glVertex3f(*v)
+        GL.glEnd()
+        self.counts['begin'] += 1
+        self.counts['vertex'] += len(vertices)
+
+    def triangles(self, vertices):
+        GL.glBegin(GL.GL_TRIANGLES)
+        for v in vertices:
+            GL.glVertex3f(*v)
+        GL.glEnd()
+        self.counts['begin'] += 1
+        self.counts['vertex'] += len(vertices)
+
+    def hud_begin(self):
+        # Nested hud_begin() calls (the whole HUD wraps its widgets) only save the modelview
+        self.hud_depth += 1
+        if self.hud_depth > 1:
+            self.push()
+            return
+        self.state.matrix_mode(GL.GL_PROJECTION)
+        GL.glPushMatrix()
+        GL.glLoadIdentity()
+        GLU.gluOrtho2D(0, self.width, 0, self.height)
+        self.state.matrix_mode(GL.GL_MODELVIEW)
+        GL.glPushMatrix()
+        GL.glLoadIdentity()
+        self.counts['matrix'] += 5
+
+    def hud_end(self):
+        self.hud_depth -= 1
+        if self.hud_depth:
+            self.pop()
+            return
+        GL.glPopMatrix()
+        self.state.matrix_mode(GL.GL_PROJECTION)
+        GL.glPopMatrix()
+        self.state.matrix_mode(GL.GL_MODELVIEW)
+        self.counts['matrix'] += 2
+
+    def text(self, x, y, text, font='helvetica_18'):
+        # Window-space raster position: no projection/modelview switch per string
+        GL.glWindowPos2f(x, y)
+        font = self.fonts[font]
+        for char in text:
+            GLUT.glutBitmapCharacter(font, ord(char))
+        self.counts['draw'] += len(text)
+
+    def panel(self, key, version, x, y, width, height, draw):
+        self.panels.draw(key, version, x, y, width, height, draw)
+
+
+class RetainedRenderer(Renderer):
+    """
+    Raw-binding path. Calls go straight to the ctypes entry points in
+    OpenGL.raw (no argument conversion or glGetError per call). Solid
+    primitives are uploaded once per shape into vertex and index buffers
+    (straight from the memory-mapped bake_meshes cache when it has the shape)
+    and drawn with one glDrawElements; loose quads/triangles collect into a position+colour
+    array that is drawn whenever the matrix or state changes. Colour, enables,
+    client arrays, buffer and program binds go through a GLState, so calls
+    that would not change anything are never issued.
+
+    instances() streams the rows into a per-instance buffer and draws them with
+    glDrawElementsInstanced (GL 3.3 / ARB_instanced_arrays). Without instancing,
+    or with instancing set to False, the copies are expanded on the CPU into
+    the quad/triangle batch instead, which is still one draw call.
+    """
+    name = 'retained'
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        _load_gl()
+        from OpenGL.raw.GL.VERSION import GL_1_0, GL_1_1, GL_1_4, GL_1_5, GL_2_0
+        from OpenGL.raw import GLU as raw_glu
+        self.gl = GL_1_0
+        self.gl11 = GL_1_1
+        self.gl14 = GL_1_4
+        self.gl15 = GL_1_5
+        self.gl20 = GL_2_0
+        self.glu = raw_glu
+        self.state = gl_state.GLState(GL_1_0, GL_1_1, GL_1_5, GL_2_0)
+        self.counts = self.state.counts
+        self.hud_depth = 0
+        self.fonts = {'helvetica_18': GLUT.GLUT_BITMAP_HELVETICA_18,
+                      'times_roman_24': GLUT.GLUT_BITMAP_TIMES_ROMAN_24}
+        self.meshes = {}                # (kind, params) -> (vbo, index buffer, index count, index type)
+        import bake_meshes
+        self.mesh_assets = bake_meshes.load()   # memory-mapped unit meshes; {} until baked
+        self.batch_pos = array('f')
+        self.batch_col = array('f')
+        self.rgba = (1.0, 1.0, 1.0, 1.0)
+        self.cpu_meshes = {}            # unit mesh key -> vertex tuples for the batched fallback
+        self.baked_buffers = {}         # baked key -> (version, vbo, vertex count)
+        self.instance_program = None
+        self.instancing = self._init_instancing()
+        self.panels = TexturePanels(self)
+        # Blending never changes after this, so it is set once rather than every frame
+        self.state.set_enabled(self.gl.GL_BLEND, True)
+        self.gl.glBlendFunc(self.gl.GL_SRC_ALPHA, self.gl.GL_ONE_MINUS_SRC_ALPHA)
+
+    def _init_instancing(self):
+        from OpenGL.raw.GL.VERSION import GL_3_1, GL_3_3
+        if not (GL_3_1.glDrawElementsInstanced and GL_3_3.glVertexAttribDivisor):
+            return False
+        from OpenGL.GL import shaders
+        try:
+            program = shaders.compileProgram(
+                shaders.compileShader(INSTANCE_VERTEX_SHADER, GL.GL_VERTEX_SHADER),
+                shaders.compileShader(INSTANCE_FRAGMENT_SHADER, GL.GL_FRAGMENT_SHADER))
+        except RuntimeError:
+            return False
+        self.gl31, self.gl33 = GL_3_1, GL_3_3
+        self.instance_program = program
+        self.instance_attribs = [GL.glGetAttribLocation(program, name)
+                                 for name in ('a_pos', 'a_offset', 'a_scale', 'a_color')]
+        self.instance_vbo = GL.glGenBuffers(1)
+        return True
+
+    def gl_stats(self):
+        return self.state.last_frame
+
+    def reset_state(self):
+        self.state.reset()
+
+    # --- batching -------------------------------------------------------
+    def flush(self):
+        count = len(self.batch_pos) // 3
+        if not count:
+            return
+        gl11, state = self.gl11, self.state
+        state.bind_buffer(0)
+        state.client_state(gl11.GL_VERTEX_ARRAY, True)
+        state.client_state(gl11.GL_COLOR_ARRAY, True)
+        gl11.glVertexPointer(3, gl11.GL_FLOAT, 0, ctypes.c_void_p(self.batch_pos.buffer_info()[0]))
+        gl11.glColorPointer(4, gl11.GL_FLOAT, 0, ctypes.c_void_p(self.batch_col.buffer_info()[0]))
+        state.vertex_source = None      # client memory; re-point next time
+        gl11.glDrawArrays(gl11.GL_TRIANGLES, 0, count)
+        state.rgba = None               # colour arrays leave the current colour undefined
+        self.counts['draw'] += 1
+        self.counts['vertex'] += count
+        del self.batch_pos[:]
+        del self.batch_col[:]
+
+    def _emit(self, vertices):
+        pos = self.batch_pos
+        for v in vertices:
+            pos.extend(v)
+        self.batch_col.extend(self.rgba * len(vertices))
+
+    def _upload(self, vbo, data, usage, elements=False):
+        """Fills vbo from an array, or from a ctypes array over a mapped .npy (bake_meshes.load())."""
+        gl15 = self.gl15
+        if elements:
+            self.state.bind_element_buffer(vbo)
+        else:
+            self.state.bind_buffer(vbo)
+        if isinstance(data, array):
+            address, size = data.buffer_info()[0], len(data) * data.itemsize
+        else:
+            address, size = ctypes.addressof(data), ctypes.sizeof(data)
+        gl15.glBufferData(gl15.GL_ELEMENT_ARRAY_BUFFER if elements else gl15.GL_ARRAY_BUFFER,
+                          size, ctypes.c_void_p(address), usage)
+
+    def _mesh(self, key, build):
+        """Uploads an indexed mesh once: from the baked cache if it has key, else tessellated by build()."""
+        entry = self.meshes.get(key)
+        if entry is None:
+            vertices, indices = self.mesh_assets.get(key) or meshes.index_mesh(build())
+            buffers = (ctypes.c_uint * 2)()
+            self.gl15.glGenBuffers(2, buffers)
+            self._upload(buffers[0], vertices, self.gl15.GL_STATIC_DRAW)
+            self._upload(buffers[1], indices, self.gl15.GL_STATIC_DRAW, elements=True)
+            wide = (indices.itemsize if isinstance(indices, array) else ctypes.sizeof(indices._type_)) == 4
+            entry = self.meshes[key] = (buffers[0], buffers[1], len(indices),
+                                        self.gl11.GL_UNSIGNED_INT if wide else self.gl11.GL_UNSIGNED_SHORT)
+        return entry
+
+    def _draw_mesh(self, key, build):
+        vbo, ibo, count, index_type = self._mesh(key, build)
+        gl11, state = self.gl11, self.state
+        state.color(*self.rgba)
+        state.client_state(gl11.GL_VERTEX_ARRAY, True)
+        state.client_state(gl11.GL_COLOR_ARRAY, False)
+        if state.vertex_source != vbo:
+            state.bind_buffer(vbo)
+            gl11.glVertexPointer(3, gl11.GL_FLOAT, 0, None)
+            state.vertex_source = vbo
+        else:
+            self.counts['dropped'] += 2
+        state.bind_element_buffer(ibo)
+        gl11.glDrawElements(gl11.GL_TRIANGLES, count, index_type, None)
+        self.counts['draw'] += 1
+        self.counts['vertex'] += count
+
+    def _draw_instanced(self, key, build, data, count):
+        vbo, ibo, vertex_count, index_type = self._mesh(key, build)
+        gl11, gl20, gl33, state = self.gl11, self.gl20, self.gl33, self.state
+        a_pos, a_offset, a_scale, a_color = self.instance_attribs
+        state.use_program(self.instance_program)
+        state.client_state(gl11.GL_VERTEX_ARRAY, False)
+
+        state.bind_buffer(vbo)
+        gl20.glEnableVertexAttribArray(a_pos)
+        gl20.glVertexAttribPointer(a_pos, 3, gl11.GL_FLOAT, gl11.GL_FALSE, 0, None)
+
+        self._upload(self.instance_vbo, data, self.gl15.GL_STREAM_DRAW)
+        for i, index in enumerate((a_offset, a_scale, a_color)):
+            gl20.glEnableVertexAttribArray(index)
+            gl20.glVertexAttribPointer(index, 3, gl11.GL_FLOAT, gl11.GL_FALSE, 36, ctypes.c_void_p(i * 12))
+            gl33.glVertexAttribDivisor(index, 1)
+
+        state.bind_element_buffer(ibo)
+        self.gl31.glDrawElementsInstanced(gl11.GL_TRIANGLES, vertex_count, index_type, None, count)
+
+        for index in (a_offset, a_scale, a_color):
+            gl33.glVertexAttribDivisor(index, 0)
+            gl20.glDisableVertexAttribArray(index)
+        gl20.glDisableVertexAttribArray(a_pos)
+        state.use_program(0)
+        state.vertex_source = None      # attribute 0 may alias the fixed-function vertex array
+        self.counts['state'] += 16
+        self.counts['draw'] += 1
+        self.counts['vertex'] += vertex_count * count
+
+    def _emit_instances(self, key, build, rows):
+        verts = self.cpu_meshes.get(key)
+        if verts is None:
+            vertices, indices = self.mesh_assets.get(key) or meshes.index_mesh(build())
+            verts = self.cpu_meshes[key] = [tuple(vertices[i * 3:i * 3 + 3]) for i in indices]
+        pos, col = self.batch_pos, self.batch_col
+        for x, y, z, sx, sy, sz, r, g, b in rows:
+            pos.extend([c for vx, vy, vz in verts for c in (x + vx * sx, y + vy * sy, z + vz * sz)])
+            col.extend((r, g, b, 1.0) * len(verts))
+
+    # --- interface ------------------------------------------------------
+    def begin_frame(self):
+        gl = self.gl
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+        self.state.set_enabled(gl.GL_DEPTH_TEST, True)
+
+    def end_frame(self):
+        self.flush()
+        self.state.bind_buffer(0)
+        self.state.end_frame()
+
+    def set_camera(self, fovy, aspect, near, far, eye, center, up=(0, 1, 0)):
+        self.flush()
+        gl = self.gl
+        self.state.matrix_mode(gl.GL_PROJECTION)
+        gl.glLoadIdentity()
+        self.glu.gluPerspective(fovy, aspect, near, far)
+        self.state.matrix_mode(gl.GL_MODELVIEW)
+        gl.glLoadIdentity()
+        self.glu.gluLookAt(*eye, *center, *up)
+        self.counts['matrix'] += 4
+
+    def load_camera(self, projection, view, eye):
+        self.flush()
+        gl = self.gl
+        self.state.matrix_mode(gl.GL_PROJECTION)
+        gl.glLoadMatrixf((ctypes.c_float * 16)(*projection))
+        self.state.matrix_mode(gl.GL_MODELVIEW)
+        gl.glLoadMatrixf((ctypes.c_float * 16)(*view))
+        self.counts['matrix'] += 2
+
+    def depth_test(self, enabled):
+        self.flush()
+        self.state.set_enabled(self.gl.GL_DEPTH_TEST, enabled)
+
+    def push(self):
+        self.flush()
+        self.gl.glPushMatrix()
+        self.counts['matrix'] += 1
+
+    def pop(self):
+        self.flush()
+        self.gl.glPopMatrix()
+        self.counts['matrix'] += 1
+
+    def translate(self, x, y, z):
+        self.flush()
+        self.gl.glTranslatef(x, y, z)
+        self.counts['matrix'] += 1
+
+    def rotate(self, angle, x, y, z):
+        self.flush()
+        self.gl.glRotatef(angle, x, y, z)
+        self.counts['matrix'] += 1
+
+    def scale(self, x, y, z):
+        self.flush()
+        self.gl.glScalef(x, y, z)
+        self.counts['matrix'] += 1
+
+    def load_matrix(self, m):
+        self.flush()
+        self.gl.glLoadMatrixf((ctypes.c_float * 16)(*m))
+        self.counts['matrix'] += 1
+
+    def color(self, r, g, b, a=1.0):
+        self.rgba = (r, g, b, a)
+
+    def cube(self, size):
+        self._draw_mesh(('cube', size), lambda: meshes.cube_mesh(size))
+
+    def sphere(self, radius, slices, stacks):
+        self._draw_mesh(('sphere', radius, slices, stacks), lambda: meshes.sphere_mesh(radius, slices, stacks))
+
+    def cylinder(self, radius, height, slices=20):
+        self.flush()
+        self.gl.glPushMatrix()
+        self.gl.glScalef(radius, height, radius)
+        self._draw_mesh(('cylinder', slices), lambda: meshes.cylinder_mesh(1.0, 1.0, slices))
+        self.gl.glPopMatrix()
+        self.counts['matrix'] += 3
+
+    def baked(self, key, version, build):
+        entry = self.baked_buffers.get(key)
+        gl11, state = self.gl11, self.state
+        if entry is None or entry[0] != version:
+            if entry is None:
+                vbo = (ctypes.c_uint * 1)()
+                self.gl15.glGenBuffers(1, vbo)
+                vbo = vbo[0]
+            else:
+                vbo = entry[1]
+            positions, colors = build()
+            count = len(positions) // 3
+            data = array('f', [v for i in range(count)
+                               for v in (*positions[i * 3:i * 3 + 3], *colors[i * 4:i * 4 + 4])])
+            self._upload(vbo, data, self.gl15.GL_STATIC_DRAW)
+            entry = self.baked_buffers[key] = (version, vbo, count)
+        version, vbo, count = entry
+        if not count:
+            return
+        self.flush()
+        state.bind_buffer(vbo)
+        state.client_state(gl11.GL_VERTEX_ARRAY, True)
+        state.client_state(gl11.GL_COLOR_ARRAY, True)
+        gl11.glVertexPointer(3, gl11.GL_FLOAT, 28, None)
+        gl11.glColorPointer(4, gl11.GL_FLOAT, 28, ctypes.c_void_p(12))
+        state.vertex_source = None      # interleaved stride; the next mesh re-points
+        gl11.glDrawArrays(gl11.GL_TRIANGLES, 0, count)
+        state.rgba = None
+        self.counts['draw'] += 1
+        self.counts['vertex'] += count
+
+    def instances(self, shape, rows, slices=20):
+        if not rows:
+            return
+        key, build = UNIT_MESHES[shape](slices)
+        if self.instancing:
+            self.flush()
+            data = array('f', [v for row in rows for v in row])
+            self._draw_instanced(key, build, data, len(rows))
+        else:
+            self._emit_instances(key, build, rows)
+
+    def quads(self, vertices):
+        for i in range(0, len(vertices), 4):
+            a, b, c, d = vertices[i:i + 4]
+            self._emit((a, b, c, a, c, d))
+
+    def triangles(self, vertices):
+        self._emit(vertices)
+
+    def hud_begin(self):
+        self.flush()
+        # Nested hud_begin() calls (the whole HUD wraps its widgets) only save the modelview
+        self.hud_depth += 1
+        gl = self.gl
+        if self.hud_depth > 1:
+            gl.glPushMatrix()
+            self.counts['matrix'] += 1
+            return
+        self.state.matrix_mode(gl.GL_PROJECTION)
+        gl.glPushMatrix()
+        gl.glLoadIdentity()
+        self.glu.gluOrtho2D(0, self.width, 0, self.height)
+        self.state.matrix_mode(gl.GL_MODELVIEW)
+        gl.glPushMatrix()
+        gl.glLoadIdentity()
+        self.counts['matrix'] += 5
+
+    def hud_end(self):
+        self.flush()
+        self.hud_depth -= 1
+        gl = self.gl
+        if self.hud_depth:
+            gl.glPopMatrix()
+            self.counts['matrix'] += 1
+            return
+        gl.glPopMatrix()
+        self.state.matrix_mode(gl.GL_PROJECTION)
+        gl.glPopMatrix()
+        self.state.matrix_mode(gl.GL_MODELVIEW)
+        self.counts['matrix'] += 2
+
+    def text(self, x, y, text, font='helvetica_18'):
+        self.flush()
+        # Window-space raster position: no projection/modelview switch per string
+        self.state.color(*self.rgba)
+        self.gl14.glWindowPos2f(x, y)
+        font = self.fonts[font]
+        if GLUT.glutBitmapString:
+            GLUT.glutBitmapString(font, text.encode())
+        else:
+            for char in text:
+                GLUT.glutBitmapCharacter(font, ord(char))
+        self.counts['draw'] += len(text)
+
+    def panel(self, key, version, x, y, width, height, draw):
+        self.flush()
+        self.panels.draw(key, version, x, y, width, height, draw)
+
+
+def QueuedRenderer(width, height):
+    """The retained backend behind a sorted render queue (render_queue.py)."""
+    import render_queue
+    return render_queue.RenderQueue(RetainedRenderer(width, height))
+
+
+RENDERERS = {
+    'null': NullRenderer,
+    'immediate': ImmediateRenderer,
+    'retained': RetainedRenderer,
+    'queued': QueuedRenderer,
+}
+
+
+def create_renderer(name, width=1, height=1):
+    """Instantiates a backend by name; GL backends need a current context."""
+    cls = RENDERERS.get(name)
+    if cls is None:
+        raise ValueError(f"unknown renderer {name!r} (choose from {', '.join(RENDERERS)})")
+    return cls(width, height)
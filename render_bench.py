@@ -0,0 +1,115 @@
+"""
+Render backend benchmark.
+
+Loads the game, plays a few seconds with the scripted courier so the scene
+is populated, then times render_frame() on each backend:
+
+    python render_bench.py --frames 300 --renderers null,immediate,retained
+
+GL backends render into a hidden GLUT window; the null backend needs no GL
+and measures the Python cost of the draw_* functions alone. --props N
+scatters N extra packages, beacons, spikes and gates over the arena to
+stress the instanced prop path (--no-instancing times the batched fallback).
+"""
+import argparse
+import math
+import random
+import time
+
+import courier_env
+import render_backends
+
+
+def open_gl_window(width, height):
+    """Creates a hidden GLUT window so the GL backends have a context."""
+    from OpenGL import GLUT
+    GLUT.glutInit()
+    GLUT.glutInitDisplayMode(GLUT.GLUT_DOUBLE | GLUT.GLUT_RGB | GLUT.GLUT_DEPTH)
+    GLUT.glutInitWindowSize(width, height)
+    GLUT.glutCreateWindow(b"Courier Run render bench")
+    GLUT.glutHideWindow()
+
+
+def add_props(game, count, seed=0):
+    """Scatters count extra props, split evenly between packages, beacons, spikes and gates."""
+    rng = random.Random(seed)
+    extent = game.ARENA_SIZE - 20
+
+    def spot(y=0.0):
+        return [rng.uniform(-extent, extent), y, rng.uniform(-extent, extent)]
+
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            game.packages.append({'pos': spot(7.5), 'color': rng.choice(game.ROUTE_COLORS),
+                                  'is_correct': False, 'is_carried': False})
+        elif kind == 1:
+            # Keep the white drop zone last
+            game.route_beacons.insert(-1, {'pos': spot(), 'color': game.route_color})
+        elif kind == 2:
+            game.spikes.append({'pos': spot(), 'current_height': 0, 'max_height': 80,
+                                'cycle_offset': rng.uniform(0, 2 * math.pi)})
+        else:
+            game.gates.append({'pos': spot(), 'current_height': 0, 'max_height': 100, 'is_open': True,
+                               'orientation': rng.choice(['vertical', 'horizontal']),
+                               'cycle_offset': rng.uniform(0, 2 * math.pi)})
+    game.hazard_layout_version += 1
+    game.update_hazards(0.0)
+
+
+def finish():
+    if render_backends.GL is not None:
+        render_backends.GL.glFinish()
+
+
+def bench(game, name, frames, warmup=10, instancing=True):
+    """Returns seconds per frame for one backend."""
+    game.renderer = render_backends.create_renderer(name, game.WINDOW_WIDTH, game.WINDOW_HEIGHT)
+    if not instancing and hasattr(game.renderer, 'instancing'):
+        game.renderer.instancing = False
+    for _ in range(warmup):
+        game.render_frame()
+    finish()
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.render_frame()
+    finish()
+    return (time.perf_counter() - start) / frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Courier Run render backends.")
+    parser.add_argument('--renderers', default=','.join(render_backends.RENDERERS))
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--warm-seconds', type=float, default=5.0, help="game time played before timing")
+    parser.add_argument('--follow', action='store_true', help="use the follow camera")
+    parser.add_argument('--props', type=int, default=0, help="extra props scattered over the arena")
+    parser.add_argument('--no-instancing', action='store_true', help="force the batched prop fallback")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.renderers.split(',') if n.strip()]
+    env = courier_env.CourierEnv(seed=args.seed)
+    obs = env.reset()
+    while env.game.game_time < args.warm_seconds:
+        obs, *_ = env.step(courier_env.scripted_action(obs))
+    game = env.game
+    game.camera_mode_is_follow = args.follow
+    if args.props:
+        add_props(game, args.props, args.seed)
+
+    if any(n != 'null' for n in names):
+        open_gl_window(game.WINDOW_WIDTH, game.WINDOW_HEIGHT)
+
+    print(f"{'renderer':<12}{'ms/frame':>10}{'fps':>10}")
+    for name in names:
+        seconds = bench(game, name, args.frames, instancing=not args.no_instancing)
+        print(f"{name:<12}{seconds * 1000:>10.3f}{1.0 / seconds:>10.1f}")
+        stats = dict(game.renderer.gl_stats())
+        stats.update(getattr(game.renderer, 'stats', None) or {})
+        if stats:
+            print("    " + "  ".join(f"{key}={value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
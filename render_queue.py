@@ -0,0 +1,369 @@
+"""
+Sorted render queue (--renderer queued).
+
+RenderQueue sits in front of another backend (the retained one) and keeps
+the same Renderer interface, so the draw_* functions submit to it
+unchanged. During the world pass every primitive becomes a draw item:
+its mesh, model matrix (tracked on the CPU), colour and a blend flag
+(alpha < 1). Nothing reaches GL until the pass ends, at the first
+depth_test(), hud_begin(), text() or end_frame(). The queue then sorts the
+items and submits them:
+
+  opaque   loose geometry, then meshes grouped by shape and colour, then
+           instanced props; front-to-back inside each group
+  blended  back-to-front by distance from the eye
+
+An item's distance is measured to its model origin, or for loose geometry
+(already in world space) to the centroid of its vertices. Baked layers are
+blended when any of their vertex colours is translucent.
+
+Each item is placed with one load_matrix(view * model) instead of the
+push/translate/.../pop sequence that built it. HUD drawing passes straight
+through in call order.
+
+stats holds the last frame's numbers (QUEUE_STATS, summed over the
+frame's passes), e.g. state_changes against state_changes_unsorted, the
+count if items had been drawn in submission order. gl_stats() reports
+QUEUE_COUNTERS of them after the target's GL counters, so --gl-stats and
+--gl-stats-log show what the sorting saved.
+"""
+import math
+
+import render_backends
+
+IDENTITY = (1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            0.0, 0.0, 0.0, 1.0)
+
+QUEUE_STATS = ('items', 'opaque', 'blended', 'state_changes', 'state_changes_unsorted', 'state_changes_avoided')
+# The ones gl_stats() adds to the GL counters
+QUEUE_COUNTERS = ('items', 'blended', 'state_changes', 'state_changes_avoided')
+
+# Opaque submission order by item kind
+GROUP_ORDER = {'geometry': 0, 'mesh': 1, 'instances': 2, 'baked': 3}
+
+
+def mat_mul(a, b):
+    """a * b for column-major 4x4 matrices stored as 16-tuples."""
+    a0, a1, a2, a3, a4, a5, a6, a7, a8, a9, a10, a11, a12, a13, a14, a15 = a
+    out = []
+    for col in (0, 4, 8, 12):
+        b0, b1, b2, b3 = b[col:col + 4]
+        out += (a0 * b0 + a4 * b1 + a8 * b2 + a12 * b3,
+                a1 * b0 + a5 * b1 + a9 * b2 + a13 * b3,
+                a2 * b0 + a6 * b1 + a10 * b2 + a14 * b3,
+                a3 * b0 + a7 * b1 + a11 * b2 + a15 * b3)
+    return tuple(out)
+
+
+def translated(m, x, y, z):
+    """m * translation(x, y, z), touching only the last column."""
+    return m[:12] + (m[0] * x + m[4] * y + m[8] * z + m[12],
+                     m[1] * x + m[5] * y + m[9] * z + m[13],
+                     m[2] * x + m[6] * y + m[10] * z + m[14],
+                     m[3] * x + m[7] * y + m[11] * z + m[15])
+
+
+def translation(x, y, z):
+    return (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, x, y, z, 1.0)
+
+
+def scaling(x, y, z):
+    return (x, 0.0, 0.0, 0.0, 0.0, y, 0.0, 0.0, 0.0, 0.0, z, 0.0, 0.0, 0.0, 0.0, 1.0)
+
+
+def rotation(angle, x, y, z):
+    """Same matrix as glRotatef(angle, x, y, z)."""
+    length = math.sqrt(x * x + y * y + z * z)
+    x, y, z = x / length, y / length, z / length
+    c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    t = 1.0 - c
+    return (t * x * x + c, t * x * y + s * z, t * x * z - s * y, 0.0,
+            t * x * y - s * z, t * y * y + c, t * y * z + s * x, 0.0,
+            t * x * z + s * y, t * y * z - s * x, t * z * z + c, 0.0,
+            0.0, 0.0, 0.0, 1.0)
+
+
+def look_at(eye, center, up):
+    """Same matrix as gluLookAt()."""
+    f = [center[i] - eye[i] for i in range(3)]
+    n = math.sqrt(sum(v * v for v in f))
+    f = [v / n for v in f]
+    s = [f[1] * up[2] - f[2] * up[1], f[2] * up[0] - f[0] * up[2], f[0] * up[1] - f[1] * up[0]]
+    n = math.sqrt(sum(v * v for v in s))
+    s = [v / n for v in s]
+    u = [s[1] * f[2] - s[2] * f[1], s[2] * f[0] - s[0] * f[2], s[0] * f[1] - s[1] * f[0]]
+    rot = (s[0], u[0], -f[0], 0.0,
+           s[1], u[1], -f[1], 0.0,
+           s[2], u[2], -f[2], 0.0,
+           0.0, 0.0, 0.0, 1.0)
+    return mat_mul(rot, translation(-eye[0], -eye[1], -eye[2]))
+
+
+def transform_point(m, v):
+    x, y, z = v
+    return (m[0] * x + m[4] * y + m[8] * z + m[12],
+            m[1] * x + m[5] * y + m[9] * z + m[13],
+            m[2] * x + m[6] * y + m[10] * z + m[14])
+
+
+class DrawItem:
+    __slots__ = ('kind', 'key', 'matrix', 'rgba', 'blended', 'depth', 'args')
+
+    def __init__(self, kind, key, matrix, rgba, blended, depth, args):
+        self.kind = kind          # 'geometry' | 'mesh' | 'instances' | 'baked'
+        self.key = key            # mesh / batch identity, the state that sorting groups by
+        self.matrix = matrix      # model matrix (world space), None for pre-transformed geometry
+        self.rgba = rgba
+        self.blended = blended
+        self.depth = depth        # squared distance from the eye to the item origin (geometry: centroid)
+        self.args = args
+
+
+def count_state_changes(items):
+    """How often (kind, mesh, colour, blend) differs from the previous item when drawn in this order."""
+    states = [(item.kind, item.key, item.rgba, item.blended) for item in items]
+    return sum(1 for a, b in zip(states, states[1:]) if a != b)
+
+
+class RenderQueue(render_backends.Renderer):
+    """Renderer that records the world pass and submits it sorted to target."""
+    name = 'queued'
+
+    def __init__(self, target):
+        super().__init__(target.width, target.height)
+        self.target = target
+        self.items = []
+        self.stack = []
+        self.model = IDENTITY
+        self.view = IDENTITY
+        self.eye = (0.0, 0.0, 0.0)
+        self.rgba = (1.0, 1.0, 1.0, 1.0)
+        self.queuing = False
+        self.stats = {}
+        self.counts = dict.fromkeys(QUEUE_STATS, 0)     # the frame in progress
+        self.baked_blended = {}   # baked key -> (version, any vertex alpha < 1)
+
+    def __getattr__(self, name):
+        # Backend extras (flush, instancing, ...) come from the wrapped renderer
+        return getattr(self.target, name)
+
+    def gl_stats(self):
+        stats = dict(self.target.gl_stats())
+        for key in QUEUE_COUNTERS:
+            stats[key] = self.stats.get(key, 0)
+        return stats
+
+    def reset_state(self):
+        self.target.reset_state()
+
+    # --- recording ------------------------------------------------------
+    def _depth(self, x, y, z):
+        dx = x - self.eye[0]
+        dy = y - self.eye[1]
+        dz = z - self.eye[2]
+        return dx * dx + dy * dy + dz * dz
+
+    def _submit(self, kind, key, args, matrix=None, origin=None):
+        """Queues an item; its depth is taken at origin, else at matrix's (or the model's) translation."""
+        if origin is None:
+            m = matrix if matrix is not None else self.model
+            origin = (m[12], m[13], m[14])
+        self.items.append(DrawItem(kind, key, matrix, self.rgba, self.rgba[3] < 1.0,
+                                   self._depth(*origin), args))
+
+    def flush(self):
+        """Sorts and draws everything queued since the pass started."""
+        self.queuing = False
+        items = self.items
+        if not items:
+            return
+        unsorted_changes = count_state_changes(items)
+        opaque = sorted((i for i in items if not i.blended),
+                        key=lambda i: (GROUP_ORDER[i.kind], i.key, i.rgba, i.depth))
+        blended = sorted((i for i in items if i.blended), key=lambda i: -i.depth)
+        ordered = opaque + blended
+        changes = count_state_changes(ordered)
+        counts = self.counts
+        counts['items'] += len(items)
+        counts['opaque'] += len(opaque)
+        counts['blended'] += len(blended)
+        counts['state_changes'] += changes
+        counts['state_changes_unsorted'] += unsorted_changes
+        counts['state_changes_avoided'] += unsorted_changes - changes
+
+        target = self.target
+        target.push()
+        current = None
+        for item in ordered:
+            matrix = item.matrix if item.matrix is not None else IDENTITY
+            if matrix is not current:
+                target.load_matrix(mat_mul(self.view, matrix))
+                current = matrix
+            target.color(*item.rgba)
+            kind, args = item.kind, item.args
+            if kind == 'geometry':
+                target.triangles(args)
+            elif kind == 'mesh':
+                getattr(target, item.key[0])(*args)
+            elif kind == 'instances':
+                target.instances(*args)
+            else:
+                target.baked(*args)
+        target.pop()
+        self.items = []
+
+    # --- frame / camera -------------------------------------------------
+    def begin_frame(self):
+        self.counts = dict.fromkeys(QUEUE_STATS, 0)
+        self.target.begin_frame()
+
+    def end_frame(self):
+        self.flush()
+        self.stats = self.counts
+        self.target.end_frame()
+
+    def set_camera(self, fovy, aspect, near, far, eye, center, up=(0, 1, 0)):
+        self.flush()
+        self.target.set_camera(fovy, aspect, near, far, eye, center, up)
+        self.view = look_at(eye, center, up)
+        self.eye = tuple(eye)
+        self.model = IDENTITY
+        self.stack = []
+        self.queuing = True
+
+    def load_camera(self, projection, view, eye):
+        self.flush()
+        self.target.load_camera(projection, view, eye)
+        self.view = tuple(view)
+        self.eye = tuple(eye)
+        self.model = IDENTITY
+        self.stack = []
+        self.queuing = True
+
+    def depth_test(self, enabled):
+        self.flush()
+        self.target.depth_test(enabled)
+
+    def load_matrix(self, m):
+        if self.queuing:
+            self.model = tuple(m)
+        else:
+            self.target.load_matrix(m)
+
+    # --- matrix stack and colour ----------------------------------------
+    def push(self):
+        if self.queuing:
+            self.stack.append(self.model)
+        else:
+            self.target.push()
+
+    def pop(self):
+        if self.queuing:
+            self.model = self.stack.pop()
+        else:
+            self.target.pop()
+
+    def translate(self, x, y, z):
+        if self.queuing:
+            self.model = translated(self.model, x, y, z)
+        else:
+            self.target.translate(x, y, z)
+
+    def rotate(self, angle, x, y, z):
+        if self.queuing:
+            self.model = mat_mul(self.model, rotation(angle, x, y, z))
+        else:
+            self.target.rotate(angle, x, y, z)
+
+    def scale(self, x, y, z):
+        if self.queuing:
+            self.model = mat_mul(self.model, scaling(x, y, z))
+        else:
+            self.target.scale(x, y, z)
+
+    def color(self, r, g, b, a=1.0):
+        self.rgba = (r, g, b, a)
+        if not self.queuing:
+            self.target.color(r, g, b, a)
+
+    # --- primitives -----------------------------------------------------
+    def cube(self, size):
+        if self.queuing:
+            self._submit('mesh', ('cube', size), (size,), self.model)
+        else:
+            self.target.cube(size)
+
+    def sphere(self, radius, slices, stacks):
+        if self.queuing:
+            self._submit('mesh', ('sphere', radius, slices, stacks), (radius, slices, stacks), self.model)
+        else:
+            self.target.sphere(radius, slices, stacks)
+
+    def cylinder(self, radius, height, slices=20):
+        if self.queuing:
+            self._submit('mesh', ('cylinder', radius, height, slices), (radius, height, slices), self.model)
+        else:
+            self.target.cylinder(radius, height, slices)
+
+    def quads(self, vertices):
+        if not self.queuing:
+            self.target.quads(vertices)
+            return
+        triangles = []
+        for i in range(0, len(vertices), 4):
+            a, b, c, d = vertices[i:i + 4]
+            triangles.extend((a, b, c, a, c, d))
+        self.triangles(triangles)
+
+    def triangles(self, vertices):
+        if not self.queuing:
+            self.target.triangles(vertices)
+            return
+        # Pre-transformed to world space so all loose geometry shares one matrix
+        model = self.model
+        world = vertices if model is IDENTITY else [transform_point(model, v) for v in vertices]
+        if not world:
+            return
+        n = len(world)
+        centroid = (sum(v[0] for v in world) / n, sum(v[1] for v in world) / n, sum(v[2] for v in world) / n)
+        self._submit('geometry', ('geometry',), world, origin=centroid)
+
+    def instances(self, shape, rows, slices=20):
+        if not self.queuing:
+            self.target.instances(shape, rows, slices)
+        elif rows:
+            self._submit('instances', ('instances', shape, slices), (shape, rows, slices), self.model)
+
+    def baked(self, key, version, build):
+        if not self.queuing:
+            self.target.baked(key, version, build)
+            return
+        # Translucent baked layers (floor overlay, ghost) go in the blended pass; the courier stays
+        # opaque. build() runs here once per version and the target gets its result.
+        entry = self.baked_blended.get(key)
+        if entry is None or entry[0] != version:
+            data = build()
+            entry = self.baked_blended[key] = (version, any(a < 1.0 for a in data[1][3::4]))
+            build = lambda: data
+        self._submit('baked', ('baked', key), (key, version, build), self.model)
+        self.items[-1].blended = entry[1]
+
+    # --- screen space ---------------------------------------------------
+    def hud_begin(self):
+        self.flush()
+        self.target.hud_begin()
+
+    def hud_end(self):
+        self.target.hud_end()
+
+    def text(self, x, y, text, font='helvetica_18'):
+        self.flush()
+        self.target.color(*self.rgba)
+        self.target.text(x, y, text, font)
+
+    def panel(self, key, version, x, y, width, height, draw):
+        # draw() paints through this queue, which passes everything straight on outside the world pass
+        self.flush()
+        self.target.panel(key, version, x, y, width, height, draw)
@@ -0,0 +1,192 @@
+"""
+Rewind (hold B): scrub the run back up to RewindBuffer.seconds.
+
+record() runs at the end of each update_game() tick. It stores one frame
+every interval seconds of game time in a preallocated ring: one row of
+FIELDS doubles per frame (pose, stamina, timers, score, beacon index, the
+spikes' hit flags and the gates' contact flags). A 10 s buffer at 60 Hz is
+600 rows, about 100 KB, and that never grows.
+
+The rest of the state changes a few times per delivery, not every tick.
+That is the packages, the ring set, the carried package, and the route with
+its tiles and the layout RNG. So it is not copied per frame. It is kept as
+pickled blobs that each frame refers to by number. A new blob is made only
+when something in it changes:
+  - an "items" blob: packages, bonus rings, carried package
+  - a "layout" blob: beacons, tiles, route colour, RNG state
+Blobs older than the oldest frame are dropped as the ring wraps.
+
+step_back(dt) drops the newest frames covering dt and restores the one that
+is then newest. That is one row plus at most one items blob and one layout
+blob, whatever the buffer size. Spike and gate phases follow from
+game_time, so restore() re-runs update_hazards(0) instead of storing them.
+
+Spike and gate positions only change in init_game() and when a save is
+loaded; the game calls clear() then.
+"""
+import pickle
+from array import array
+
+# Per-frame values, in row order
+FIELDS = (
+    'game_time', 'time_left', 'total_score', 'completed_deliveries', 'difficulty_level',
+    'player_x', 'player_y', 'player_z', 'player_angle', 'player_speed', 'stamina',
+    'current_beacon_index', 'bonus_ring_spawn_timer', 'clean_turn_combo', 'last_turn_time',
+    'current_turn_frames', 'last_player_speed', 'spike_hits', 'gate_touching', 'items',
+)
+SCALARS = (
+    'game_time', 'time_left', 'player_angle', 'player_speed', 'stamina',
+    'bonus_ring_spawn_timer', 'last_turn_time', 'last_player_speed',
+)
+INT_SCALARS = ('total_score', 'completed_deliveries', 'difficulty_level', 'current_beacon_index',
+               'clean_turn_combo', 'current_turn_frames')
+WIDTH = len(FIELDS)
+_COLUMN = {name: i for i, name in enumerate(FIELDS)}
+
+
+def _flags(entities, key):
+    bits = 0
+    for i, entity in enumerate(entities):
+        if entity.get(key, False):
+            bits |= 1 << i
+    return bits
+
+
+class RewindBuffer:
+    def __init__(self, seconds=10.0, rate=60.0):
+        self.seconds = seconds
+        self.interval = 1.0 / rate
+        self.capacity = int(seconds * rate)
+        self.rows = array('d', bytes(8 * WIDTH * self.capacity))
+        self.items = {}             # items id -> (layout id, pickled packages/rings/carried index)
+        self.layouts = {}           # layout id -> pickled beacons/tiles/route colour/RNG state
+        self.clear()
+
+    def clear(self):
+        self.start = 0              # ring index of the oldest frame
+        self.count = 0
+        self.items.clear()
+        self.layouts.clear()
+        self.next_id = 0
+        self.items_id = None        # blobs describing the game's current state
+        self.layout_id = None
+        self.items_watch = None     # what the blobs were made from (see _watch)
+        self.floor_version = None
+        self.last_time = None
+        self.rewinding = False
+
+    def available(self):
+        """Seconds of play that can be rewound."""
+        return max(0, self.count - 1) * self.interval
+
+    # --- recording --------------------------------------------------------
+    def _watch(self, game):
+        # Identity of what the items blob holds; tuple == checks `is` first, so this is cheap
+        return (game.carried_package_info, tuple(game.bonus_rings), tuple(pkg['pos'] for pkg in game.packages))
+
+    def record(self, game):
+        """Stores the current tick if interval has passed since the last frame."""
+        self.rewinding = False
+        if self.last_time is not None and game.game_time - self.last_time < self.interval - 1e-9:
+            return
+        self.last_time = game.game_time
+
+        if game.floor_overlay_version != self.floor_version:
+            self.floor_version = game.floor_overlay_version
+            self.layout_id = self.next_id
+            self.next_id += 1
+            self.layouts[self.layout_id] = pickle.dumps(
+                (game.route_beacons, game.special_tiles, game.conveyor_tiles, game.route_color,
+                 game.rng.getstate()), protocol=5)
+            self.items_watch = None
+        watch = self._watch(game)
+        if watch != self.items_watch:
+            self.items_watch = watch
+            carried = game.carried_package_info
+            carried_index = next((i for i, pkg in enumerate(game.packages) if pkg is carried), None)
+            self.items_id = self.next_id
+            self.next_id += 1
+            self.items[self.items_id] = (self.layout_id, pickle.dumps(
+                (game.packages, game.bonus_rings, carried_index), protocol=5))
+
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+            self._prune()
+        base = ((self.start + self.count) % self.capacity) * WIDTH
+        pos = game.player_pos
+        self.rows[base:base + WIDTH] = array('d', (
+            game.game_time, game.time_left, game.total_score, game.completed_deliveries, game.difficulty_level,
+            pos[0], pos[1], pos[2], game.player_angle, game.player_speed, game.stamina,
+            game.current_beacon_index, game.bonus_ring_spawn_timer, game.clean_turn_combo, game.last_turn_time,
+            game.current_turn_frames, game.last_player_speed,
+            _flags(game.spikes, 'hit_player'), _flags(game.gates, 'touching'), self.items_id))
+        self.count += 1
+
+    def _prune(self):
+        """Drops blobs no frame refers to any more (ids only grow along the ring)."""
+        oldest = int(self.rows[self.start * WIDTH + _COLUMN['items']])
+        for items_id in [i for i in self.items if i < oldest]:
+            del self.items[items_id]
+        layout = self.items[oldest][0]
+        for layout_id in [i for i in self.layouts if i < layout]:
+            del self.layouts[layout_id]
+
+    # --- rewinding --------------------------------------------------------
+    def step_back(self, game, delta_time):
+        """Discards the newest frames covering delta_time and restores the new newest; False if empty."""
+        if not self.count:
+            return False
+        steps = max(1, round(delta_time / self.interval))
+        self.count = max(1, self.count - steps)
+        self.restore(game, self.count - 1)
+        # Blobs made after the restored frame belong to the discarded future
+        for items_id in [i for i in self.items if i > self.items_id]:
+            del self.items[items_id]
+        for layout_id in [i for i in self.layouts if i > self.layout_id]:
+            del self.layouts[layout_id]
+        self.rewinding = True
+        return True
+
+    def restore(self, game, index):
+        """Puts the game in the state of frame index (0 = oldest)."""
+        base = ((self.start + index) % self.capacity) * WIDTH
+        row = self.rows[base:base + WIDTH]
+        for name in SCALARS:
+            setattr(game, name, row[_COLUMN[name]])
+        for name in INT_SCALARS:
+            setattr(game, name, int(row[_COLUMN[name]]))
+        game.player_pos[:] = row[5:8]
+        game.player_prev_pos[:] = row[5:8]
+
+        items_id = int(row[_COLUMN['items']])
+        if items_id != self.items_id or self._watch(game) != self.items_watch:
+            layout_id, blob = self.items[items_id]
+            if layout_id != self.layout_id:
+                beacons, special, conveyor, game.route_color, rng_state = pickle.loads(self.layouts[layout_id])
+                game.route_beacons[:] = beacons
+                game.special_tiles[:] = special
+                game.conveyor_tiles[:] = conveyor
+                game.rng.setstate(rng_state)
+                game.floor_overlay_version += 1
+                self.floor_version = game.floor_overlay_version
+                self.layout_id = layout_id
+            packages, rings, carried_index = pickle.loads(blob)
+            game.packages[:] = packages
+            game.bonus_rings[:] = rings
+            game.carried_package_info = packages[carried_index] if carried_index is not None else None
+            game.is_carrying_package = carried_index is not None
+            self.items_id = items_id
+            self.items_watch = self._watch(game)
+
+        spike_hits, gate_touching = int(row[_COLUMN['spike_hits']]), int(row[_COLUMN['gate_touching']])
+        for i, spike in enumerate(game.spikes):
+            spike['hit_player'] = bool(spike_hits >> i & 1)
+        for i, gate in enumerate(game.gates):
+            gate['touching'] = bool(gate_touching >> i & 1)
+        game.update_hazards(0.0)
+        for spike in game.spikes:
+            spike['prev_height'] = spike['current_height']
+        game.hazard_alpha = 1.0
+        game.hud_text = None
+        self.last_time = game.game_time
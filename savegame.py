@@ -0,0 +1,175 @@
+"""
+Full-state save/load (F5 / F9, --autosave SECONDS).
+
+dumps(game) captures everything a run needs to continue exactly where it
+was:
+  - the gameplay globals (SCALARS, LISTS)
+  - the entity lists (ENTITY_LISTS)
+  - which package is being carried, as an index into packages, so the
+    identity survives the round trip
+  - the camera
+  - the layout RNG's state
+
+File layout:
+
+    MAGIC, uint16 format version, uint32 payload length, uint32 crc32, payload
+
+The payload is a pickle (protocol 5) of builtins only: dicts, lists, tuples,
+str, int, float, bool, None. loads() uses an unpickler that refuses every
+global, so a save file can't run code. Serialising takes tens of
+microseconds; SaveWriter does the file write on a background thread, and
+the temp-file-plus-rename keeps a crash mid-write from corrupting the last
+good save.
+
+restore() writes the state back into the game module. It mutates shared
+lists in place and bumps the layout versions so baked geometry and GPU
+buffers rebuild.
+"""
+import io
+import os
+import pickle
+import queue
+import struct
+import threading
+import zlib
+
+MAGIC = b'CRSV'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHII')
+
+SCALARS = (
+    'game_state', 'time_left', 'total_score', 'completed_deliveries', 'difficulty_level',
+    'player_angle', 'player_speed', 'stamina',
+    'current_beacon_index', 'route_color', 'is_carrying_package', 'game_time',
+    'bonus_ring_spawn_timer', 'clean_turn_combo', 'last_turn_time', 'current_turn_frames', 'last_player_speed',
+    'camera_mode_is_follow', 'cam_orbit_radius', 'cam_orbit_angle_deg', 'follow_up', 'follow_side',
+    'session_seed',
+)
+LISTS = ('player_pos', 'player_prev_pos', 'camera_pos_fixed', 'follow_eye', 'follow_ctr')
+ENTITY_LISTS = ('packages', 'route_beacons', 'spikes', 'gates', 'bonus_rings', 'special_tiles', 'conveyor_tiles')
+
+
+class SaveError(Exception):
+    pass
+
+
+class _BuiltinsOnly(pickle.Unpickler):
+    def find_class(self, module, name):
+        raise SaveError(f"save file references {module}.{name}")
+
+
+def capture(game):
+    """The game's state as a dict of builtins (entity dicts are shared, not copied)."""
+    state = {name: getattr(game, name) for name in SCALARS}
+    for name in LISTS + ENTITY_LISTS:
+        state[name] = getattr(game, name)
+    carried = game.carried_package_info
+    state['carried_index'] = next((i for i, pkg in enumerate(game.packages) if pkg is carried), None)
+    state['rng'] = game.rng.getstate()
+    return state
+
+
+def dumps(game):
+    """Serialises the game's current state; call on the thread that updates the game."""
+    payload = pickle.dumps(capture(game), protocol=5)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(payload), zlib.crc32(payload)) + payload
+
+
+def loads(data):
+    """Parses and checks a save; returns the state dict."""
+    if len(data) < HEADER.size:
+        raise SaveError("save file is truncated")
+    magic, version, length, crc = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveError("not a Courier Run save")
+    if version != FORMAT_VERSION:
+        raise SaveError(f"save format {version}, this game reads {FORMAT_VERSION}")
+    payload = data[HEADER.size:HEADER.size + length]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise SaveError("save file is damaged")
+    return _BuiltinsOnly(io.BytesIO(payload)).load()
+
+
+def restore(game, state):
+    for name in SCALARS:
+        setattr(game, name, state[name])
+    for name in LISTS + ENTITY_LISTS:
+        getattr(game, name)[:] = state[name]
+    index = state['carried_index']
+    game.carried_package_info = game.packages[index] if index is not None else None
+    game.rng.setstate(state['rng'])
+
+    # Derived and transient state: rebuild caches, forget held keys, restart frame timing
+    game.hazard_layout_version += 1
+    game.floor_overlay_version += 1
+    game.hud_text = None
+    game.key_states.clear()
+    game.tick_contacts = 0
+
+
+def save(game, path):
+    """Synchronous save, for tools; the game uses SaveWriter."""
+    write_file(path, dumps(game))
+
+
+def load(game, path):
+    with open(path, 'rb') as file:
+        restore(game, loads(file.read()))
+
+
+def write_file(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as file:
+        file.write(data)
+    os.replace(tmp, path)
+
+
+class SaveWriter:
+    """
+    Writes queued (path, bytes) on a background thread; the latest save of a
+    path wins. A write's done(path, error) runs on that thread once the file
+    is in place (error None) or the write failed (the OSError); a save
+    superseded before it was written reports nothing.
+    """
+
+    def __init__(self):
+        self.pending = queue.SimpleQueue()
+        self.written = 0
+        self.thread = threading.Thread(target=self._run, name="courier-savegame", daemon=True)
+        self.thread.start()
+
+    def write(self, path, data, done=None):
+        self.pending.put((path, data, done))
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            # Only the newest queued save per path is worth writing
+            latest = {item[0]: item[1:]}
+            stop = False
+            while True:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                latest[item[0]] = item[1:]
+            for path, (data, done) in latest.items():
+                try:
+                    write_file(path, data)
+                    self.written += 1
+                    error = None
+                except OSError as failure:
+                    error = failure
+                if done is not None:
+                    done(path, error)
+            if stop:
+                return
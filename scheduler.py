@@ -0,0 +1,101 @@
+"""
+Multi-rate subsystem scheduler (--multi-rate).
+
+Every subsystem registers a function and its own rate. Scheduler.advance(dt)
+runs each one at fixed steps of 1 / rate, so its function always receives
+the same delta_time whatever the frame rate. Steps are interleaved in time
+order: the subsystem due soonest runs next, and equal due times run in
+registration order. A given sequence of advance() calls therefore always
+produces the same sequence of steps.
+
+During a step, step_offset is how far that step's time lies before the end
+of the advance() running it. The caller's clock has usually already moved
+to the end of the frame, so a subsystem that reads the clock subtracts
+step_offset to see its own step time. alpha(name) is how far (0..1) the
+game clock has got into a subsystem's current step. A low-rate subsystem's
+state can be interpolated with it between steps. stats() reports calls and
+time spent per subsystem.
+"""
+import time
+
+
+class Subsystem:
+    __slots__ = ('name', 'rate', 'period', 'fn', 'origin', 'steps', 'skipped',
+                 'seconds', 'max_seconds', 'last_seconds')
+
+    def __init__(self, name, rate, fn, origin):
+        self.name = name
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.fn = fn
+        self.origin = origin      # scheduler time at registration
+        self.steps = 0
+        self.skipped = 0          # steps dropped by the catch-up limit
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    @property
+    def next_due(self):
+        # Computed from the step count, so long runs don't accumulate rounding drift
+        return self.origin + (self.steps + self.skipped + 1) * self.period
+
+
+class Scheduler:
+    """Runs registered subsystems at their own fixed rates against one game clock."""
+
+    def __init__(self, max_steps=8):
+        self.time = 0.0
+        self.step_offset = 0.0        # end of the running advance() minus the current step's time
+        self.max_steps = max_steps    # per subsystem per advance(); the rest of the backlog is dropped
+        self.subsystems = []
+        self.by_name = {}
+
+    def add(self, name, rate, fn):
+        """Registers fn(delta_time) to run rate times per second of game time."""
+        if name in self.by_name:
+            raise ValueError(f"subsystem {name!r} already registered")
+        subsystem = Subsystem(name, rate, fn, self.time)
+        self.subsystems.append(subsystem)
+        self.by_name[name] = subsystem
+        return subsystem
+
+    def advance(self, dt):
+        end = self.time + dt
+        budget = {s.name: self.max_steps for s in self.subsystems}
+        while True:
+            due, subsystem = min(((s.next_due, s) for s in self.subsystems if budget[s.name]),
+                                 key=lambda pair: pair[0], default=(None, None))
+            if subsystem is None or due > end + 1e-9:     # tolerance for clock rounding at step boundaries
+                break
+            self.time = due
+            self.step_offset = max(0.0, end - due)
+            start = time.perf_counter()
+            subsystem.fn(subsystem.period)
+            elapsed = time.perf_counter() - start
+            subsystem.steps += 1
+            subsystem.seconds += elapsed
+            subsystem.last_seconds = elapsed
+            subsystem.max_seconds = max(subsystem.max_seconds, elapsed)
+            budget[subsystem.name] -= 1
+        self.step_offset = 0.0
+        for subsystem in self.subsystems:
+            if not budget[subsystem.name] and subsystem.next_due <= end + 1e-9:
+                subsystem.skipped += int((end - subsystem.next_due) / subsystem.period + 1e-9) + 1
+        self.time = end
+
+    def alpha(self, name):
+        """Fraction of name's current step that has elapsed, for interpolating its state."""
+        subsystem = self.by_name[name]
+        return min(1.0, max(0.0, 1.0 - (subsystem.next_due - self.time) / subsystem.period))
+
+    def stats(self):
+        """Per subsystem: rate, steps, skipped steps, average / max / last step time in ms."""
+        return {s.name: {'rate': s.rate, 'steps': s.steps, 'skipped': s.skipped,
+                         'avg_ms': s.seconds / s.steps * 1000 if s.steps else 0.0,
+                         'max_ms': s.max_seconds * 1000, 'last_ms': s.last_seconds * 1000}
+                for s in self.subsystems}
+
+    def summary(self):
+        return "  ".join(f"{name} {s['rate']:g}Hz {s['avg_ms']:.3f}ms"
+                         for name, s in self.stats().items())
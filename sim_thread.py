@@ -0,0 +1,158 @@
+"""
+Simulation thread (--sim-thread).
+
+SimThread runs update_game() at a fixed rate on its own thread, so a slow
+frame no longer delays input or physics and a slow tick no longer delays
+drawing. After every tick it publishes an immutable Snapshot of what the
+draw_* functions read, into a two-slot SnapshotBuffer. showScreen() draws
+the latest one without taking a lock. Key events from the GLUT callbacks
+arrive through post() and are applied on the simulation thread before the
+next tick, so only this thread ever writes the game's globals.
+
+PyOpenGL's raw calls and the GL driver release the GIL, so rasterisation
+overlaps with simulation even though both threads run Python.
+"""
+import queue
+import threading
+import time
+
+# Globals the draw_* functions read; a Snapshot has exactly these attributes
+SNAPSHOT_FIELDS = (
+    'player_pos', 'player_angle', 'stamina', 'is_carrying_package', 'carried_package_info',
+    'packages', 'route_beacons', 'current_beacon_index', 'spikes', 'gates', 'hazard_layout_version',
+    'bonus_rings', 'special_tiles', 'conveyor_tiles', 'floor_overlay_version',
+    'game_time', 'time_left', 'total_score', 'clean_turn_combo', 'difficulty_level', 'game_state',
+    'hazard_alpha', 'hud_text', 'heatmap_shown', 'heatmap_version', 'ghost_pose', 'rewind_shown',
+)
+
+
+class Snapshot:
+    """Read-only copy of the game state after one tick (plus the tick number)."""
+    __slots__ = SNAPSHOT_FIELDS + ('tick',)
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is read-only")
+
+
+def _copy_entities(items):
+    """Tuple of per-entity dict copies with their 'pos' frozen, detached from the live lists."""
+    return tuple({**item, 'pos': tuple(item['pos'])} for item in items)
+
+
+def capture(game, tick=0, prev=None):
+    """Snapshot of game's current state. Tiles are shared with prev while the layout is unchanged."""
+    fields = {
+        'player_pos': tuple(game.player_pos),
+        'player_angle': game.player_angle,
+        'stamina': game.stamina,
+        'is_carrying_package': game.is_carrying_package,
+        'carried_package_info': dict(game.carried_package_info) if game.carried_package_info else None,
+        'packages': _copy_entities(game.packages),
+        'route_beacons': _copy_entities(game.route_beacons),
+        'current_beacon_index': game.current_beacon_index,
+        'spikes': _copy_entities(game.spikes),
+        'gates': _copy_entities(game.gates),
+        'hazard_layout_version': game.hazard_layout_version,
+        'bonus_rings': _copy_entities(game.bonus_rings),
+        'floor_overlay_version': game.floor_overlay_version,
+        'game_time': game.game_time,
+        'time_left': game.time_left,
+        'total_score': game.total_score,
+        'clean_turn_combo': game.clean_turn_combo,
+        'difficulty_level': game.difficulty_level,
+        'game_state': game.game_state,
+        'hazard_alpha': game.hazard_alpha,
+        'hud_text': game.hud_text,
+        'heatmap_shown': game.heatmap_shown,
+        'heatmap_version': game.heatmap_version,
+        'ghost_pose': game.ghost_pose,
+        'rewind_shown': game.rewind_shown,
+        'tick': tick,
+    }
+    if prev is not None and prev.floor_overlay_version == game.floor_overlay_version:
+        fields['special_tiles'] = prev.special_tiles
+        fields['conveyor_tiles'] = prev.conveyor_tiles
+    else:
+        fields['special_tiles'] = _copy_entities(game.special_tiles)
+        fields['conveyor_tiles'] = _copy_entities(game.conveyor_tiles)
+    return Snapshot(**fields)
+
+
+class SnapshotBuffer:
+    """
+    Two slots. The writer fills the back slot, then flips front to it (a single
+    reference store). Readers take slots[front] and keep using that immutable
+    snapshot for the whole frame, so neither side locks.
+    """
+
+    def __init__(self, initial):
+        self.slots = [initial, initial]
+        self.front = 0
+
+    def publish(self, snapshot):
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        self.front = back
+
+    def read(self):
+        return self.slots[self.front]
+
+
+class SimThread(threading.Thread):
+    """Ticks game.update_game(1 / rate) at a fixed rate and publishes snapshots."""
+
+    def __init__(self, game, rate=60.0, max_lag=0.25):
+        super().__init__(name="courier-sim", daemon=True)
+        self.game = game
+        self.dt = 1.0 / rate
+        self.max_lag = max_lag          # seconds behind schedule before the backlog is dropped
+        self.inputs = queue.SimpleQueue()
+        self.stopping = threading.Event()
+        self.tick = 0
+        self.dropped_ticks = 0
+        self.tick_seconds = 0.0         # duration of the last update_game() call
+        self.buffer = SnapshotBuffer(capture(game))
+
+    def post(self, fn, *args):
+        """Queues fn(*args) to run on the simulation thread before the next tick."""
+        self.inputs.put((fn, args))
+
+    def latest(self):
+        return self.buffer.read()
+
+    def stop(self, timeout=1.0):
+        self.stopping.set()
+        self.join(timeout)
+
+    def step(self):
+        """Applies pending input, advances one tick and publishes; the body of run()."""
+        game = self.game
+        while True:
+            try:
+                fn, args = self.inputs.get_nowait()
+            except queue.Empty:
+                break
+            fn(*args)
+        start = time.perf_counter()
+        if game.game_state == 'playing':
+            game.update_game(self.dt)
+        self.tick_seconds = time.perf_counter() - start
+        self.tick += 1
+        self.buffer.publish(capture(game, self.tick, self.buffer.read()))
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while not self.stopping.is_set():
+            self.step()
+            next_tick += self.dt
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self.stopping.wait(delay)
+            elif -delay > self.max_lag:
+                # Too far behind (debugger, suspended laptop): skip ahead rather than fast-forward
+                self.dropped_ticks += int(-delay / self.dt)
+                next_tick = time.perf_counter()
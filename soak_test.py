@@ -0,0 +1,166 @@
+"""
+Soak / fuzz harness for the headless simulation.
+
+Each worker process plays one long session with a random input stream
+(random key combinations held for random lengths, optionally a jittered
+frame time) and checks invariants after every update_game() tick:
+  - player inside the clamp_player_inside_arena() rectangle
+  - finite position, angle, stamina, time and score
+  - bounded entity counts (bonus rings, packages, beacons, tiles, hazards)
+The game is kept alive (time_left topped up) so sessions can run for
+simulated hours. Every --window simulated seconds each worker records mean
+and max tick time, RSS, entity counts and game_time drift; all curves go to
+one CSV so slowdowns and leaks show up as a trend.
+
+    python soak_test.py --hours 2 --workers 4 --out soak.csv
+"""
+import argparse
+import math
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import time
+
+import courier_env
+
+CSV_HEADER = "worker,game_time,ticks,tick_mean_us,tick_max_us,rss_mb,bonus_rings,difficulty,time_drift"
+MAX_VIOLATIONS = 20
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def check_invariants(game):
+    """Returns a list of invariant violations for the current state (empty when healthy)."""
+    problems = []
+    inner_x = game.ARENA_SIZE - game.PLAYER_BOUND_MARGIN_X
+    inner_z = game.ARENA_SIZE - game.PLAYER_BOUND_MARGIN_Z
+    x, y, z = game.player_pos
+    values = {'x': x, 'y': y, 'z': z, 'angle': game.player_angle, 'stamina': game.stamina,
+              'time_left': game.time_left, 'game_time': game.game_time, 'score': game.total_score}
+    for name, value in values.items():
+        if not math.isfinite(value):
+            problems.append(f"{name} is not finite ({value})")
+    if abs(x) > inner_x + 1e-6 or abs(z) > inner_z + 1e-6:
+        problems.append(f"player outside arena at ({x:.2f}, {z:.2f})")
+    if not 0.0 <= game.stamina <= game.STAMINA_MAX:
+        problems.append(f"stamina out of range ({game.stamina})")
+
+    limits = {
+        'bonus_rings': max(game.MAX_BONUS_RINGS, 5 + game.difficulty_level),
+        'packages': 4, 'route_beacons': 5, 'special_tiles': 5,
+        'conveyor_tiles': 8, 'spikes': 5, 'gates': 3,
+    }
+    for name, limit in limits.items():
+        count = len(getattr(game, name))
+        if count > limit:
+            problems.append(f"{name} has {count} entries (limit {limit})")
+    return problems
+
+
+def soak(task):
+    """Runs one soak session; returns (worker, samples, violations)."""
+    worker, seed, sim_seconds, dt, jitter, window = task
+    inputs = random.Random(seed)
+    env = courier_env.CourierEnv(seed=seed, dt=dt)
+    game = env.game
+    env.reset()
+
+    samples, violations = [], []
+    ticks = 0
+    exact_time, compensation = 0.0, 0.0  # Kahan sum of dt, reference for game_time drift
+    action, hold = 0, 0
+    window_ticks, window_total, window_max = 0, 0.0, 0.0
+    next_sample = window
+
+    while game.game_time < sim_seconds:
+        if hold <= 0:
+            action, hold = inputs.randrange(courier_env.NUM_ACTIONS), inputs.randint(1, 90)
+        hold -= 1
+        env.dt = dt * inputs.uniform(1.0 - jitter, 1.0 + jitter) if jitter else dt
+        game.time_left = max(game.time_left, 60.0)
+
+        start = time.perf_counter()
+        env.step(action)
+        elapsed = time.perf_counter() - start
+
+        ticks += 1
+        y = env.dt - compensation
+        t = exact_time + y
+        compensation = (t - exact_time) - y
+        exact_time = t
+        window_ticks += 1
+        window_total += elapsed
+        window_max = max(window_max, elapsed)
+
+        if len(violations) < MAX_VIOLATIONS:
+            for problem in check_invariants(game):
+                violations.append((ticks, round(game.game_time, 3), problem))
+
+        if game.game_time >= next_sample:
+            samples.append((worker, round(game.game_time, 3), ticks,
+                            1e6 * window_total / window_ticks, 1e6 * window_max,
+                            round(rss_mb(), 2), len(game.bonus_rings), game.difficulty_level,
+                            game.game_time - exact_time))
+            window_ticks, window_total, window_max = 0, 0.0, 0.0
+            next_sample += window
+    return worker, samples, violations
+
+
+def trend(samples, column):
+    """Least-squares slope of a sample column per simulated hour."""
+    if len(samples) < 2:
+        return 0.0
+    xs = [s[1] / 3600.0 for s in samples]
+    ys = [s[column] for s in samples]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak/fuzz the headless Courier Run simulation.")
+    parser.add_argument('--hours', type=float, default=1.0, help="simulated hours per worker")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tick-rate', type=float, default=60.0)
+    parser.add_argument('--jitter', type=float, default=0.5, help="relative frame-time jitter (0 = fixed dt)")
+    parser.add_argument('--window', type=float, default=60.0, help="simulated seconds per sample")
+    parser.add_argument('--out', default='soak.csv')
+    args = parser.parse_args(argv)
+
+    tasks = [(w, args.seed + w, args.hours * 3600.0, 1.0 / args.tick_rate, args.jitter, args.window)
+             for w in range(args.workers)]
+    start = time.perf_counter()
+    with mp.Pool(args.workers) as pool:
+        results = pool.map(soak, tasks)
+    elapsed = time.perf_counter() - start
+
+    failed = False
+    with open(args.out, 'w') as f:
+        f.write(CSV_HEADER + '\n')
+        for worker, samples, violations in results:
+            for row in samples:
+                f.write(','.join(f"{v:.6g}" if isinstance(v, float) else str(v) for v in row) + '\n')
+            print(f"worker {worker}: {len(samples)} samples, "
+                  f"tick time {trend(samples, 3):+.2f} us/h, RSS {trend(samples, 5):+.2f} MB/h, "
+                  f"max rings {max((s[6] for s in samples), default=0)}, "
+                  f"game_time drift {samples[-1][8] if samples else 0.0:.3g}s")
+            for tick, game_time, problem in violations:
+                failed = True
+                print(f"  VIOLATION tick {tick} (t={game_time}s): {problem}")
+    print(f"{args.workers} x {args.hours:g} simulated hours in {elapsed:.1f}s -> {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
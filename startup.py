@@ -0,0 +1,41 @@
+"""
+Startup timing (--startup-report).
+
+The game script notes the time before its first import. main() then calls
+mark() as each step of getting a window up finishes:
+  - the imports
+  - PyOpenGL's GLUT module
+  - glutInit
+  - the window
+  - the renderer
+  - init_game()
+  - the first frame on screen
+Each phase runs from the previous mark to its own, so together they account
+for all of the wall time up to the first frame. format() lists them with
+their share of the total.
+"""
+import time
+
+
+class StartupReport:
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.phases = []            # (name, seconds)
+
+    def mark(self, name, now=None):
+        """Ends the phase called name, which began at the previous mark."""
+        now = time.perf_counter() if now is None else now
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.started
+
+    def format(self):
+        total = self.total() or 1.0
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = [f"startup {self.total() * 1000:.1f} ms"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:8.1f} ms  {seconds / total:4.0%}")
+        return "\n".join(lines)
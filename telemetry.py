@@ -0,0 +1,145 @@
+"""
+Per-tick telemetry recorder (--telemetry PATH).
+
+TelemetryWriter keeps one preallocated array per column (COLUMNS), chunk_rows
+long. record() stores one tick's values in place. When the chunk is full its
+columns are appended to the file one after another as raw bytes, so a
+session costs the same few arrays of memory however long it runs. Each
+column is about 2-4 bytes per tick.
+
+File layout (little- or big-endian as recorded in the header):
+
+    MAGIC, uint32 header length, header JSON {version, byteorder, columns, meta}
+    chunk*: uint32 row count, then each column's rows as raw array bytes
+
+The mark column says where game_time is not continuous: MARK_RESET on the
+first row of a new game, MARK_JUMP on the first row after a rewind or a
+loaded save moved the clock, so readers don't count the gap as played time.
+
+read_chunks() yields one {column: array} dict per chunk, so readers see a
+chunk at a time. Version 1 files predate the mark column; it reads as
+MARK_NONE for them. telemetry_query.py aggregates over any number of files
+this way.
+"""
+import json
+import struct
+import sys
+from array import array
+
+MAGIC = b'CRTL'
+VERSION = 2
+READABLE_VERSIONS = (1, 2)
+
+# (name, array typecode)
+COLUMNS = (
+    ('game_time', 'f'),
+    ('x', 'f'),
+    ('z', 'f'),
+    ('speed', 'f'),         # distance moved this tick / dt
+    ('stamina', 'f'),
+    ('beacon', 'B'),        # current_beacon_index
+    ('deliveries', 'H'),    # completed_deliveries
+    ('difficulty', 'B'),
+    ('contacts', 'B'),      # CONTACT_* bits
+    ('mark', 'B'),          # MARK_* value
+)
+
+# Bits of the contacts column (the game's tick_contacts)
+CONTACT_SPIKE = 1           # touching a spike
+CONTACT_GATE = 2            # touching a closed gate
+CONTACT_SPIKE_HIT = 4       # took the spike time penalty this tick
+CONTACT_GATE_BUMP = 8       # first tick of a gate contact
+
+# Values of the mark column
+MARK_NONE = 0
+MARK_RESET = 1              # first tick of a new game; game_time counts from 0
+MARK_JUMP = 2               # first tick after a rewind or load moved game_time
+
+
+class TelemetryWriter:
+    def __init__(self, path, chunk_rows=4096, meta=None):
+        self.file = open(path, 'wb')
+        self.chunk_rows = chunk_rows
+        self.columns = [(name, array(code, bytes(chunk_rows * array(code).itemsize)))
+                        for name, code in COLUMNS]
+        self.rows = 0
+        self.total_rows = 0
+        header = json.dumps({'version': VERSION, 'byteorder': sys.byteorder,
+                             'columns': COLUMNS, 'meta': meta or {}}).encode()
+        self.file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+    def record(self, game_time, x, z, speed, stamina, beacon, deliveries, difficulty, contacts, mark=MARK_NONE):
+        """One tick; arguments in COLUMNS order."""
+        i = self.rows
+        c = self.columns
+        c[0][1][i] = game_time
+        c[1][1][i] = x
+        c[2][1][i] = z
+        c[3][1][i] = speed
+        c[4][1][i] = stamina
+        c[5][1][i] = beacon
+        c[6][1][i] = deliveries
+        c[7][1][i] = difficulty
+        c[8][1][i] = contacts
+        c[9][1][i] = mark
+        self.rows = i + 1
+        if self.rows == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Appends the rows recorded so far as one chunk."""
+        rows = self.rows
+        if not rows:
+            return
+        write = self.file.write
+        write(struct.pack('<I', rows))
+        for _, column in self.columns:
+            write(memoryview(column)[:rows].cast('B'))
+        self.total_rows += rows
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def read_header(file):
+    if file.read(4) != MAGIC:
+        raise ValueError(f"{file.name}: not a telemetry file")
+    (length,) = struct.unpack('<I', file.read(4))
+    header = json.loads(file.read(length))
+    if header['version'] not in READABLE_VERSIONS:
+        raise ValueError(f"{file.name}: telemetry version {header['version']}, expected {VERSION}")
+    return header
+
+
+def read_chunks(path, columns=None):
+    """
+    Yields {name: array} per chunk of path. columns limits which are decoded;
+    the others are skipped with a seek. COLUMNS an older file lacks read as 0.
+    """
+    with open(path, 'rb') as file:
+        header = read_header(file)
+        swap = header['byteorder'] != sys.byteorder
+        layout = [(name, code, array(code).itemsize) for name, code in header['columns']]
+        present = {name for name, _ in header['columns']}
+        missing = [(name, code) for name, code in COLUMNS
+                   if name not in present and (columns is None or name in columns)]
+        while True:
+            raw = file.read(4)
+            if len(raw) < 4:
+                return
+            (rows,) = struct.unpack('<I', raw)
+            chunk = {}
+            for name, code, size in layout:
+                if columns is not None and name not in columns:
+                    file.seek(rows * size, 1)
+                    continue
+                values = array(code)
+                values.frombytes(file.read(rows * size))
+                if swap:
+                    values.byteswap()
+                chunk[name] = values
+            for name, code in missing:
+                chunk[name] = array(code, bytes(rows * array(code).itemsize))
+            yield chunk
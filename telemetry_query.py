@@ -0,0 +1,162 @@
+"""
+Streaming aggregates over telemetry files (--telemetry PATH, telemetry.py).
+
+Files are read one chunk at a time and only the columns the aggregates need
+are decoded, so memory stays flat however many ticks the files hold:
+
+    python telemetry_query.py sessions/*.ctl
+    python telemetry_query.py --json run1.ctl run2.ctl
+
+Reports time per beacon leg (by beacon index; the last one is the drop-off),
+stamina usage, and per difficulty level the time played, spike hits per
+minute and the share of time spent touching hazards. A game reset inside a
+file (telemetry.MARK_RESET) starts a new session and drops the unfinished
+leg. A rewind or a loaded save (MARK_JUMP, or any step back in game_time)
+stays in the session: the jump adds no time, and a leg it crossed into is
+not timed.
+"""
+import argparse
+import json
+import sys
+
+import telemetry
+
+QUERY_COLUMNS = ('game_time', 'stamina', 'beacon', 'deliveries', 'difficulty', 'contacts', 'mark')
+
+
+class Aggregates:
+    """Running totals; feed() chunks in file order, then report()."""
+
+    def __init__(self):
+        self.ticks = 0
+        self.sessions = 0
+        self.game_time = 0.0
+        self.legs = {}              # beacon index -> [count, total, min, max]
+        self.stamina_drained = 0.0
+        self.stamina_regained = 0.0
+        self.sprint_time = 0.0
+        self.empty_time = 0.0
+        self.by_level = {}          # difficulty -> [time, spike hits, contact time]
+        self.start_file()
+
+    def start_file(self):
+        self.prev_time = None
+        self.prev_stamina = None
+        self.leg = None
+        self.leg_start = 0.0
+
+    def feed(self, chunk):
+        prev_time, prev_stamina = self.prev_time, self.prev_stamina
+        leg, leg_start = self.leg, self.leg_start
+        legs, by_level = self.legs, self.by_level
+        hit_bit = telemetry.CONTACT_SPIKE_HIT
+        touch_bits = telemetry.CONTACT_SPIKE | telemetry.CONTACT_GATE
+        rows = zip(chunk['game_time'], chunk['stamina'], chunk['beacon'], chunk['deliveries'],
+                   chunk['difficulty'], chunk['contacts'], chunk['mark'])
+        for t, stamina, beacon, deliveries, level, contacts, mark in rows:
+            if prev_time is None or mark == telemetry.MARK_RESET:
+                # New session (file start or reset): time counts from 0 again
+                self.sessions += 1
+                dt = t
+                leg, leg_start, prev_stamina = (deliveries, beacon), 0.0, stamina
+            elif mark == telemetry.MARK_JUMP or t < prev_time:
+                # Rewound or loaded: the clock moved without play
+                dt = 0.0
+                prev_stamina = stamina
+                if (deliveries, beacon) != leg:
+                    leg, leg_start = (deliveries, beacon), None
+            else:
+                dt = t - prev_time
+            prev_time = t
+            self.game_time += dt
+
+            key = (deliveries, beacon)
+            if key != leg:
+                # Reached beacon leg[1] (or dropped off, which starts the next delivery at 0);
+                # leg_start is None when the leg was entered by a jump
+                if leg_start is not None:
+                    entry = legs.setdefault(leg[1], [0, 0.0, float('inf'), 0.0])
+                    span = t - leg_start
+                    entry[0] += 1
+                    entry[1] += span
+                    entry[2] = min(entry[2], span)
+                    entry[3] = max(entry[3], span)
+                leg, leg_start = key, t
+
+            change = stamina - prev_stamina
+            if change < 0:
+                self.stamina_drained -= change
+                self.sprint_time += dt
+            elif change > 0:
+                self.stamina_regained += change
+            if stamina <= 0:
+                self.empty_time += dt
+            prev_stamina = stamina
+
+            totals = by_level.get(level)
+            if totals is None:
+                totals = by_level[level] = [0.0, 0, 0.0]
+            totals[0] += dt
+            if contacts & hit_bit:
+                totals[1] += 1
+            if contacts & touch_bits:
+                totals[2] += dt
+        self.ticks += len(chunk['game_time'])
+        self.prev_time, self.prev_stamina = prev_time, prev_stamina
+        self.leg, self.leg_start = leg, leg_start
+
+    def report(self):
+        return {
+            'ticks': self.ticks,
+            'sessions': self.sessions,
+            'game_time': round(self.game_time, 2),
+            'legs': {beacon: {'count': n, 'mean_s': round(total / n, 2), 'min_s': round(low, 2),
+                              'max_s': round(high, 2)}
+                     for beacon, (n, total, low, high) in sorted(self.legs.items())},
+            'stamina': {'drained': round(self.stamina_drained, 1), 'regained': round(self.stamina_regained, 1),
+                        'sprint_s': round(self.sprint_time, 2), 'empty_s': round(self.empty_time, 2)},
+            'difficulty': {level: {'time_s': round(seconds, 2), 'spike_hits': hits,
+                                   'hits_per_min': round(hits / seconds * 60, 3) if seconds else 0.0,
+                                   'contact_share': round(contact / seconds, 4) if seconds else 0.0}
+                           for level, (seconds, hits, contact) in sorted(self.by_level.items())},
+        }
+
+
+def aggregate(paths):
+    totals = Aggregates()
+    for path in paths:
+        totals.start_file()
+        for chunk in telemetry.read_chunks(path, QUERY_COLUMNS):
+            totals.feed(chunk)
+    return totals.report()
+
+
+def print_report(report):
+    print(f"{report['ticks']} ticks, {report['sessions']} sessions, {report['game_time']:.1f} s of game time")
+    print("\nbeacon leg   count   mean s    min s    max s")
+    for beacon, leg in report['legs'].items():
+        print(f"{beacon:>10} {leg['count']:>7} {leg['mean_s']:>8.2f} {leg['min_s']:>8.2f} {leg['max_s']:>8.2f}")
+    stamina = report['stamina']
+    print(f"\nstamina drained {stamina['drained']:.1f}, regained {stamina['regained']:.1f}, "
+          f"sprinting {stamina['sprint_s']:.1f} s, empty {stamina['empty_s']:.1f} s")
+    print("\ndifficulty   time s   spike hits   hits/min   contact")
+    for level, row in report['difficulty'].items():
+        print(f"{level:>10} {row['time_s']:>8.1f} {row['spike_hits']:>12} {row['hits_per_min']:>10.3f} "
+              f"{row['contact_share']:>8.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate Courier Run telemetry files.")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+    report = aggregate(args.files)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
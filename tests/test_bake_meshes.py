@@ -0,0 +1,29 @@
+from array import array
+
+import pytest
+
+import bake_meshes
+import meshes
+
+
+def test_npy_round_trip(tmp_path):
+    vertices = array('f', [0.5, -1.25, 2.0, 3.0, 4.5, -6.0])
+    indices = array('H', [0, 1, 0])
+    bake_meshes.write_npy(str(tmp_path / 'v.npy'), vertices, (2, 3))
+    bake_meshes.write_npy(str(tmp_path / 'i.npy'), indices, (3,))
+    assert list(bake_meshes.map_npy(str(tmp_path / 'v.npy'))) == list(vertices)
+    assert list(bake_meshes.map_npy(str(tmp_path / 'i.npy'))) == list(indices)
+
+    np = pytest.importorskip('numpy')
+    assert np.load(str(tmp_path / 'v.npy'), mmap_mode='r').tolist() == [[0.5, -1.25, 2.0], [3.0, 4.5, -6.0]]
+
+
+def test_bake_and_load_meshes(tmp_path):
+    directory = str(tmp_path / 'mesh_cache')
+    assert bake_meshes.bake(directory) > 0
+    assert bake_meshes.bake(directory) == 0      # up to date
+    baked = bake_meshes.load(directory)
+    for key, build in bake_meshes.mesh_specs():
+        vertices, indices = meshes.index_mesh(build())
+        assert list(baked[key][0]) == list(vertices)
+        assert list(baked[key][1]) == list(indices)
@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+import camera
+
+
+def follow(fps, seconds=1.0, fraction=0.1):
+    """Where a follow camera starting at 0 is after seconds of chasing a target at 100."""
+    position, dt = 0.0, 1.0 / fps
+    for _ in range(round(seconds * fps)):
+        position += (100.0 - position) * camera.smoothing(fraction, dt)
+    return position
+
+
+def test_smoothing_is_frame_rate_independent():
+    assert camera.smoothing(0.1, 1.0 / camera.REFERENCE_FPS) == pytest.approx(0.1)
+    assert follow(30) == pytest.approx(follow(144))
+    assert follow(144) == pytest.approx(100.0 * (1 - 0.9 ** 60))
+
+
+def test_matrices_are_rebuilt_only_on_change():
+    cam = camera.Camera(60.0, 1.5, 1.0, 1000.0)
+    assert cam.look_at((0, 50, 200), (0, 0, 0))
+    version, view = cam.version, cam.view
+    assert not cam.look_at([0, 50, 200], [0, 0, 0])
+    assert not cam.set_projection(60.0, 1.5, 1.0, 1000.0)
+    assert (cam.version, cam.view) == (version, view)
+    planes = cam.frustum_planes()
+    assert cam.frustum_planes() is planes
+    assert cam.look_at((0, 50, 201), (0, 0, 0))
+    assert cam.version == version + 1
+    assert cam.frustum_planes() is not planes
+
+
+def test_frustum_and_screen_ray():
+    cam = camera.Camera(60.0, 1.5, 1.0, 1000.0)
+    cam.look_at((0.0, 0.0, 100.0), (0.0, 0.0, 0.0))
+    assert cam.sphere_visible((0.0, 0.0, 0.0), 1.0)
+    assert not cam.sphere_visible((0.0, 0.0, 200.0), 1.0)        # behind the eye
+    assert not cam.sphere_visible((0.0, 0.0, -2000.0), 1.0)      # past the far plane
+    assert cam.sphere_visible((0.0, 0.0, 102.0), 5.0)            # straddles the near plane
+
+    origin, direction = cam.screen_ray(400, 300, 800, 600)
+    assert origin == (0.0, 0.0, 100.0)
+    assert direction == pytest.approx((0.0, 0.0, -1.0))
+    _, corner = cam.screen_ray(800, 600, 800, 600)
+    tan_half = math.tan(math.radians(30.0))
+    assert corner[1] / -corner[2] == pytest.approx(tan_half)
+    assert corner[0] / -corner[2] == pytest.approx(tan_half * 1.5)
@@ -0,0 +1,45 @@
+import pytest
+
+import courier_env
+from telemetry import CONTACT_SPIKE
+
+
+@pytest.fixture
+def game():
+    game = courier_env.load_game()
+    game.rng.seed(2)
+    game.init_game()
+    game.spikes.clear()
+    game.gates.clear()
+    game.bonus_rings.clear()
+    return game
+
+
+def test_swept_tests_catch_a_move_past_the_obstacle(game):
+    # One move from one side to the other; neither end point overlaps the obstacle
+    start, end = [-100.0, 0.0, 0.0], [100.0, 0.0, 0.0]
+    assert game.swept_circle_toi(start, end, [0.0, 0.0, 0.0], 20.0) == pytest.approx(0.4)
+    assert game.swept_circle_toi(start, end, [0.0, 0.0, 50.0], 20.0) is None
+    t, nx, nz = game.swept_box_toi(start, end, [0.0, 0.0, 0.0], 2.5, 25.0, 10.0)
+    assert (t, nx, nz) == (pytest.approx((100 - 12.5) / 200), -1.0, 0.0)
+
+
+def move(game, start, end):
+    game.player_prev_pos[:] = start
+    game.player_pos[:] = end
+    game.handle_collisions_and_interactions(1.0 / 60.0)
+
+
+def test_fast_move_does_not_tunnel_through_a_spike(game):
+    game.spikes.append({'pos': [0.0, 0, 0.0], 'current_height': 0, 'max_height': 80, 'cycle_offset': 0.0})
+    move(game, [-150.0, 15.0, 0.0], [150.0, 15.0, 0.0])
+    assert game.player_pos[0] < -(game.PLAYER_RADIUS + game.SPIKE_RADIUS) + 1e-6
+    assert game.tick_contacts & CONTACT_SPIKE
+
+
+def test_fast_move_does_not_tunnel_through_a_closed_gate(game):
+    game.gates.append({'pos': [0.0, 0, 0.0], 'current_height': 100, 'max_height': 100, 'is_open': False,
+                       'orientation': 'horizontal', 'cycle_offset': 0.0})
+    move(game, [0.0, 15.0, -150.0], [0.0, 15.0, 150.0])
+    assert game.player_pos[2] < -(game.GATE_THICKNESS / 2 + game.PLAYER_RADIUS)
+    assert game.gates[0]['touching']
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+import courier_env
+
+
+def test_single_env_steps_and_resets():
+    env = courier_env.CourierEnv(seed=3, max_steps=5)
+    obs = env.reset()
+    assert len(obs) == courier_env.OBS_SIZE
+    for _ in range(5):
+        obs, reward, terminated, truncated, info = env.step(courier_env.action_from_keys(b'w'))
+    assert truncated and not terminated
+    assert info['game_time'] > 0
+
+
+@pytest.mark.filterwarnings('error::pytest.PytestUnraisableExceptionWarning')
+def test_vector_env_close_unlinks_shared_memory():
+    np = pytest.importorskip('numpy')
+    env = courier_env.VectorCourierEnv(2, seed=0)
+    name = env._shm.name
+    env.reset()
+    held = np.asarray(env.observations)         # the caller keeps an array over the buffer
+    for _ in range(3):
+        observations, rewards, terminated, truncated, infos = env.step([courier_env.action_from_keys(b'w')] * 2)
+    assert held.shape == (2, courier_env.OBS_SIZE)
+    assert list(env.observation_rows[1]) == list(held[1])
+    assert len(infos) == 2
+    env.close()
+    assert not os.path.exists(os.path.join('/dev/shm', name.lstrip('/')))
+    env.close()                                 # closing twice is harmless
+    del held, observations                      # the mapping goes with the last array
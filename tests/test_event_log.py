@@ -0,0 +1,50 @@
+import json
+import threading
+
+import pytest
+
+import event_log
+
+
+def test_ring_buffer_drains_in_order_and_drops_when_full():
+    ring = event_log.RingBuffer(4)
+    for i in range(6):
+        ring.push(i)
+    assert (len(ring), ring.dropped) == (4, 2)
+    assert ring.drain() == [0, 1, 2, 3]
+    assert ring.push(6) and ring.drain() == [6]
+    assert len(ring) == 0
+    with pytest.raises(ValueError):
+        event_log.RingBuffer(6)
+
+
+def test_events_from_several_threads_all_arrive(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    log = event_log.EventLog(str(path), console=False, capacity=1024, interval=0.01)
+
+    def produce(thread):
+        for i in range(500):
+            log.emit('pickup', i * 0.01, thread=thread, index=i)
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    produce(4)
+    log.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (log.written, log.dropped, len(log.buffers)) == (2500, 0, 5)
+    for n in range(5):
+        assert [r['index'] for r in records if r['thread'] == n] == list(range(500))
+
+
+def test_log_rotates_at_max_bytes(tmp_path):
+    path = tmp_path / 'events.jsonl'
+    log = event_log.EventLog(str(path), console=False, interval=0.01, max_bytes=2000, backups=2)
+    for i in range(300):
+        log.emit('drop', float(i), index=i)
+    log.close()
+    assert path.with_name('events.jsonl.1').exists()
+    assert not path.with_name('events.jsonl.3').exists()
@@ -0,0 +1,48 @@
+import pytest
+
+import courier_env
+import ghost
+import savegame
+
+
+def test_ghost_round_trip(tmp_path):
+    path = str(tmp_path / 'ghosts.bin')
+    store = ghost.GhostStore()
+    store.start_leg('7:0', 10.0)
+    for i in range(100):
+        t = 10.0 + i / 60.0
+        store.update(t, -300.0 + i * 2.5, 120.0 - i, i * 3.0)
+    assert store.finish_leg(10.0 + 100 / 60.0) == (pytest.approx(100 / 60.0), None)
+    store.save(path)
+
+    loaded = ghost.GhostStore.load(path)
+    track, copy = store.best['7:0'], loaded.best['7:0']
+    assert copy.duration == track.duration
+    assert (copy.x, copy.z, copy.angle) == (track.x, track.z, track.angle)
+    loaded.start_leg('7:0', 0.0)
+    assert loaded.pose(0.75) == store.best['7:0'].pose(0.75)
+    assert loaded.pose(0.75) == pytest.approx((-300.0 + 45 * 2.5, 120.0 - 45, 135.0), abs=1.5)
+
+
+def test_new_best_is_saved_off_thread(tmp_path):
+    class Events:
+        def __init__(self):
+            self.kinds = []
+
+        def emit(self, kind, game_time, **fields):
+            self.kinds.append(kind)
+
+    game = courier_env.load_game()
+    game.events = Events()
+    game.ghosts = ghost.GhostStore()
+    game.ghosts.start_leg('1:0', 0.0)
+    game.ghosts.update(1.0, 10.0, 20.0, 90.0)
+    game.ghosts.finish_leg(1.0)
+    game.save_writer = savegame.SaveWriter()
+    game.ghosts_path = str(tmp_path / 'missing' / 'ghosts.bin')
+    game.save_ghosts()              # a failed write is reported, not raised
+    game.ghosts_path = str(tmp_path / 'ghosts.bin')
+    game.save_ghosts()
+    game.save_writer.close()
+    assert game.events.kinds == ['ghost_save_failed']
+    assert ghost.GhostStore.load(game.ghosts_path).best['1:0'].x == game.ghosts.best['1:0'].x
@@ -0,0 +1,8 @@
+import hazard_shader
+
+
+def test_gate_shape_follows_the_given_dimensions():
+    gate = {'pos': [10.0, 0, -20.0], 'cycle_offset': 0.5, 'max_height': 100, 'orientation': 'vertical'}
+    data = hazard_shader.build_vertices([], [gate], 12, gate_length=70, gate_thickness=8)
+    assert len(data) % hazard_shader.FLOATS_PER_VERTEX == 0
+    assert list(data[3:10]) == [10.0, -20.0, 0.5, 100.0, 1.0, 8.0, 70.0]
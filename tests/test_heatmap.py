@@ -0,0 +1,48 @@
+import pytest
+
+import heatmap
+
+
+def test_binning_merge_and_round_trip(tmp_path):
+    heat = heatmap.Heatmap()
+    heat.add_time(10.0, 10.0, 2.0)
+    heat.add_time(-10.0, 10.0, 1.0)
+    heat.add_hit(10.0, 10.0)
+    heat.add_time(5000.0, 0.0, 9.0)                 # outside the grid: ignored
+    assert heat.cell(10.0, 10.0) == heat.cell(50.0, 50.0) != heat.cell(-10.0, 10.0)
+    assert sum(heat.layers['time']) == 3.0
+    heat.sessions = 1
+
+    other = heatmap.Heatmap()
+    other.add_time(10.0, 10.0, 4.0)
+    other.sessions = 2
+    heat.merge(other)
+    assert heat.layers['time'][heat.cell(10.0, 10.0)] == 6.0
+    assert heat.sessions == 3
+    with pytest.raises(ValueError):
+        heat.merge(heatmap.Heatmap(tile_size=40))
+
+    path = str(tmp_path / 'heat.bin')
+    heat.save(path)
+    loaded = heatmap.Heatmap.load(path)
+    assert loaded.layers == heat.layers
+    assert loaded.sessions == 3
+
+
+def test_overlay_is_rebuilt_only_when_its_levels_change():
+    heat = heatmap.Heatmap(refresh_interval=0.5)
+    heat.add_time(10.0, 10.0, 4.0)
+    assert heat.refresh('time', now=0.0)
+    version = heat.version
+    heat.add_time(10.0, 10.0, 4.0)
+    assert not heat.refresh('time', now=0.1)        # throttled
+    assert not heat.refresh('time', now=1.0)        # same levels: one hot cell
+    heat.add_time(-10.0, -10.0, 4.0)
+    assert heat.refresh('time', now=2.0)
+    assert heat.version == version + 1
+
+    positions, colors = heat.overlay()
+    assert len(positions) == 2 * 6 * 3              # two cells, two triangles each
+    assert len(colors) == 2 * 6 * 4
+    assert heat.refresh('hits', now=2.1)            # a layer switch isn't throttled
+    assert heat.overlay() == ([], [])
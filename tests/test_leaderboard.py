@@ -0,0 +1,33 @@
+import leaderboard
+
+
+def test_queued_runs_are_written_and_ranked(tmp_path):
+    path = str(tmp_path / 'board.sqlite3')
+    board = leaderboard.Leaderboard(path, panel_size=3, batch=16)
+    assert board.ready.wait(5)
+    runs = [(score, score // 100, 'GOLD' if score > 500 else 'BRONZE', 1 + score % 3, score // 10 % 2 or None)
+            for score in range(50, 1050, 10)]
+    for score, deliveries, medal, difficulty, seed in runs:
+        board.submit(score, deliveries, medal, difficulty, seed, game_time=60.0)
+    board.close()
+    assert board.written == len(runs)
+    assert [row[0] for row in board.panel] == [1040, 1030, 1020]
+
+    connection = leaderboard.connect(path)
+    assert [row[0] for row in leaderboard.top(connection, 2)] == [1040, 1030]
+    best = {row[0]: row[1] for row in leaderboard.best_per_difficulty(connection)}
+    assert best == {1: 1020, 2: 1030, 3: 1040}
+    assert [row[:2] for row in leaderboard.best_per_seed(connection)] == [(1, 1030)]
+    connection.close()
+
+
+def test_queries_use_the_indexes(tmp_path):
+    connection = leaderboard.connect(str(tmp_path / 'board.sqlite3'))
+
+    def plan(query, *args):
+        return " ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + query, args))
+
+    assert 'results_score' in plan(leaderboard.TOP_QUERY, 10)
+    assert 'results_difficulty_score' in plan(leaderboard.BEST_PER_DIFFICULTY_QUERY)
+    assert 'results_seed_score' in plan(leaderboard.BEST_PER_SEED_QUERY)
+    connection.close()
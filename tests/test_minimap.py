@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import courier_env
+import minimap
+import render_backends
+
+DT = 1.0 / 60.0
+
+
+class PanelRecorder(render_backends.NullRenderer):
+    """Keeps panel() versions the way the GL backends do: draw() only when the version changed."""
+
+    def __init__(self):
+        super().__init__(800, 600)
+        self.versions = {}
+        self.calls = []
+
+    def panel(self, key, version, x, y, width, height, draw):
+        self.calls.append(('panel', key))
+        if self.versions.get(key) != version:
+            self.versions[key] = version
+            draw()
+
+    def quads(self, points):
+        self.calls.append(('quads', len(points)))
+
+    def triangles(self, points):
+        self.calls.append(('triangles', len(points)))
+
+
+@pytest.fixture
+def game():
+    env = courier_env.CourierEnv(seed=7, dt=DT)
+    env.reset()
+    return env.game
+
+
+def new_minimap(game, rate=5.0):
+    return minimap.Minimap(game.ARENA_SIZE, rate=rate, spike_radius=game.SPIKE_RADIUS,
+                           gate_size=(game.GATE_LENGTH, game.GATE_THICKNESS))
+
+
+def test_to_map_corners():
+    mm = minimap.Minimap(100, size=200)
+    assert mm.to_map(-100, 100) == (0, 0)
+    assert mm.to_map(100, -100) == (200, 200)
+    assert mm.to_map(0, 0) == (100, 100)
+
+
+def test_repaints_at_rate_per_second_of_game_time(game):
+    mm = new_minimap(game, rate=5.0)
+    renderer = PanelRecorder()
+    game.key_states[b'w'] = True
+    mm.draw(renderer, game.live_state, 0, 0)
+    assert mm.repaints == 1
+    for _ in range(60):
+        game.update_game(DT)
+        mm.draw(renderer, game.live_state, 0, 0)
+    assert mm.repaints == 1 + 5
+
+    # Paused (idle() stops calling update_game): no game time passes, so no repaints
+    for _ in range(60):
+        mm.draw(renderer, game.live_state, 0, 0)
+    assert mm.repaints == 1 + 5
+
+
+def test_layout_change_forces_a_repaint(game):
+    mm = new_minimap(game)
+    renderer = PanelRecorder()
+    mm.draw(renderer, game.live_state, 0, 0)
+    mm.draw(renderer, game.live_state, 0, 0)
+    assert mm.repaints == 1
+    game.hazard_layout_version += 1
+    mm.draw(renderer, game.live_state, 0, 0)
+    assert mm.repaints == 2
+    game.floor_overlay_version += 1
+    mm.draw(renderer, game.live_state, 0, 0)
+    assert mm.repaints == 3
+
+
+def test_frame_without_repaint_draws_only_the_panel_and_courier(game):
+    mm = new_minimap(game)
+    renderer = PanelRecorder()
+    mm.draw(renderer, game.live_state, 0, 0)
+    renderer.calls.clear()
+    game.spikes.extend(dict(game.spikes[0]) for _ in range(500))
+    mm.draw(renderer, game.live_state, 0, 0)
+    assert renderer.calls == [('panel', 'minimap'), ('triangles', 3)]
+
+
+def test_hidden_minimap_draws_nothing(game):
+    mm = new_minimap(game)
+    mm.visible = False
+    renderer = PanelRecorder()
+    mm.draw(renderer, game.live_state, 0, 0)
+    assert renderer.calls == [] and mm.repaints == 0
+
+
+# Runs in a fresh interpreter: offscreen_gl.create_context() has to come before OpenGL is imported
+OFFSCREEN_SCRIPT = textwrap.dedent('''
+    import sys
+    import offscreen_gl
+    W, H = 400, 300
+    try:
+        offscreen_gl.create_context(W, H)
+    except Exception as e:
+        print(e)
+        sys.exit(77)
+    import courier_env, minimap, render_backends
+    env = courier_env.CourierEnv(seed=7, dt=1.0 / 60.0)
+    env.reset()
+    game = env.game
+    mm = minimap.Minimap(game.ARENA_SIZE, rate=5.0, spike_radius=game.SPIKE_RADIUS,
+                         gate_size=(game.GATE_LENGTH, game.GATE_THICKNESS))
+
+    def frame(renderer, with_map):
+        renderer.begin_frame()
+        renderer.hud_begin()
+        if with_map:
+            mm.draw(renderer, game.live_state, 10, 10)
+        renderer.hud_end()
+        renderer.end_frame()
+        return offscreen_gl.read_pixels(W, H)
+
+    def region(pixels):
+        # The map's square, courier marker included (the courier does not move between frames)
+        rows = [pixels[(y * W + 10) * 3:(y * W + 10 + mm.size) * 3] for y in range(10, 10 + mm.size)]
+        return b''.join(rows)
+
+    for name in ('immediate', 'retained', 'queued'):
+        renderer = render_backends.create_renderer(name, W, H)
+        mm.repaints = 0
+        blank = frame(renderer, False)
+        first = frame(renderer, True)
+        second = frame(renderer, True)
+        assert region(first) != region(blank), name
+        assert region(second) == region(first), name
+        assert mm.repaints == 1, (name, mm.repaints)
+        print(name, 'ok')
+''')
+
+
+def test_offscreen_panel_is_composited_without_repainting(tmp_path):
+    script = tmp_path / 'offscreen_minimap.py'
+    script.write_text(OFFSCREEN_SCRIPT)
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=os.path.dirname(courier_env.__file__)), timeout=120)
+    if result.returncode == 77:
+        pytest.skip("no offscreen GL context: " + result.stdout.strip())
+    assert result.returncode == 0, result.stdout + result.stderr
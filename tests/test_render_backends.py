@@ -0,0 +1,18 @@
+import pytest
+
+import render_backends
+
+
+def test_unknown_renderer_is_rejected():
+    with pytest.raises(ValueError, match="unknown renderer 'nope'"):
+        render_backends.create_renderer('nope')
+
+
+def test_backend_errors_are_not_reported_as_unknown(monkeypatch):
+    class Broken:
+        def __init__(self, width, height):
+            raise KeyError('missing setting')
+
+    monkeypatch.setitem(render_backends.RENDERERS, 'broken', Broken)
+    with pytest.raises(KeyError, match='missing setting'):
+        render_backends.create_renderer('broken')
@@ -0,0 +1,99 @@
+import render_backends
+import render_queue
+
+RED = (1.0, 0.0, 0.0)
+BLUE = (0.0, 0.0, 1.0)
+
+
+class Recorder(render_backends.Renderer):
+    """Keeps (primitive, colour, world position) for each draw that reaches it."""
+
+    def __init__(self):
+        super().__init__()
+        self.draws = []
+        self.rgba = None
+        self.matrix = None
+
+    def gl_stats(self):
+        return {'draw': len(self.draws)}
+
+    def load_matrix(self, m):
+        self.matrix = m
+
+    def color(self, r, g, b, a=1.0):
+        self.rgba = (r, g, b, a)
+
+    def cube(self, size):
+        self.draws.append(('cube', self.rgba, self.matrix[12:15]))
+
+    def sphere(self, radius, slices, stacks):
+        self.draws.append(('sphere', self.rgba, self.matrix[12:15]))
+
+    def triangles(self, vertices):
+        self.draws.append(('triangles', self.rgba, None))
+
+    def text(self, x, y, text, font='helvetica_18'):
+        self.draws.append(('text', self.rgba, None))
+
+
+def prop(queue, shape, color, z, alpha=1.0):
+    queue.color(*color, alpha)
+    queue.push()
+    queue.translate(0.0, 0.0, z)
+    if shape == 'cube':
+        queue.cube(1.0)
+    else:
+        queue.sphere(1.0, 8, 8)
+    queue.pop()
+
+
+def test_world_pass_is_sorted_by_state_then_depth():
+    target = Recorder()
+    queue = render_queue.RenderQueue(target)
+    queue.begin_frame()
+    queue.set_camera(60.0, 1.0, 1.0, 1000.0, (0.0, 0.0, 100.0), (0.0, 0.0, 0.0))
+    prop(queue, 'cube', RED, 0.0)
+    prop(queue, 'sphere', BLUE, 10.0, alpha=0.5)
+    prop(queue, 'cube', BLUE, 20.0)
+    prop(queue, 'cube', RED, 50.0)
+    prop(queue, 'sphere', BLUE, 60.0, alpha=0.5)
+    queue.color(*BLUE)
+    queue.triangles([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)])
+    assert target.draws == []               # nothing reaches the target during the pass
+    queue.depth_test(False)
+    queue.text(10, 10, "HUD")
+    queue.end_frame()
+
+    # The target gets view * model; with the eye at z = 100 its z column is world z - 100
+    drawn = [(shape, rgba[:3], rgba[3] < 1.0, where and round(where[2] + 100.0))
+             for shape, rgba, where in target.draws]
+    assert drawn == [
+        ('triangles', BLUE, False, None),   # loose geometry first
+        ('cube', BLUE, False, 20),          # then meshes grouped by shape and colour,
+        ('cube', RED, False, 50),           # front to back inside a group
+        ('cube', RED, False, 0),
+        ('sphere', BLUE, True, 10),         # blended last, back to front
+        ('sphere', BLUE, True, 60),
+        ('text', BLUE, False, None),        # the HUD passes straight through
+    ]
+
+
+def test_stats_sum_the_frames_passes_and_reach_gl_stats():
+    target = Recorder()
+    queue = render_queue.RenderQueue(target)
+    queue.begin_frame()
+    for _ in range(2):                      # two world passes in one frame
+        queue.set_camera(60.0, 1.0, 1.0, 1000.0, (0.0, 0.0, 100.0), (0.0, 0.0, 0.0))
+        for i in range(4):
+            prop(queue, 'cube', RED if i % 2 else BLUE, float(i))
+    queue.end_frame()
+    assert queue.stats == {'items': 8, 'opaque': 8, 'blended': 0, 'state_changes': 2,
+                           'state_changes_unsorted': 6, 'state_changes_avoided': 4}
+    stats = queue.gl_stats()
+    assert stats['draw'] == 8
+    assert {key: stats[key] for key in render_queue.QUEUE_COUNTERS} == {
+        'items': 8, 'blended': 0, 'state_changes': 2, 'state_changes_avoided': 4}
+
+    queue.begin_frame()
+    queue.end_frame()
+    assert queue.stats['items'] == 0
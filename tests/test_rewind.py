@@ -0,0 +1,102 @@
+import pickle
+
+import courier_env
+import heatmap
+import rewind
+import telemetry
+import telemetry_query
+
+DT = 1.0 / 60.0
+
+
+def new_game(seed=11):
+    game = courier_env.load_game()
+    game.rewind = rewind.RewindBuffer(10.0, 60.0)
+    game.rng.seed(seed)
+    game.init_game()
+    return game
+
+
+def state(game):
+    """What a rewind restores, copied."""
+    values = {name: getattr(game, name) for name in rewind.SCALARS + rewind.INT_SCALARS}
+    carried = game.carried_package_info
+    values['carried_index'] = next((i for i, pkg in enumerate(game.packages) if pkg is carried), None)
+    for name in ('player_pos', 'packages', 'bonus_rings', 'route_beacons', 'spikes', 'gates',
+                 'special_tiles', 'conveyor_tiles', 'route_color'):
+        values[name] = getattr(game, name)
+    values['rng'] = game.rng.getstate()
+    return pickle.loads(pickle.dumps(values))
+
+
+def test_step_back_restores_recorded_state():
+    game = new_game()
+    game.key_states[b'w'] = True
+    for _ in range(120):
+        game.update_game(DT)
+    before = state(game)
+    game.key_states[b'd'] = True
+    game.key_states[b'shift'] = True
+    for _ in range(90):
+        game.update_game(DT)
+    assert state(game) != before
+
+    game.key_states.clear()
+    game.key_states[b'b'] = True
+    for _ in range(90):
+        game.update_game(DT)
+    assert state(game) == before
+
+
+def test_rewind_is_not_a_new_telemetry_session(tmp_path):
+    path = str(tmp_path / 'run.ctl')
+    game = new_game()
+    game.time_left = 1000.0
+    game.telemetry = telemetry.TelemetryWriter(path)
+    for _ in range(60 * 20):
+        game.update_game(DT)
+    game.key_states[b'b'] = True
+    for _ in range(60 * 5):
+        game.update_game(DT)
+    game.key_states[b'b'] = False
+    for _ in range(60 * 10):
+        game.update_game(DT)
+    game.apply_key(b'r', True, 0)
+    for _ in range(60 * 3):
+        game.update_game(DT)
+    game.telemetry.close()
+
+    report = telemetry_query.aggregate([path])
+    assert report['sessions'] == 2
+    assert abs(report['game_time'] - 33.0) < 0.1         # 20 s + 10 s after the rewind + 3 s after R
+    hm = heatmap.Heatmap()
+    hm.add_telemetry(path)
+    assert abs(sum(hm.layers['time']) - 33.0) < 0.1
+
+
+def test_rewinding_out_of_a_game_over_submits_once():
+    class Leaderboard:
+        def __init__(self):
+            self.rows = []
+
+        def submit(self, *row):
+            self.rows.append(row)
+
+    game = new_game()
+    game.leaderboard = Leaderboard()
+    game.completed_deliveries = 1
+    while game.game_state != 'fail':
+        game.update_game(DT)
+    game.apply_key(b'b', True, 0)
+    for _ in range(60):
+        game.update_game(DT)
+    game.apply_key(b'b', False, 0)
+    assert game.game_state == 'playing'
+    while game.game_state != 'fail':
+        game.update_game(DT)
+    game.apply_key(b'r', True, 0)
+    assert len(game.leaderboard.rows) == 1
+
+    game.completed_deliveries = 1
+    game.apply_key(b'r', True, 0)       # a new run abandoned after delivering
+    assert len(game.leaderboard.rows) == 2
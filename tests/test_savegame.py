@@ -0,0 +1,75 @@
+import pytest
+
+import courier_env
+import savegame
+
+
+def play(game, ticks, *keys):
+    for key in keys:
+        game.key_states[key] = True
+    for _ in range(ticks):
+        game.update_game(1.0 / 60.0)
+    for key in keys:
+        game.key_states[key] = False
+
+
+def test_savegame_round_trip(tmp_path):
+    path = str(tmp_path / 'run.sav')
+    game = courier_env.load_game()
+    game.rng.seed(5)
+    game.init_game()
+    play(game, 90, b'w', b'd')
+    savegame.save(game, path)
+
+    other = courier_env.load_game()
+    other.rng.seed(6)
+    other.init_game()
+    savegame.load(other, path)
+    assert savegame.capture(other) == savegame.capture(game)
+
+    # The loaded run continues exactly like the saved one
+    play(game, 60, b'w')
+    play(other, 60, b'w')
+    assert other.player_pos == game.player_pos
+    assert other.game_time == game.game_time
+    assert other.total_score == game.total_score
+
+
+def test_savegame_rejects_damaged_file(tmp_path):
+    game = courier_env.load_game()
+    game.init_game()
+    data = bytearray(savegame.dumps(game))
+    data[-1] ^= 0xFF
+    with pytest.raises(savegame.SaveError):
+        savegame.loads(bytes(data))
+
+
+def test_save_writer_reports_each_write(tmp_path):
+    results = []
+    writer = savegame.SaveWriter()
+    writer.write(str(tmp_path / 'ok.sav'), b'data', lambda path, error: results.append((path, error)))
+    writer.write(str(tmp_path / 'missing' / 'bad.sav'), b'data', lambda path, error: results.append((path, error)))
+    writer.close()
+    assert results[0] == (str(tmp_path / 'ok.sav'), None)
+    assert isinstance(results[1][1], OSError)
+    assert (tmp_path / 'ok.sav').read_bytes() == b'data'
+
+
+def test_failed_save_is_reported_not_announced(tmp_path):
+    class Events:
+        def __init__(self):
+            self.kinds = []
+
+        def emit(self, kind, game_time, **fields):
+            self.kinds.append(kind)
+
+    game = courier_env.load_game()
+    game.init_game()
+    game.events = Events()
+    game.save_writer = savegame.SaveWriter()
+    game.save_path = str(tmp_path / 'missing' / 'run.sav')
+    game.save_game()
+    game.save_path = str(tmp_path / 'run.sav')
+    game.save_game()
+    game.save_writer.close()
+    assert game.events.kinds == ['save_failed', 'game_saved']
@@ -0,0 +1,65 @@
+import pytest
+
+import courier_env
+import rewind
+import scheduler
+
+
+def recording_scheduler(**kwargs):
+    sched = scheduler.Scheduler(**kwargs)
+    steps = []
+    for name, rate in (('fast', 10), ('slow', 4), ('tie', 2)):
+        sched.add(name, rate, lambda dt, name=name: steps.append((name, round(sched.time, 6), dt)))
+    return sched, steps
+
+
+def test_fixed_steps_in_time_order_whatever_the_frames():
+    sched, steps = recording_scheduler()
+    for dt in (0.37, 0.41, 0.22):
+        sched.advance(dt)
+    assert [name for name, _, _ in steps].count('fast') == 10
+    assert [name for name, _, _ in steps].count('slow') == 4
+    assert all(dt == pytest.approx(1.0 / {'fast': 10, 'slow': 4, 'tie': 2}[name]) for name, _, dt in steps)
+    assert [t for _, t, _ in steps] == sorted(t for _, t, _ in steps)
+    # Equal due times run in registration order
+    assert [name for name, t, _ in steps if t == 0.5] == ['fast', 'slow', 'tie']
+
+    again, replay = recording_scheduler()
+    for dt in (0.37, 0.41, 0.22):
+        again.advance(dt)
+    assert replay == steps
+
+
+def test_step_offset_and_alpha():
+    sched = scheduler.Scheduler()
+    offsets = []
+    sched.add('hazards', 10, lambda dt: offsets.append(round(sched.step_offset, 6)))
+    sched.advance(0.5)
+    assert offsets == [0.4, 0.3, 0.2, 0.1, 0.0]
+    assert sched.step_offset == 0.0
+    sched.add('rings', 4, lambda dt: None)
+    sched.advance(0.125)
+    assert sched.alpha('rings') == pytest.approx(0.5)
+
+
+def test_catch_up_limit_drops_the_backlog():
+    sched = scheduler.Scheduler(max_steps=2)
+    sched.add('physics', 10, lambda dt: None)
+    sched.advance(1.0)
+    stats = sched.stats()['physics']
+    assert (stats['steps'], stats['skipped']) == (2, 8)
+    with pytest.raises(ValueError):
+        sched.add('physics', 5, lambda dt: None)
+
+
+def test_hud_follows_a_rewind_under_multi_rate():
+    game = courier_env.load_game()
+    game.rewind = rewind.RewindBuffer(10.0, 60.0)
+    game.init_game()
+    game.schedule = game.build_schedule()
+    for _ in range(600):
+        game.update_game(1.0 / 60.0)
+    game.key_states[b'b'] = True
+    for _ in range(120):
+        game.update_game(1.0 / 60.0)
+    assert game.hud_text == tuple(game.hud_text_lines(game.live_state))
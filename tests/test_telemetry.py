@@ -0,0 +1,42 @@
+import json
+import struct
+import sys
+from array import array
+
+import telemetry
+import telemetry_query
+
+
+def test_telemetry_round_trip(tmp_path):
+    path = str(tmp_path / 'run.ctl')
+    writer = telemetry.TelemetryWriter(path, chunk_rows=4)
+    rows = [(i * 0.25, i * 1.5, -i * 0.5, 2.0, 100.0 - i, i % 3, i // 5, 1, i & 15, i % 2)
+            for i in range(10)]
+    for row in rows:
+        writer.record(*row)
+    writer.close()
+
+    chunks = list(telemetry.read_chunks(path))
+    assert [len(chunk['game_time']) for chunk in chunks] == [4, 4, 2]
+    for index, (name, _) in enumerate(telemetry.COLUMNS):
+        values = [value for chunk in chunks for value in chunk[name]]
+        assert values == [row[index] for row in rows]
+
+    only = next(telemetry.read_chunks(path, ('x', 'mark')))
+    assert set(only) == {'x', 'mark'}
+
+
+def test_version_1_files_read_without_marks(tmp_path):
+    path = str(tmp_path / 'old.ctl')
+    columns = [column for column in telemetry.COLUMNS if column[0] != 'mark']
+    header = json.dumps({'version': 1, 'byteorder': sys.byteorder, 'columns': columns, 'meta': {}}).encode()
+    times = [0.5, 1.0, 1.5]
+    with open(path, 'wb') as file:
+        file.write(telemetry.MAGIC + struct.pack('<I', len(header)) + header + struct.pack('<I', len(times)))
+        for name, code in columns:
+            file.write(array(code, times if name == 'game_time' else [0] * len(times)).tobytes())
+
+    chunk = next(telemetry.read_chunks(path, ('game_time', 'mark')))
+    assert list(chunk['mark']) == [telemetry.MARK_NONE] * 3
+    report = telemetry_query.aggregate([path])
+    assert (report['ticks'], report['sessions'], report['game_time']) == (3, 1, 1.5)